@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio board API - FPGA Nexys A7-100T UART
+Serial fd driven by loop.add_reader/add_writer, no thread per port.
+
+    async with AsyncBoard("/dev/ttyUSB1") as board:
+        await board.wait_for_mode(3)
+        await board.set_leds(0x1234)
+        async for frame in board.frames():
+            ...
+
+POSIX only: needs a selector event loop and a pollable serial fd.
+"""
+
+import asyncio
+import os
+
+import serial
+
+from telemetry import BAUDRATE, TelemetryEngine
+
+
+# Backpressure: drain() waits while more than this is queued for the port
+WRITE_HIGH_WATER = 4096
+READ_SIZE = 4096
+FRAME_QUEUE_SIZE = 1000
+
+_CLOSED = object()
+
+
+# ============================================================================
+# Transport
+# ============================================================================
+class SerialTransport:
+    """
+    Non-blocking reads and writes on a serial fd from the event loop.
+
+    Bytes read are handed to on_data(data, t_rx) on the loop thread. write()
+    tries the fd right away and queues what the driver did not take; the
+    rest is sent from a writer callback. drain() blocks the caller while
+    more than WRITE_HIGH_WATER bytes are pending.
+    """
+
+    def __init__(self, ser, on_data, on_error, loop=None):
+        self.ser = ser
+        self.fd = ser.fileno()
+        self.on_data = on_data
+        self.on_error = on_error
+        self.loop = loop or asyncio.get_running_loop()
+        self.wbuf = bytearray()
+        self.writing = False
+        self.drained = asyncio.Event()
+        self.drained.set()
+        self.closed = False
+        os.set_blocking(self.fd, False)
+        self.loop.add_reader(self.fd, self._on_readable)
+
+    def write(self, data):
+        if self.closed:
+            raise serial.SerialException("port closed")
+        if not self.wbuf:
+            try:
+                sent = os.write(self.fd, data)
+            except BlockingIOError:
+                sent = 0
+            data = data[sent:]
+        if data:
+            self.wbuf += data
+            if not self.writing:
+                self.loop.add_writer(self.fd, self._on_writable)
+                self.writing = True
+            if len(self.wbuf) > WRITE_HIGH_WATER:
+                self.drained.clear()
+
+    async def drain(self):
+        await self.drained.wait()
+        if self.closed:
+            raise serial.SerialException("port closed")
+
+    @property
+    def pending(self):
+        return len(self.wbuf)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.loop.remove_reader(self.fd)
+        if self.writing:
+            self.loop.remove_writer(self.fd)
+            self.writing = False
+        self.drained.set()
+        try:
+            self.ser.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Loop callbacks
+    # ------------------------------------------------------------------
+    def _on_readable(self):
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.on_error(e)
+            return
+        if not data:
+            self.on_error(serial.SerialException("device disconnected"))
+            return
+        self.on_data(data, self.loop.time())
+
+    def _on_writable(self):
+        try:
+            sent = os.write(self.fd, self.wbuf)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.on_error(e)
+            return
+        del self.wbuf[:sent]
+        if len(self.wbuf) <= WRITE_HIGH_WATER:
+            self.drained.set()
+        if not self.wbuf:
+            self.loop.remove_writer(self.fd)
+            self.writing = False
+
+
+# ============================================================================
+# Board
+# ============================================================================
+class AsyncBoard:
+    """
+    One board on the event loop.
+
+    Framing, parsing and BoardState are the same TelemetryEngine code as the
+    threaded path; here feed() is called from the reader callback instead of
+    a thread, and engine events fire on the loop thread. Each frames()
+    iterator has its own bounded queue (oldest frames dropped when a
+    consumer falls behind, counted in `dropped`).
+    """
+
+    def __init__(self, port=None, baudrate=BAUDRATE, binary=False, ser=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.ser = ser
+        self.engine = TelemetryEngine(port, baudrate, ser=ser, binary=binary)
+        self.state = self.engine.state
+        self.transport = None
+        self.queues = []
+        self.mode_waiters = []
+        self.last_frames = {}       # mode -> latest frame in that mode
+        self.error = None
+        self.closed = False         # set by _finish(), until the next open()
+        self.dropped = 0
+        self.engine.subscribe("frame", self._on_frame)
+
+    async def open(self):
+        ser = self.ser
+        if ser is None:
+            ser = serial.Serial(self.port, self.baudrate, timeout=0)
+        self.engine.ser = ser
+        self.error = None
+        self.closed = False
+        self.transport = SerialTransport(ser, self.engine.feed, self._on_error)
+        return self
+
+    async def close(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        self.engine.ser = None
+        self._finish(None)
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    async def write(self, data):
+        if self.transport is None:
+            raise serial.SerialException("not open")
+        self.transport.write(data)
+        self.state.tx_count += len(data)
+        await self.transport.drain()
+
+    async def set_leds(self, value):
+        """2-byte LED protocol: low byte, then high byte."""
+        value &= 0xFFFF
+        await self.write(bytes((value & 0xFF, value >> 8)))
+
+    async def wait_for_mode(self, mode, timeout=None):
+        """
+        Return a frame in `mode`: the latest one if the board is already in
+        that mode, otherwise the first to arrive.
+        """
+        if self.closed:
+            raise self.error or serial.SerialException("port closed")
+        frame = self.last_frames.get(mode)
+        if frame is not None and self.state.current_mode == mode:
+            return frame
+        future = asyncio.get_running_loop().create_future()
+        self.mode_waiters.append((mode, future))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if (mode, future) in self.mode_waiters:
+                self.mode_waiters.remove((mode, future))
+
+    async def frames(self, maxsize=FRAME_QUEUE_SIZE):
+        """Async iterator over decoded frames until the board is closed."""
+        if self.closed:
+            # _finish() already ran: no _CLOSED would ever reach a new queue
+            if self.error is not None:
+                raise self.error
+            return
+        queue = asyncio.Queue(maxsize)
+        self.queues.append(queue)
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is _CLOSED:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                yield frame
+        finally:
+            if queue in self.queues:
+                self.queues.remove(queue)
+
+    # ------------------------------------------------------------------
+    # Internals (loop thread)
+    # ------------------------------------------------------------------
+    def _on_frame(self, frame):
+        self.last_frames[frame.mode] = frame
+        for queue in self.queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(frame)
+        if self.mode_waiters:
+            for mode, future in list(self.mode_waiters):
+                if mode == frame.mode and not future.done():
+                    future.set_result(frame)
+
+    def _on_error(self, exc):
+        self.engine.emit("error", exc)
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        self._finish(exc)
+
+    def _finish(self, exc):
+        self.error = exc
+        self.closed = True
+        for queue in self.queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(_CLOSED)
+        for _, future in self.mode_waiters:
+            if not future.done():
+                future.set_exception(exc or serial.SerialException("port closed"))
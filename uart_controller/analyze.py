@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capture analyzer - FPGA Nexys A7-100T UART
+Parallel offline statistics over capture files (mmap + process pool).
+
+    python analyze.py run.cap [--workers 8] [--chunk 64M] [--json]
+    python uartserial.py analyze run.cap
+
+The capture is cut into byte ranges at its seek-index entries. Each range
+is parsed in a worker process with the live code (RingFramer.split +
+parse_batch, or BinaryDecoder.feed) into columnar NumPy arrays, reduced to
+partial statistics, and the partials are merged in file order:
+    per mode    frame count, bad lines, mean interval, min/max/mean of
+                every field, per-bit switch toggles
+    cadence     intervals longer than GAP_FACTOR x PERIOD between any two
+                consecutive frames (the r_tx_timer line every 0.5 s)
+
+Range ownership: a text line belongs to the range holding its newline; a
+worker skips to just past the first newline in its range and reads on
+into the next range up to the first newline there. In binary captures a
+range starts at the first offset where two consecutive frames pass sync
+and CRC, which is where the live decoder is aligned on a clean stream.
+Frames get the time of the record that completed them, as in the engine.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from binframe import FRAME_SIZE, SYNC, BinaryDecoder, crc8
+from capture import HEADER, RECORD, CaptureReader
+from frame_parser import parse_batch
+from framer import RingFramer
+from recorder import parse_size
+from telemetry import STATE_FIELDS
+
+
+# Interval between periodic lines (TOP.v r_tx_timer)
+PERIOD = 0.5
+# An interval longer than GAP_FACTOR x PERIOD counts as a gap
+GAP_FACTOR = 1.5
+# Largest gaps listed in the result
+MAX_GAPS = 20
+# Range size bounds; by default a file is cut into ~4 ranges per worker
+MIN_CHUNK = 4 << 20
+MAX_CHUNK = 256 << 20
+
+VALUE_FIELDS = STATE_FIELDS[1:]
+TOGGLE_FIELDS = ("switch_value",)
+
+
+# ============================================================================
+# Range boundaries
+# ============================================================================
+def _walk(mm, offset, end):
+    """(record offset, t, payload offset, payload size) from a record boundary."""
+    unpack = RECORD.unpack_from
+    while offset + RECORD.size <= end:
+        t, size = unpack(mm, offset)
+        body = offset + RECORD.size
+        if body + size > end:
+            return
+        yield offset, t, body, size
+        offset = body + size
+
+
+def line_boundary(mm, offset, end):
+    """(record offset, payload index) just past the first newline at or after `offset`."""
+    for rec, _, body, size in _walk(mm, offset, end):
+        i = mm.find(b"\n", body, body + size)
+        if i >= 0:
+            return rec, i - body + 1
+    return end, 0
+
+
+def _frame_ok(buf, p):
+    return buf[p] == SYNC and crc8(buf[p + 1:p + FRAME_SIZE - 1]) == buf[p + FRAME_SIZE - 1]
+
+
+def frame_boundary(mm, offset, end):
+    """(record offset, payload index) of the first two valid frames at or after `offset`."""
+    acc = bytearray()
+    starts = []             # (position in acc, record offset)
+    pos = 0
+    for rec, _, body, size in _walk(mm, offset, end):
+        starts.append((len(acc), rec))
+        acc += mm[body:body + size]
+        while True:
+            p = acc.find(SYNC, pos)
+            if p < 0:
+                pos = len(acc)
+                break
+            if p + 2 * FRAME_SIZE > len(acc):
+                pos = p
+                break
+            if _frame_ok(acc, p) and _frame_ok(acc, p + FRAME_SIZE):
+                base, r = starts[bisect_right(starts, (p, float("inf"))) - 1]
+                return r, p - base
+            pos = p + 1
+    return end, 0
+
+
+# ============================================================================
+# Worker: byte range -> columns -> partial statistics
+# ============================================================================
+def parse_range(path, start, stop, end, binary):
+    """
+    Columns for the frames owned by [start, stop) of a capture: t, mode,
+    ok and one float64 array per field (NaN where a frame lacks it), plus
+    framer / decoder counters.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        boundary = frame_boundary if binary else line_boundary
+        b_rec, b_skip = boundary(mm, start, end) if start > HEADER.size else (start, 0)
+        f_rec, f_skip = boundary(mm, stop, end) if stop < end else (end, 0)
+
+        def chunks():
+            for rec, t, body, size in _walk(mm, b_rec, end):
+                if rec > f_rec or (rec == f_rec and f_skip == 0):
+                    return
+                lo = body + (b_skip if rec == b_rec else 0)
+                hi = body + f_skip if rec == f_rec else body + size
+                yield t, mm[lo:hi]
+                if rec == f_rec:
+                    return
+
+        return _decode(chunks(), binary)
+    finally:
+        mm.close()
+
+
+def _decode(chunks, binary):
+    """Run the live decoder over (t, data) chunks and build columns."""
+    if binary:
+        decoder = BinaryDecoder()
+        decode = decoder.feed
+    else:
+        framer = RingFramer()
+        split = framer.split
+
+        def decode(data, t):
+            batch = split(data)
+            return parse_batch(batch, t) if batch else ()
+
+    ts, modes, oks = [], [], []
+    rows = {}               # mode -> list of field value tuples (ok frames)
+    keys = {}               # mode -> field names of those tuples
+    for t, data in chunks:
+        for frame in decode(data, t):
+            mode = frame.mode
+            ts.append(t)
+            modes.append(mode)
+            oks.append(frame.ok)
+            if frame.ok:
+                if mode not in rows:
+                    rows[mode] = []
+                    keys[mode] = tuple(frame.fields)
+                rows[mode].append(tuple(frame.fields.values()))
+
+    cols = _empty_columns(len(ts))
+    cols["t"][:] = ts
+    cols["mode"][:] = modes
+    cols["ok"][:] = oks
+    for mode, values in rows.items():
+        idx = np.flatnonzero((cols["mode"] == mode) & cols["ok"])
+        values = np.array(values, dtype=np.float64)
+        for j, name in enumerate(keys[mode]):
+            cols[name][idx] = values[:, j]
+
+    if binary:
+        counters = {"lines": 0, "unknown": 0, "resyncs": decoder.resyncs, "crc_errors": decoder.crc_errors}
+    else:
+        lines = framer.lines
+        counters = {"lines": lines, "unknown": lines - len(ts), "resyncs": framer.resyncs, "crc_errors": 0}
+    return cols, counters
+
+
+def _empty_columns(n):
+    cols = {"t": np.zeros(n), "mode": np.zeros(n, dtype=np.uint8), "ok": np.zeros(n, dtype=bool)}
+    for name in VALUE_FIELDS:
+        cols[name] = np.full(n, np.nan)
+    return cols
+
+
+def summarize(cols, counters, period=PERIOD):
+    """Partial statistics of one range; merge() combines them in order."""
+    t = cols["t"]
+    mode = cols["mode"]
+    ok = cols["ok"]
+    n = len(t)
+    part = dict(counters, frames=n, modes={}, gaps=[], gap_count=0, gap_time=0.0)
+    if not n:
+        return part
+    part.update(t_first=float(t[0]), t_last=float(t[-1]), mode_first=int(mode[0]))
+
+    dt = np.diff(t)
+    gi = np.flatnonzero(dt > GAP_FACTOR * period)
+    part["gap_count"] = len(gi)
+    part["gap_time"] = float(dt[gi].sum())
+    top = gi[np.argsort(dt[gi])[::-1][:MAX_GAPS]]
+    part["gaps"] = [(float(t[i]), float(dt[i]), int(mode[i + 1])) for i in top]
+
+    for m in np.unique(mode).tolist():
+        sel = mode == m
+        tm = t[sel]
+        stats = {
+            "frames": len(tm),
+            "bad": int((sel & ~ok).sum()),
+            "t_first": float(tm[0]),
+            "t_last": float(tm[-1]),
+            "interval_sum": float(tm[-1] - tm[0]),
+            "interval_count": len(tm) - 1,
+            "fields": {},
+        }
+        good = sel & ok
+        for name in VALUE_FIELDS:
+            v = cols[name][good]
+            v = v[~np.isnan(v)]
+            if not len(v):
+                continue
+            field = {"count": len(v), "min": float(v.min()), "max": float(v.max()),
+                     "sum": float(v.sum()), "first": float(v[0]), "last": float(v[-1])}
+            if name in TOGGLE_FIELDS:
+                bits = v.astype(np.int64)
+                flips = bits[1:] ^ bits[:-1]
+                field["toggles"] = [int(((flips >> b) & 1).sum()) for b in range(16)]
+            stats["fields"][name] = field
+        part["modes"][m] = stats
+    return part
+
+
+def _work(args):
+    path, start, stop, end, binary, period, keep = args
+    cols, counters = parse_range(path, start, stop, end, binary)
+    return summarize(cols, counters, period), (cols if keep else None)
+
+
+# ============================================================================
+# Merge
+# ============================================================================
+def merge(parts, period=PERIOD):
+    """Combine partial statistics (in file order) into the final result."""
+    out = {"frames": 0, "lines": 0, "unknown": 0, "resyncs": 0, "crc_errors": 0,
+           "gap_count": 0, "gap_time": 0.0, "modes": {}}
+    gaps = []
+    last_t = None
+    for part in parts:
+        for key in ("frames", "lines", "unknown", "resyncs", "crc_errors", "gap_count"):
+            out[key] += part[key]
+        out["gap_time"] += part["gap_time"]
+        gaps.extend(part["gaps"])
+        if not part["frames"]:
+            continue
+        # The interval that crosses the range boundary
+        if last_t is not None:
+            dt = part["t_first"] - last_t
+            if dt > GAP_FACTOR * period:
+                out["gap_count"] += 1
+                out["gap_time"] += dt
+                gaps.append((last_t, dt, part["mode_first"]))
+        else:
+            out["t_first"] = part["t_first"]
+        last_t = out["t_last"] = part["t_last"]
+
+        for m, s in part["modes"].items():
+            total = out["modes"].get(m)
+            if total is None:
+                out["modes"][m] = {**s, "fields": {k: dict(f) for k, f in s["fields"].items()}}
+                continue
+            total["frames"] += s["frames"]
+            total["bad"] += s["bad"]
+            total["interval_sum"] += s["interval_sum"] + (s["t_first"] - total["t_last"])
+            total["interval_count"] += s["interval_count"] + 1
+            total["t_last"] = s["t_last"]
+            for name, f in s["fields"].items():
+                tf = total["fields"].get(name)
+                if tf is None:
+                    total["fields"][name] = dict(f)
+                    continue
+                if "toggles" in f:
+                    across = int(tf["last"]) ^ int(f["first"])
+                    tf["toggles"] = [a + b + ((across >> i) & 1)
+                                     for i, (a, b) in enumerate(zip(tf["toggles"], f["toggles"]))]
+                tf["count"] += f["count"]
+                tf["sum"] += f["sum"]
+                tf["min"] = min(tf["min"], f["min"])
+                tf["max"] = max(tf["max"], f["max"])
+                tf["last"] = f["last"]
+
+    gaps.sort(key=lambda g: -g[1])
+    out["gaps"] = gaps[:MAX_GAPS]
+    for s in out["modes"].values():
+        s["interval_mean"] = s["interval_sum"] / s["interval_count"] if s["interval_count"] else 0.0
+        for f in s["fields"].values():
+            f["mean"] = f["sum"] / f["count"]
+    return out
+
+
+# ============================================================================
+# Driver
+# ============================================================================
+def plan_ranges(reader, workers, chunk_bytes=None):
+    """[start, stop) byte ranges cut at seek-index entries."""
+    end = reader.data_end
+    if chunk_bytes is None:
+        chunk_bytes = min(max((end - HEADER.size) // (workers * 4), MIN_CHUNK), MAX_CHUNK)
+    cuts = [HEADER.size]
+    for _, offset, _ in reader.index:
+        if offset - cuts[-1] >= chunk_bytes and end - offset >= chunk_bytes // 2:
+            cuts.append(offset)
+    cuts.append(end)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def analyze(path, workers=None, chunk_bytes=None, period=PERIOD, columns=False):
+    """
+    Statistics of a capture file; with columns=True returns (result,
+    columns) where columns are the concatenated per-frame arrays.
+    """
+    workers = workers or os.cpu_count() or 1
+    reader = CaptureReader(path)
+    try:
+        binary = reader.binary
+        end = reader.data_end
+        ranges = plan_ranges(reader, workers, chunk_bytes)
+    finally:
+        reader.close()
+
+    jobs = [(path, start, stop, end, binary, period, columns) for start, stop in ranges]
+    if workers == 1 or len(jobs) == 1:
+        results = [_work(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_work, jobs))
+
+    result = merge([part for part, _ in results], period)
+    result.update(path=path, binary=binary, ranges=len(ranges), workers=workers, period=period)
+    if not columns:
+        return result
+    cols = {name: np.concatenate([c[name] for _, c in results]) for name in results[0][1]}
+    return result, cols
+
+
+def format_report(result):
+    lines = [f"{result['path']}: {result['frames']} frames in {result['ranges']} ranges "
+             f"({result['workers']} workers)"]
+    if result["frames"]:
+        span = result["t_last"] - result["t_first"]
+        lines.append(f"span {span:.1f} s  unknown lines {result['unknown']}  resyncs {result['resyncs']}  "
+                     f"crc errors {result['crc_errors']}")
+    for m in sorted(result["modes"]):
+        s = result["modes"][m]
+        lines.append(f"M{m}: {s['frames']} frames, {s['bad']} bad, mean interval {s['interval_mean'] * 1e3:.1f} ms")
+        for name, f in s["fields"].items():
+            lines.append(f"    {name:13s} min {f['min']:9.2f}  max {f['max']:9.2f}  mean {f['mean']:9.3f}")
+            if "toggles" in f:
+                bits = " ".join(f"{c}" for c in reversed(f["toggles"]))
+                lines.append(f"    {'':13s} toggles {sum(f['toggles'])}  per bit 15..0: {bits}")
+    lines.append(f"gaps > {GAP_FACTOR * result['period']:.2f} s: {result['gap_count']}, {result['gap_time']:.1f} s total")
+    for t, dt, mode in result["gaps"]:
+        lines.append(f"    at {t - result['t_first']:10.3f} s  {dt:8.3f} s  (next M{mode})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="analyze", description="Statistics over a capture file")
+    ap.add_argument("capture")
+    ap.add_argument("--workers", type=int, help="processes (default: CPU count)")
+    ap.add_argument("--chunk", type=parse_size, help="range size, e.g. 64M (default: auto)")
+    ap.add_argument("--period", type=float, default=PERIOD, help="expected line interval (s)")
+    ap.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = ap.parse_args(argv)
+
+    result = analyze(args.capture, args.workers, args.chunk, args.period)
+    if args.json:
+        json.dump(result, sys.stdout, indent=1)
+        print()
+    else:
+        print(format_report(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capture analyzer benchmark and self-check: a synthetic soak-test capture
+(ASCII and binary) is analyzed with 1..N workers and compared with a
+sequential replay through TelemetryEngine.feed()
+
+    python benchmarks/bench_analyze.py [--lines 1000000] [--workers 4]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+
+from analyze import PERIOD, VALUE_FIELDS, analyze, merge, summarize  # noqa: E402
+from binframe import FrameSimulator  # noqa: E402
+from capture import CaptureReader, CaptureWriter  # noqa: E402
+from telemetry import TelemetryEngine  # noqa: E402
+
+
+def make_text_capture(path, lines, seed=0):
+    """Soak-test session: one line per 0.5 s, mode changes, dropouts, noise."""
+    rng = random.Random(seed)
+    out = bytearray()
+    mode = 0
+    sw = 0
+    for i in range(lines):
+        if rng.random() < 0.001:
+            mode = rng.randrange(5)
+        if rng.random() < 0.05:
+            sw ^= 1 << rng.randrange(16)
+        x, y, z = rng.randint(-512, 511), rng.randint(-512, 511), rng.randint(-512, 511)
+        if mode == 0:
+            out += b"M0:X=%+04d Y=%+04d Z=%+04d\r\n" % (x, y, z)
+        elif mode == 1:
+            out += b"M1:T=%d.%02dC\r\n" % (rng.randint(20, 40), rng.randrange(100))
+        elif mode == 2:
+            out += b"M2:SW=%04X\r\n" % sw
+        elif mode == 3:
+            out += b"M3:RX=%02X L=%04X\r\n" % (rng.randrange(256), rng.randrange(65536))
+        else:
+            out += b"M4:X=%+04d T=%dC S=%04X\r\n" % (x, rng.randint(20, 40), sw)
+        if rng.random() < 0.0005:
+            out += b"M1:T=garbage\r\n" + bytes(rng.randrange(256) for _ in range(300))
+    _write_chunks(path, bytes(out), lines, binary=False, seed=seed)
+
+
+def make_binary_capture(path, frames, seed=0):
+    sim = FrameSimulator(seed=seed, corrupt=0.0005)
+    _write_chunks(path, sim.stream(frames), frames, binary=True, seed=seed)
+
+
+def _write_chunks(path, stream, count, binary, seed):
+    """One record per PERIOD as the board sends it, some split in two, occasional dropouts."""
+    rng = random.Random(seed + 1)
+    writer = CaptureWriter(path, binary=binary)
+    t = 1000.0
+    pos = 0
+    while pos < len(stream):
+        end = pos + 16 if binary else stream.find(b"\n", pos) + 1 or len(stream)
+        t += PERIOD + rng.uniform(-0.002, 0.002)
+        if rng.random() < 0.0002:
+            t += rng.uniform(1.0, 30.0)
+        if rng.random() < 0.1:
+            cut = rng.randint(pos + 1, end)
+            writer.write(stream[pos:cut], t - 0.001)
+            pos = cut
+        writer.write(stream[pos:end], t)
+        pos = end
+    writer.close()
+
+
+def reference(path):
+    """Sequential replay through the live engine, same statistics code."""
+    reader = CaptureReader(path)
+    engine = TelemetryEngine(binary=reader.binary)
+    frames = []
+    engine.subscribe("frame", frames.append)
+    for t, data in reader.records():
+        engine.feed(bytes(data), t)
+    reader.close()
+
+    cols = {"t": np.array([f.t_rx for f in frames]),
+            "mode": np.array([f.mode for f in frames], dtype=np.uint8),
+            "ok": np.array([f.ok for f in frames], dtype=bool)}
+    for name in VALUE_FIELDS:
+        cols[name] = np.array([f.fields.get(name, np.nan) for f in frames], dtype=np.float64)
+    if reader.binary:
+        counters = {"lines": 0, "unknown": 0, "resyncs": engine.decoder.resyncs,
+                    "crc_errors": engine.decoder.crc_errors}
+    else:
+        lines = engine.framer.lines
+        counters = {"lines": lines, "unknown": lines - len(frames), "resyncs": engine.framer.resyncs,
+                    "crc_errors": 0}
+    return merge([summarize(cols, counters)])
+
+
+def compare(result, ref):
+    for key in ("frames", "unknown", "gap_count", "gaps", "t_first", "t_last"):
+        assert result[key] == ref[key], (key, result[key], ref[key])
+    assert abs(result["gap_time"] - ref["gap_time"]) < 1e-6
+    assert result["modes"].keys() == ref["modes"].keys()
+    for m, s in ref["modes"].items():
+        r = result["modes"][m]
+        assert (r["frames"], r["bad"], r["interval_count"]) == (s["frames"], s["bad"], s["interval_count"]), m
+        assert abs(r["interval_mean"] - s["interval_mean"]) < 1e-9
+        assert r["fields"].keys() == s["fields"].keys()
+        for name, f in s["fields"].items():
+            g = r["fields"][name]
+            for key in ("count", "min", "max", "first", "last", "toggles"):
+                assert g.get(key) == f.get(key), (m, name, key)
+            assert abs(g["mean"] - f["mean"]) <= 1e-9 * max(1.0, abs(f["mean"]))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=1_000_000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, make, count in (("text", make_text_capture, args.lines),
+                                  ("binary", make_binary_capture, args.lines)):
+            path = os.path.join(tmp, f"{kind}.cap")
+            make(path, count)
+            size = os.path.getsize(path)
+            t0 = time.perf_counter()
+            ref = reference(path)
+            t_ref = time.perf_counter() - t0
+            print(f"{kind}: {size / 2**20:.1f} MiB, {ref['frames']} frames, gaps {ref['gap_count']}")
+            print(f"  engine replay      {t_ref:7.2f} s")
+
+            # Small ranges so boundaries are exercised even on one core
+            chunk = max(size // 16, 64 << 10)
+            for workers in sorted({1, args.workers}):
+                t0 = time.perf_counter()
+                result = analyze(path, workers, chunk_bytes=chunk)
+                dt = time.perf_counter() - t0
+                compare(result, ref)
+                print(f"  {workers} worker(s) {result['ranges']:3d} ranges {dt:7.2f} s "
+                      f"{size / dt / 2**20:7.1f} MiB/s  matches replay")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Binary frame decoder benchmark + self-check, using the host-side simulator
+
+    python benchmarks/bench_binframe.py [--frames 200000] [--corrupt 0.01] [--drop 0.01]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import binframe  # noqa: E402
+from binframe import FRAME_SIZE, BinaryDecoder, FrameSimulator  # noqa: E402
+
+
+BAUD_BYTES = 115200 / 10    # 8N1
+ASCII_M0_BYTES = 25         # "M0:X=+123 Y=-004 Z=+255\r\n"
+
+
+def run(data, chunk, method):
+    decoder = BinaryDecoder()
+    count = 0
+    t0 = time.perf_counter()
+    for i in range(0, len(data), chunk):
+        count += len(getattr(decoder, method)(data[i:i + chunk]))
+    return decoder, count, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--frames", type=int, default=200_000)
+    ap.add_argument("--corrupt", type=float, default=0.01)
+    ap.add_argument("--drop", type=float, default=0.01)
+    ap.add_argument("--chunk", type=int, default=4093)
+    args = ap.parse_args()
+
+    sim = FrameSimulator(corrupt=args.corrupt, drop=args.drop, seed=1)
+    data = sim.stream(args.frames)
+
+    methods = ["feed"]
+    if binframe.np is not None:
+        methods.append("feed_array")
+    for method in methods:
+        decoder, count, dt = run(data, args.chunk, method)
+        # Every intact frame decoded, every missing one detected
+        assert count == sim.sent - sim.corrupted, (count, sim.sent, sim.corrupted)
+        assert decoder.lost == sim.dropped + sim.corrupted, (decoder.lost, sim.dropped, sim.corrupted)
+        print(f"{method:10s} {count:8d} frames {dt * 1000:8.1f} ms {count / dt:12,.0f} frames/s"
+              f"  lost={decoder.lost} crc_errors={decoder.crc_errors}")
+
+    print(f"link limit at 115200 baud: binary {BAUD_BYTES / FRAME_SIZE:.0f} frames/s "
+          f"(X/Y/Z/T/SW/LED), ASCII M0 {BAUD_BYTES / ASCII_M0_BYTES:.0f} lines/s (X/Y/Z)")
+
+
+if __name__ == "__main__":
+    main()
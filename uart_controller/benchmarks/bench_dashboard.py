@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard benchmark and self-check on loopback: several boards fed flat
+out, many WebSocket viewers (a raw-socket client, no library) plus one
+that stops reading. Checks that every viewer's delta-applied state ends
+equal to the boards', that sample batches are contiguous, that the
+stalled viewer's server-side backlog stays bounded and it gets one
+coalesced catch-up, and that LED commands reach the TX queue. Reports
+reader-side cost per frame with and without viewers.
+
+    python benchmarks/bench_dashboard.py [--boards 4] [--clients 8] [--rate 500]
+"""
+
+import argparse
+import base64
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dashboard import (CLIENT_HIGH_WATER, OP_CLOSE, OP_TEXT, Dashboard,  # noqa: E402
+                       EngineBoard, accept_key)
+from telemetry import TelemetryEngine  # noqa: E402
+from txqueue import TxQueue  # noqa: E402
+
+INTERVAL = 0.05
+STALL = 2.0
+
+
+def make_lines(n, board):
+    out = []
+    for i in range(n):
+        mode = (i // 20) % 5
+        v = (i * 37 + board * 101) % 2000 - 1000
+        if mode == 0:
+            out.append(b"M0:X=%+04d Y=%+04d Z=%+04d\r\n" % (v, -v // 2, 1000 + v // 10))
+        elif mode == 1:
+            out.append(b"M1:T=%d.%02dC\r\n" % (25 + i % 7, i % 100))
+        elif mode == 2:
+            out.append(b"M2:SW=%04X\r\n" % ((i * 13 + board) & 0xFFFF))
+        elif mode == 3:
+            out.append(b"M3:RX=%02X L=%04X\r\n" % (i & 0xFF, (i * 7) & 0xFFFF))
+        else:
+            out.append(b"M4:X=%+04d T=%dC S=%04X\r\n" % (v, 25 + i % 7, i & 0xFFFF))
+    return out
+
+
+# ============================================================================
+# Minimal client
+# ============================================================================
+class WsClient:
+    def __init__(self, port, rcvbuf=None):
+        sock = socket.socket()
+        if rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        sock.connect(("127.0.0.1", port))
+        key = base64.b64encode(os.urandom(16)).decode()
+        sock.sendall((f"GET /ws HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                      f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        self.sock = sock
+        self.buf = b""
+        head = self._until(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 101") and accept_key(key).encode() in head, head
+        self.state = {}
+        self.next_seq = {}
+        self.messages = 0
+        self.catch_ups = 0
+        self.gaps = 0
+        self.largest = 0
+
+    def _until(self, marker):
+        while marker not in self.buf:
+            self._fill()
+        head, self.buf = self.buf.split(marker, 1)
+        return head
+
+    def _fill(self):
+        data = self.sock.recv(65536)
+        if not data:
+            raise ConnectionError("closed")
+        self.buf += data
+
+    def _take(self, n):
+        while len(self.buf) < n:
+            self._fill()
+        data, self.buf = self.buf[:n], self.buf[n:]
+        return data
+
+    def recv(self):
+        b0, b1 = self._take(2)
+        n = b1 & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", self._take(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", self._take(8))[0]
+        return b0 & 0x0F, self._take(n)
+
+    def send(self, payload, opcode=OP_TEXT, fragments=1):
+        step = max(1, -(-len(payload) // fragments))
+        chunks = [payload[i:i + step] for i in range(0, len(payload), step)]
+        for i, chunk in enumerate(chunks):
+            mask = os.urandom(4)
+            op = opcode if i == 0 else 0
+            fin = 0x80 if i == len(chunks) - 1 else 0
+            masked = bytes(b ^ mask[j % 4] for j, b in enumerate(chunk))
+            self.sock.sendall(struct.pack("!BB", fin | op, 0x80 | len(chunk)) + mask + masked)
+
+    def message(self):
+        opcode, payload = self.recv()
+        if opcode == OP_CLOSE:
+            raise ConnectionError("closed by the server")
+        assert opcode == OP_TEXT, opcode
+        self.largest = max(self.largest, len(payload))
+        m = json.loads(payload)
+        self.messages += 1
+        if m["type"] in ("hello", "update"):
+            if m.get("coalesced"):
+                self.catch_ups += 1
+            for name, entry in m["boards"].items():
+                self.state.setdefault(name, {}).update(entry.get("state", {}))
+                s = entry.get("samples")
+                if s:
+                    first, stop = s["seq"]
+                    if name in self.next_seq and first != self.next_seq[name]:
+                        self.gaps += 1
+                    self.next_seq[name] = stop
+                    assert len(s["t"]) == len(s["min"]["accel_x"]) and len(s["t"]) <= 600
+        return m
+
+    def close(self):
+        """Close handshake; the reply is left to a reader thread if there is one."""
+        self.send(struct.pack("!H", 1000), OP_CLOSE)
+        self.sock.shutdown(socket.SHUT_WR)
+
+
+# ============================================================================
+# Checks
+# ============================================================================
+def feed_cost(lines, board):
+    engine = TelemetryEngine()
+    if board:
+        EngineBoard("x", engine)
+    t0 = time.perf_counter()
+    for line in lines:
+        engine.feed(line, 0.0)
+    return (time.perf_counter() - t0) / len(lines)
+
+
+def check_http(port):
+    base = f"http://127.0.0.1:{port}"
+    page = urllib.request.urlopen(base + "/").read()
+    assert b"new WebSocket" in page
+    state = json.loads(urllib.request.urlopen(base + "/state").read())
+    try:
+        urllib.request.urlopen(base + "/nope")
+        raise AssertionError("404 expected")
+    except urllib.error.HTTPError as e:
+        assert e.code == 404
+    return state
+
+
+def check_leds(port, writes):
+    c = WsClient(port)
+    assert c.message()["type"] == "hello"
+
+    def reply():
+        while True:
+            m = c.message()
+            if m["type"] != "update":
+                return m
+
+    c.send(json.dumps({"type": "led", "board": "b0", "value": 0x1234}).encode(), fragments=3)
+    assert reply() == {"type": "ack", "board": "b0", "value": 0x1234}
+    for bad in ({"type": "led", "board": "b1", "value": 1},          # read-only board
+                {"type": "led", "board": "b0", "value": 0x10000},
+                {"type": "led", "board": "b0", "value": True},
+                {"type": "led", "board": "nope", "value": 1},
+                {"type": "blink"}):
+        c.send(json.dumps(bad).encode())
+        assert reply()["type"] == "error", bad
+    c.send(b"ping!", 0x9)
+    while True:
+        opcode, payload = c.recv()
+        if opcode == 0xA:
+            break
+    assert payload == b"ping!"
+    c.close()
+    while c.recv()[0] != OP_CLOSE:
+        pass
+    c.sock.close()
+    deadline = time.monotonic() + 2
+    while b"".join(writes) != b"\x34\x12" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert b"".join(writes) == b"\x34\x12", writes
+
+
+def run(n_boards, n_clients, rate, seconds):
+    lines = [make_lines(20000, b) for b in range(n_boards)]
+    alone = feed_cost(lines[0], False)
+    attached = feed_cost(lines[0], True)
+
+    engines = [TelemetryEngine() for _ in range(n_boards)]
+    writes = []
+    tx = TxQueue(writes.append, pace=False).start()
+    boards = [EngineBoard(f"b{i}", e, tx.set_leds if i == 0 else None) for i, e in enumerate(engines)]
+    dashboard = Dashboard(boards, port=0, interval=INTERVAL).start()
+    port = dashboard.port
+
+    stop = threading.Event()
+    fed = [0]
+    feed_time = [0.0]
+
+    def feeder():
+        t_next = time.monotonic()
+        i = 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            for engine, board_lines in zip(engines, lines):
+                engine.feed(board_lines[i % len(board_lines)], time.monotonic())
+            feed_time[0] += time.perf_counter() - t0
+            fed[0] += 1
+            i += 1
+            t_next += 1.0 / rate
+            time.sleep(max(0.0, t_next - time.monotonic()))
+
+    feed_thread = threading.Thread(target=feeder, daemon=True)
+    feed_thread.start()
+    time.sleep(1.0)
+    idle = feed_time[0] / (fed[0] * n_boards)
+    base_frames, base_busy = fed[0], feed_time[0]
+
+    clients = [WsClient(port) for _ in range(n_clients)]
+    readers = []
+
+    def reader(c):
+        try:
+            while True:
+                c.message()
+        except (ConnectionError, OSError):
+            pass
+
+    for c in clients:
+        t = threading.Thread(target=reader, args=(c,), daemon=True)
+        t.start()
+        readers.append(t)
+    slow = WsClient(port, rcvbuf=4096)
+
+    # Slow viewer reads nothing for STALL seconds
+    time.sleep(0.5)
+    peak = 0
+    t_end = time.monotonic() + STALL
+    while time.monotonic() < t_end:
+        for client in list(dashboard.clients):
+            peak = max(peak, client.buffered())
+        time.sleep(0.01)
+    coalesced = dashboard.coalesced
+    threading.Thread(target=reader, args=(slow,), daemon=True).start()
+    time.sleep(max(0.0, seconds - STALL - 0.5))
+    live = (feed_time[0] - base_busy) / ((fed[0] - base_frames) * n_boards)
+    stop.set()
+    feed_thread.join()
+    time.sleep(6 * INTERVAL)
+
+    check_http(port)
+    check_leds(port, writes)
+    truth = {b.name: b.snapshot() for b in boards}
+    stats = dashboard.stats()
+    for c in clients + [slow]:
+        assert c.state == truth, (c.state, truth)
+        c.close()
+    dashboard.stop()
+    tx.stop()
+    for t in readers:
+        t.join(1.0)
+        assert not t.is_alive()
+
+    per = stats["bytes"] / max(1, stats["messages"])
+    print(f"reader cost: feed {alone * 1e6:.2f} us/frame, with EngineBoard {attached * 1e6:.2f} us/frame; "
+          f"live {idle * 1e6:.2f} us/frame with no viewers, {live * 1e6:.2f} us/frame with {n_clients + 1} "
+          f"(wall time, shares the GIL with the client threads of this process)")
+    print(f"{n_boards} boards x {rate} frames/s, {n_clients} fast viewers + 1 stalled for {STALL:.0f} s: "
+          f"{stats['ticks']} ticks, last tick {stats['tick_seconds'] * 1e3:.2f} ms, "
+          f"{stats['messages']} messages ({per:.0f} B avg)")
+    print(f"stalled viewer: peak backlog {peak / 1024:.0f} KiB (high water {CLIENT_HIGH_WATER // 1024} KiB), "
+          f"{coalesced} updates coalesced into {slow.catch_ups} catch-up(s), sample gaps {slow.gaps}; "
+          f"fast viewers: {sum(c.gaps for c in clients)} gaps, "
+          f"{sum(bool(c.catch_ups) for c in clients)} needed a catch-up")
+    assert coalesced > 0 and slow.catch_ups >= 1
+    assert slow.gaps == 0 and all(c.gaps == 0 for c in clients)
+    # Over high water by at most the update that crossed it (not a queue)
+    assert peak <= CLIENT_HIGH_WATER + max(c.largest for c in clients) + 16, peak
+    print("states equal the boards' on every viewer; LED command reached the TX queue")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--boards", type=int, default=4)
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--rate", type=float, default=500.0, help="frames/s per board")
+    ap.add_argument("--seconds", type=float, default=4.0)
+    args = ap.parse_args()
+    run(args.boards, args.clients, args.rate, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet benchmark - N virtual boards in a child process, one Fleet thread here;
+reports frames/s and CPU used by this process
+
+    python benchmarks/bench_fleet.py [--boards 64] [--period 0.01] [--seconds 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, HERE)
+
+from fleet import Fleet  # noqa: E402
+
+CHILD = """
+import sys, time
+sys.path.insert(0, {here!r})
+from virtualboard import VirtualBoard
+boards = [VirtualBoard(mode=i % 5, period={period}, seed=i).start() for i in range({count})]
+print(" ".join(b.port for b in boards), flush=True)
+sys.stdin.read()
+"""
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--boards", type=int, default=64)
+    ap.add_argument("--period", type=float, default=0.01, help="seconds between lines per board")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    args = ap.parse_args()
+
+    child = subprocess.Popen(
+        [sys.executable, "-c", CHILD.format(here=HERE, period=args.period, count=args.boards)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        ports = child.stdout.readline().split()
+        fleet = Fleet()
+        for port in ports:
+            fleet.add(port)
+        fleet.start()
+        time.sleep(0.5)
+        fleet.stats()
+
+        cpu0 = time.process_time()
+        t0 = time.monotonic()
+        time.sleep(args.seconds)
+        cpu = time.process_time() - cpu0
+        wall = time.monotonic() - t0
+        stats = fleet.stats()
+        fleet.stop()
+    finally:
+        child.stdin.close()
+        child.wait()
+
+    assert stats["connected"] == args.boards, stats
+    print(f"{args.boards} boards, {stats['frames_per_s']:,.0f} frames/s, errors={stats['errors']}, "
+          f"fleet CPU {cpu / wall:.1%} of one core "
+          f"({cpu / max(1, stats['frames_per_s'] * wall) * 1e6:.1f} us/frame)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Framer burst benchmark + self-check
+Feeds multi-MB bursts through the old str/split('\\n', 1) buffer and RingFramer.
+
+    python benchmarks/bench_framer.py [--mb 4] [--chunk 4096]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from framer import RingFramer  # noqa: E402
+
+
+SAMPLE_LINES = [
+    b"M0:X=+123 Y=-004 Z=+255\r\n",
+    b"M1:T=25.75C\r\n",
+    b"M2:SW=A5F0\r\n",
+    b"M3:RX=12 L=3412\r\n",
+    b"M4:X=-010 T=26C S=00FF\r\n",
+]
+
+
+def make_burst(size):
+    out = bytearray()
+    i = 0
+    while len(out) < size:
+        out += SAMPLE_LINES[i % len(SAMPLE_LINES)]
+        i += 1
+    return bytes(out), i
+
+
+def chunks(data, chunk):
+    return [data[i:i + chunk] for i in range(0, len(data), chunk)]
+
+
+def legacy_frame(parts):
+    """Old rx_loop/process_rx_buffer path."""
+    rx_buffer = ""
+    count = 0
+    for data in parts:
+        rx_buffer += data.decode('ascii', errors='replace')
+        while '\n' in rx_buffer:
+            line, rx_buffer = rx_buffer.split('\n', 1)
+            if line.strip():
+                count += 1
+    return count
+
+
+def ring_views(parts):
+    framer = RingFramer()
+    count = 0
+    for data in parts:
+        for _ in framer.feed(data):
+            count += 1
+    return count
+
+
+def ring_split(parts):
+    framer = RingFramer()
+    count = 0
+    for data in parts:
+        count += len(framer.split(data))
+    return count
+
+
+def check_garbage():
+    noise = bytes(random.Random(1).randrange(33, 256) for _ in range(5000))
+    stream = SAMPLE_LINES[0] + noise + b"\n" + SAMPLE_LINES[1] + b"\r\n\r\n" + SAMPLE_LINES[2]
+    expected = [line.strip() for line in SAMPLE_LINES[:3]]
+    for chunk in (1, 97, 4096, len(stream)):
+        for mode in ("feed", "split"):
+            framer = RingFramer(capacity=1024, max_line=64)
+            lines = []
+            for part in chunks(stream, chunk):
+                if mode == "feed":
+                    lines += [bytes(v) for v in framer.feed(part)]
+                else:
+                    lines += framer.split(part)
+            assert lines == expected, (chunk, mode, lines)
+            assert framer.resyncs == 1, (chunk, mode, framer.resyncs)
+            assert framer.dropped_bytes == len(noise) + 1, (chunk, mode, framer.dropped_bytes)
+            assert framer.pending == 0
+
+
+def bench(name, func, parts, expected):
+    t0 = time.perf_counter()
+    count = func(parts)
+    dt = time.perf_counter() - t0
+    assert count == expected, (name, count, expected)
+    total = sum(len(p) for p in parts)
+    print(f"{name:8s} {count:9d} lines  {dt * 1000:9.1f} ms  {total / dt / 1e6:8.2f} MB/s")
+    return dt
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--mb", type=float, default=4.0, help="burst size in MB")
+    ap.add_argument("--chunk", type=int, default=4096, help="read size per feed()")
+    args = ap.parse_args()
+
+    check_garbage()
+
+    data, expected = make_burst(int(args.mb * 1024 * 1024))
+    # Chunks that do not line up with line boundaries
+    parts = chunks(data, args.chunk)
+    whole = [data]
+
+    print(f"burst {len(data) / 1e6:.1f} MB, {expected} lines")
+    bench("views", ring_views, parts, expected)
+    bench("split", ring_split, parts, expected)
+    bench("split/1", ring_split, whole, expected)
+    bench("legacy", legacy_frame, parts, expected)
+    # Whole burst in one read is the quadratic case; keep it small
+    small = [data[:256 * 1024]]
+    small_expected = ring_split(small)
+    bench("legacy/1", legacy_frame, small, small_expected)
+
+
+if __name__ == "__main__":
+    main()
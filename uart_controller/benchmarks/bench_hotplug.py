@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hotplug / reconnect benchmark and self-check with virtual boards: a board
+is "unplugged" (pty closed, device node removed) and "replugged" under a
+new device path with the same serial number, as a power-cycled FT2232
+re-enumerates. Reports the gap from replug to the first frame versus the
+board's own first line, checks that state and subscribers carry on, and
+times engine.close() / PortMonitor.stop() from inside a backoff wait.
+
+    python benchmarks/bench_hotplug.py [--cycles 3] [--period 0.05]
+POSIX only (virtual boards are ptys).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from serial.tools.list_ports_common import ListPortInfo  # noqa: E402
+
+from hotplug import BACKOFF_MAX, POLL_INTERVAL, PortMonitor, Supervisor, board_key  # noqa: E402
+from telemetry import TelemetryEngine  # noqa: E402
+from virtualboard import VirtualBoard  # noqa: E402
+
+SERIAL_NUMBER = "210292A0BEEF"
+
+
+class FakeBus:
+    """comports() stand-in plus a directory of fake device nodes."""
+
+    def __init__(self, dev_path):
+        self.dev_path = dev_path
+        self.ports = []
+        self.lock = threading.Lock()
+
+    def plug(self, device, node):
+        info = ListPortInfo(device, skip_link_detection=True)
+        info.serial_number = SERIAL_NUMBER
+        info.location = "1-1:1.1"
+        info.description = "Digilent USB Device"
+        with self.lock:
+            self.ports.append(info)
+        open(os.path.join(self.dev_path, node), "w").close()
+
+    def unplug(self, device, node):
+        with self.lock:
+            self.ports = [p for p in self.ports if p.device != device]
+        os.unlink(os.path.join(self.dev_path, node))
+
+    def comports(self):
+        with self.lock:
+            return list(self.ports)
+
+
+def run_cycles(cycles, period):
+    with tempfile.TemporaryDirectory() as dev:
+        bus = FakeBus(dev)
+        board = VirtualBoard(mode=0, period=period)
+        board.start()
+        bus.plug(board.port, "ttyUSB1")
+        monitor = PortMonitor(list_func=bus.comports, dev_path=dev).start()
+        while monitor.info(board.port) is None:
+            time.sleep(0.01)
+
+        engine = TelemetryEngine(board.port)
+        supervisor = Supervisor(engine, monitor)
+        assert supervisor.key == (SERIAL_NUMBER, "1.1"), supervisor.key
+        frames = []
+        events = []
+        engine.subscribe("frame", lambda f: frames.append(f.t_rx))
+        engine.subscribe("lost", lambda e: events.append(("lost", time.monotonic())))
+        engine.subscribe("restored", lambda p: events.append(("restored", time.monotonic())))
+        engine.open()
+        time.sleep(10 * period)
+
+        for cycle in range(cycles):
+            node = f"ttyUSB{cycle % 2}"
+            old_board, old_node = board, f"ttyUSB{(cycle + 1) % 2}"
+            rx_before = engine.state.rx_count
+            board.close()
+            bus.unplug(old_board.port, old_node)
+            t_unplug = time.monotonic()
+            time.sleep(0.5)                 # board is off
+
+            board = VirtualBoard(mode=0, period=period)
+            board.start()
+            bus.plug(board.port, node)
+            t_plug = time.monotonic()
+            n_before = len(frames)
+            while len(frames) == n_before and time.monotonic() - t_plug < 10:
+                time.sleep(0.001)
+            assert len(frames) > n_before, "no frames after replug"
+            t_first = frames[n_before]
+            # The virtual board itself sends its first line after one period
+            print(f"cycle {cycle}: lost after {events[-2][1] - t_unplug:.3f} s, "
+                  f"first frame {t_first - t_plug:.3f} s after replug "
+                  f"(board's own first line: {period:.3f} s, poll {POLL_INTERVAL:.2f} s), "
+                  f"port {engine.port}")
+            assert [e for e, _ in events[-2:]] == ["lost", "restored"], events
+            assert t_first - t_plug < period + POLL_INTERVAL + 0.25, t_first - t_plug
+            assert engine.state.rx_count > rx_before, "state was reset"
+            time.sleep(5 * period)
+
+        # Shutdown from inside a long backoff wait must not wait it out
+        board.close()
+        bus.unplug(board.port, node)
+        while not events or events[-1][0] != "lost":
+            time.sleep(0.001)
+        time.sleep(BACKOFF_MAX / 2)
+        t0 = time.monotonic()
+        engine.close()
+        t_close = time.monotonic() - t0
+        t0 = time.monotonic()
+        monitor.stop()
+        t_stop = time.monotonic() - t0
+        supervisor.detach()
+        print(f"engine.close() during backoff {t_close * 1e3:.1f} ms, monitor.stop() {t_stop * 1e3:.1f} ms; "
+              f"{supervisor.losses} losses, {supervisor.restores} restores, {supervisor.attempts} attempts, "
+              f"{monitor.polls} polls / {monitor.scans} scans")
+        assert t_close < 0.1 and t_stop < 0.1
+        assert supervisor.restores == cycles and engine.rx_thread is None
+
+
+def bench_poll(rounds=2000):
+    monitor = PortMonitor()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        monitor.poll()
+    dt = (time.perf_counter() - t0) / rounds
+    t0 = time.perf_counter()
+    for _ in range(20):
+        monitor.scan()
+    scan = (time.perf_counter() - t0) / 20
+    print(f"poll of /dev {dt * 1e6:.0f} us ({monitor.scans - 20} scans in {rounds} polls), "
+          f"comports() scan {scan * 1e3:.2f} ms, {len(monitor.devices())} ports, "
+          f"keys {[board_key(monitor.info(d)) for d in monitor.devices()][:4]}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cycles", type=int, default=3)
+    ap.add_argument("--period", type=float, default=0.05)
+    args = ap.parse_args()
+
+    bench_poll()
+    run_cycles(args.cycles, args.period)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parser microbenchmark - lines/sec per mode, old regex chain vs frame_parser
+
+    python benchmarks/bench_parser.py [--lines 200000] [--repeat 5]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from frame_parser import parse_batch  # noqa: E402
+from framer import RingFramer  # noqa: E402
+
+
+MODE_LINES = {
+    0: "M0:X=+123 Y=-004 Z=+255",
+    1: "M1:T=25.75C",
+    2: "M2:SW=A5F0",
+    3: "M3:RX=12 L=3412",
+    4: "M4:X=-010 T=26C S=00FF",
+}
+
+# Not what TOP.v writes (other widths, lower case, corrupted bytes): the
+# regex fallback must give what the old parser gave
+ODD_LINES = [
+    b"M0:X=+1 Y=-4 Z=+255", b"M0:X=+123 Y=-0#4 Z=+255", b"M1:T=5.5C", b"M1:T=25.75F",
+    b"M2:SW=a5f0", b"M2:SW=A5G0", b"M3:L=3412", b"M3:RX=12 L=34", b"M4:X=-010 T=2xC S=00FF",
+    b"M4:X=-010 T=26C S=00F", b"M4: X=+5 T=26C S=1234", b"M5:X=1", b"garbage",
+]
+
+
+def legacy_parse(line, state):
+    """Old FPGAIntegratedGUI.parse_rx_line, minus the log_msg() Tk insert."""
+    if line.startswith("M0:"):
+        state["mode"] = 0
+        match = re.search(r'X=([+-]?\d+)\s+Y=([+-]?\d+)\s+Z=([+-]?\d+)', line)
+        if match:
+            state["accel_x"] = int(match.group(1))
+            state["accel_y"] = int(match.group(2))
+            state["accel_z"] = int(match.group(3))
+    elif line.startswith("M1:"):
+        state["mode"] = 1
+        match = re.search(r'T=(\d+)\.(\d+)C', line)
+        if match:
+            state["temperature"] = int(match.group(1)) + int(match.group(2)) / 100.0
+    elif line.startswith("M2:"):
+        state["mode"] = 2
+        match = re.search(r'SW=([0-9A-Fa-f]{4})', line)
+        if match:
+            state["switch_value"] = int(match.group(1), 16)
+    elif line.startswith("M3:"):
+        state["mode"] = 3
+        match = re.search(r'L=([0-9A-Fa-f]{4})', line)
+        if match:
+            state["pc_led_value"] = int(match.group(1), 16)
+    elif line.startswith("M4:"):
+        state["mode"] = 4
+        match_x = re.search(r'X=([+-]?\d+)', line)
+        if match_x:
+            state["accel_x"] = int(match_x.group(1))
+        match_t = re.search(r'T=(\d+)C', line)
+        if match_t:
+            state["temperature"] = float(match_t.group(1))
+        match_s = re.search(r'S=([0-9A-Fa-f]{4})', line)
+        if match_s:
+            state["switch_value"] = int(match_s.group(1), 16)
+
+
+def run_legacy(lines):
+    state = {}
+    for raw in lines:
+        # Old path decoded every line to str before parsing
+        legacy_parse(raw.decode('ascii', errors='replace'), state)
+    return state
+
+
+def run_batch(lines):
+    state = {}
+    for frame in parse_batch(lines, 0.0):
+        state["mode"] = frame.mode
+        state.update(frame.fields)
+    return state
+
+
+def rx_path_legacy(parts):
+    """Old rx_loop + process_rx_buffer + parse_rx_line (without Tk)."""
+    state = {}
+    rx_buffer = ""
+    for data in parts:
+        rx_buffer += data.decode('ascii', errors='replace')
+        while '\n' in rx_buffer:
+            line, rx_buffer = rx_buffer.split('\n', 1)
+            line = line.strip()
+            if line:
+                legacy_parse(line, state)
+    return state
+
+
+def rx_path_new(parts):
+    """RingFramer.split + parse_batch, as TelemetryEngine.feed does."""
+    state = {}
+    framer = RingFramer()
+    for data in parts:
+        for frame in parse_batch(framer.split(data), 0.0):
+            state["mode"] = frame.mode
+            state.update(frame.fields)
+    return state
+
+
+def best_rate(func, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(lines)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return len(lines) / best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=15)
+    args = ap.parse_args()
+
+    print(f"{'mode':6s} {'legacy l/s':>12s} {'batch l/s':>12s} {'speedup':>8s}")
+    mixed = []
+    for mode, text in MODE_LINES.items():
+        lines = [text.encode('ascii')] * args.lines
+        mixed += lines[:args.lines // len(MODE_LINES)]
+        # Both paths must agree before we time them
+        assert run_legacy(lines[:1]) == run_batch(lines[:1]), mode
+        old = best_rate(run_legacy, lines, args.repeat)
+        new = best_rate(run_batch, lines, args.repeat)
+        print(f"M{mode:<5d} {old:12,.0f} {new:12,.0f} {new / old:7.2f}x")
+
+    assert run_legacy(mixed) == run_batch(mixed)
+    for line in ODD_LINES:
+        assert run_legacy([line]) == run_batch([line]), line
+    old = best_rate(run_legacy, mixed, args.repeat)
+    new = best_rate(run_batch, mixed, args.repeat)
+    print(f"{'mixed':6s} {old:12,.0f} {new:12,.0f} {new / old:7.2f}x")
+
+    # Whole RX path on a burst read in 4 KB chunks
+    burst = b"".join(line + b"\r\n" for line in mixed)
+    parts = [burst[i:i + 4096] for i in range(0, len(burst), 4096)]
+    assert rx_path_legacy(parts) == rx_path_new(parts)
+    old = best_rate(rx_path_legacy, parts, args.repeat) * len(mixed) / len(parts)
+    new = best_rate(rx_path_new, parts, args.repeat) * len(mixed) / len(parts)
+    print(f"{'rx':6s} {old:12,.0f} {new:12,.0f} {new / old:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+History plot benchmark and self-check without a display: the Monitor tab
+plots (plotview.TracePlot / BitPlot over a decimate.BucketCache) drawn
+into a stand-in Canvas that hands every coords list to a real Tcl
+interpreter, over hours of samples. Reports the first draw, the cost per
+60 fps frame while samples stream in, and a naive every-sample redraw;
+checks the buckets against a brute-force reduction and that one-sample
+spikes and switch toggles survive decimation.
+
+    python benchmarks/bench_plots.py [--hours 2.5] [--rate 100] [--columns 790]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tkinter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from decimate import BucketCache  # noqa: E402
+from plotview import (ACCEL_HEIGHT, ACCEL_TRACES, MARGIN, TEMP_HEIGHT, TEMP_TRACES,  # noqa: E402
+                      BitPlot, TracePlot, flat_coords)
+from samplestore import DEFAULT_CAPACITY, SampleStore  # noqa: E402
+
+FPS = 60
+FRAMES = 600
+
+
+class FakeCanvas:
+    """The Canvas calls the plots make; coords lists become Tcl objects as in Tk."""
+
+    def __init__(self):
+        self.tcl = tkinter.Tcl()
+        self.items = 0
+        self.created = 0
+        self.coords_calls = 0
+        self.numbers = 0
+        self.last = {}
+
+    def _new(self):
+        self.items += 1
+        self.created += 1
+        return self.items
+
+    def create_line(self, *args, **options):
+        return self._new()
+
+    def create_text(self, *args, **options):
+        return self._new()
+
+    def coords(self, item, values):
+        # Tk's Canvas.coords flattens the list into one call like this
+        self.numbers += len(self.tcl.call("list", *values))
+        self.coords_calls += 1
+        self.last[item] = values
+
+    def itemconfigure(self, item, **options):
+        pass
+
+
+def synth(n, t0, rate, rng):
+    t = t0 + np.arange(n) / rate
+    phase = t * 0.7
+    return {
+        "t": t,
+        "mode": np.zeros(n, dtype=np.uint8),
+        "accel_x": (600 * np.sin(phase) + rng.normal(0, 20, n)).astype(np.int16),
+        "accel_y": (400 * np.cos(phase) + rng.normal(0, 20, n)).astype(np.int16),
+        "accel_z": (1000 + rng.normal(0, 20, n)).astype(np.int16),
+        "temperature": (30 + 2 * np.sin(t / 600)).astype(np.float32),
+        "switch_value": ((t // 30).astype(np.int64) & 0xFF).astype(np.uint16),
+        "pc_led_value": np.zeros(n, dtype=np.uint16),
+    }
+
+
+def make_plots(store, columns, span):
+    cache = BucketCache(store, ("accel_x", "accel_y", "accel_z", "temperature"),
+                        bitwise=("switch_value",), size=columns, width=span / columns)
+    canvas = FakeCanvas()
+    plots = (TracePlot(canvas, ACCEL_TRACES, ACCEL_HEIGHT), TracePlot(canvas, TEMP_TRACES, TEMP_HEIGHT),
+             BitPlot(canvas))
+    return cache, canvas, plots
+
+
+def draw(cache, plots):
+    if not cache.update():
+        return False
+    columns, slots = cache.view()
+    for plot in plots:
+        plot.draw(cache, columns + MARGIN, slots)
+    return True
+
+
+def brute_force(store, cache):
+    """Buckets recomputed from every sample in the shown range."""
+    width = cache.width
+    first_id = cache.last_id - cache.size + 1
+    cols = store.between(first_id * width, (cache.last_id + 1) * width)
+    ids = np.floor_divide(cols["t"], width).astype(np.int64)
+    columns, slots = cache.view()
+    for column, slot in zip(columns.tolist(), slots.tolist()):
+        sel = ids == first_id + column
+        if not sel.any():
+            continue
+        for name in cache.names:
+            assert cache.lo[name][slot] == cols[name][sel].min(), (name, column)
+            assert cache.hi[name][slot] == cols[name][sel].max(), (name, column)
+        sw = cols["switch_value"][sel]
+        assert cache.lo["switch_value"][slot] == np.bitwise_and.reduce(sw)
+        assert cache.hi["switch_value"][slot] == np.bitwise_or.reduce(sw)
+
+
+def run(hours, rate, columns):
+    rng = np.random.default_rng(0)
+    store = SampleStore(DEFAULT_CAPACITY)
+    total = int(hours * 3600 * rate)
+    t0 = 1000.0
+    chunk = 1 << 18
+    t_fill = time.perf_counter()
+    for start in range(0, total, chunk):
+        n = min(chunk, total - start)
+        store.append_block(synth(n, t0 + start / rate, rate, rng))
+    t_fill = time.perf_counter() - t_fill
+    t_now = t0 + total / rate
+    held = len(store)
+    print(f"history: {held} samples held ({held / rate / 3600:.2f} h at {rate:g} Hz, filled in {t_fill:.1f} s), "
+          f"{columns} columns")
+
+    for label, span in (("1 min", 60.0), ("10 min", 600.0), ("1 h", 3600.0)):
+        cache, canvas, plots = make_plots(store, columns, span)
+        t = time.perf_counter()
+        draw(cache, plots)
+        first = time.perf_counter() - t
+        created = canvas.created
+        brute_force(store, cache)
+
+        # Streaming at `rate`, drawn at FPS; every 7th frame has a one-sample spike
+        per_frame = max(1, int(round(rate / FPS)))
+        times = []
+        spikes = 0
+        for frame in range(FRAMES):
+            block = synth(per_frame, t_now, rate, rng)
+            if frame % 7 == 3:
+                block["accel_x"][-1] = 2047
+                spikes += 1
+            store.append_block(block)
+            t_now += per_frame / rate
+            t = time.perf_counter()
+            draw(cache, plots)
+            times.append(time.perf_counter() - t)
+        calls_per_frame = canvas.coords_calls / (FRAMES + 1)
+        numbers_per_frame = canvas.numbers / (FRAMES + 1)
+        assert canvas.created == created, "items created after setup"
+        assert not draw(cache, plots), "redrew without new samples"
+        brute_force(store, cache)
+        columns_now, slots = cache.view()
+        assert cache.hi["accel_x"][slots].max() == 2047, "spike lost"
+        # Switch bits toggle every 30 s: more than one distinct value shown
+        assert len(np.unique(cache.lo["switch_value"][slots])) > 1 or span < 60
+
+        # Naive: every sample of the span as points of one trace
+        window = store.between(t_now - span, t_now + 1)
+        x = np.linspace(MARGIN, MARGIN + columns, len(window["t"]))
+        pts = np.empty((len(x), 2), dtype=np.int32)
+        t = time.perf_counter()
+        pts[:, 0] = x
+        pts[:, 1] = window["accel_x"]
+        canvas.tcl.call("list", *flat_coords(pts))
+        naive_t = (time.perf_counter() - t) * len(ACCEL_TRACES)
+
+        times.sort()
+        print(f"span {label:>6}: first draw {first * 1e3:6.1f} ms; per frame median "
+              f"{times[len(times) // 2] * 1e3:.2f} ms, p99 {times[int(len(times) * 0.99)] * 1e3:.2f} ms "
+              f"({calls_per_frame:.0f} coords calls, {numbers_per_frame:.0f} numbers, "
+              f"{spikes} spikes kept); naive X/Y/Z redraw of {len(window['t'])} samples "
+              f"{naive_t * 1e3:.0f} ms")
+        assert times[len(times) // 2] < 1.0 / FPS / 2, "frame over half the 60 fps budget"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=float, default=2.5)
+    ap.add_argument("--rate", type=float, default=100.0, help="samples/s")
+    ap.add_argument("--columns", type=int, default=790, help="plot width in pixels minus the label margin")
+    args = ap.parse_args()
+    run(args.hours, args.rate, args.columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capture + replay benchmark and self-check: synthetic ASCII session, written
+to a capture file, replayed through TelemetryEngine at max speed and paced
+
+    python benchmarks/bench_replay.py [--chunks 50000] [--speed 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from capture import CaptureReader, CaptureWriter, ReplaySerial  # noqa: E402
+from telemetry import TelemetryEngine  # noqa: E402
+
+
+LINES = [
+    b"M0:X=+123 Y=-004 Z=+255\r\n",
+    b"M1:T=25.75C\r\n",
+    b"M2:SW=A5F0\r\n",
+    b"M3:RX=12 L=3412\r\n",
+    b"M4:X=-010 T=26C S=00FF\r\n",
+]
+
+
+def make_session(chunks, seed=0):
+    """Chunks as the OS hands them out: lines split at random points, 10 ms apart."""
+    rng = random.Random(seed)
+    stream = b"".join(rng.choice(LINES) for _ in range(chunks * 2))
+    out = []
+    pos = 0
+    t = 1000.0
+    while pos < len(stream):
+        size = rng.randint(1, 96)
+        out.append((t, stream[pos:pos + size]))
+        pos += size
+        t += 0.01
+    return stream, out
+
+
+def replay(path, speed):
+    ser = ReplaySerial(path, speed=speed, timeout=0.05)
+    engine = TelemetryEngine(ser=ser)
+    frames = []
+    engine.subscribe("frame", frames.append)
+    t0 = time.perf_counter()
+    engine.open()
+    ser.finished.wait()
+    dt = time.perf_counter() - t0
+    engine.close()
+    return engine, frames, dt
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--chunks", type=int, default=50_000)
+    ap.add_argument("--speed", type=float, default=50.0)
+    args = ap.parse_args()
+
+    stream, session = make_session(args.chunks)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.cap")
+        writer = CaptureWriter(path)
+        t0 = time.perf_counter()
+        for t, data in session:
+            writer.write(data, t)
+        writer.close()
+        dt = time.perf_counter() - t0
+        size = os.path.getsize(path)
+        print(f"write        {len(session):8d} chunks {dt * 1000:8.1f} ms {len(session) / dt:12,.0f} chunks/s"
+              f"  {size / len(stream):.2f} file bytes per payload byte")
+
+        # Round trip, index and seek
+        reader = CaptureReader(path)
+        assert reader.complete and reader.count == len(session)
+        assert b"".join(data for _, data in reader.records()) == stream
+        mid = session[len(session) // 2][0]
+        assert next(reader.records(mid))[0] == mid
+        assert abs(reader.duration - (session[-1][0] - session[0][0])) < 1e-9
+        reader.close()
+
+        # File cut mid-record (no footer): reader recovers the complete part
+        cut = os.path.join(tmp, "cut.cap")
+        with open(path, "rb") as src, open(cut, "wb") as dst:
+            dst.write(src.read(size // 2))
+        reader = CaptureReader(cut)
+        assert not reader.complete and 0 < reader.count < len(session)
+        reader.close()
+
+        expected = stream.count(b"\n")
+        engine, frames, dt = replay(path, None)
+        assert len(frames) == expected and engine.state.rx_count == len(stream), (len(frames), expected)
+        print(f"replay max   {len(frames):8d} frames {dt * 1000:8.1f} ms {len(frames) / dt:12,.0f} frames/s"
+              f"  ({len(stream) / dt * 10 / 115200:.0f}x the 115200 baud line)")
+
+        # Paced replay of the first part only
+        short = os.path.join(tmp, "short.cap")
+        writer = CaptureWriter(short)
+        for t, data in session[:500]:
+            writer.write(data, t)
+        writer.close()
+        recorded = session[499][0] - session[0][0]
+        engine, frames, dt = replay(short, args.speed)
+        print(f"replay {args.speed:g}x  recorded {recorded:.2f} s, replayed in {dt:.3f} s "
+              f"(ideal {recorded / args.speed:.3f} s)")
+        assert dt >= recorded / args.speed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sample store benchmark + self-check: append, block append, window queries, spill
+
+    python benchmarks/bench_samplestore.py [--samples 500000] [--capacity 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from binframe import BinaryDecoder, FrameSimulator  # noqa: E402
+from frame_parser import parse_frame  # noqa: E402
+from samplestore import SampleStore, open_spill  # noqa: E402
+
+
+def bench_append(frames, capacity, spill_path):
+    store = SampleStore(capacity, spill_path=spill_path)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for frame in frames:
+        store.append_frame(frame)
+    dt = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    store.close()
+    return store, dt, peak
+
+
+def check_store(store, n):
+    # Newest `capacity` samples, contiguous, in order
+    last = store.last_n(store.capacity)
+    assert len(last["t"]) == min(n, store.capacity)
+    assert last["seq"][-1] == n - 1
+    assert (np.diff(last["seq"]) == 1).all()
+    assert np.shares_memory(last["t"], store.cols["t"]), "window must be a view"
+
+    # Time queries against a brute-force filter over the same samples
+    t = last["t"]
+    t0, t1 = t[len(t) // 3], t[2 * len(t) // 3]
+    got = store.between(t0, t1)["seq"]
+    want = last["seq"][(t >= t0) & (t < t1)]
+    assert (got == want).all()
+    recent = store.last_seconds(1.0)["t"]
+    assert recent[0] >= t[-1] - 1.0 and len(recent) == ((t >= t[-1] - 1.0).sum())
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--samples", type=int, default=500_000)
+    ap.add_argument("--capacity", type=int, default=100_000)
+    args = ap.parse_args()
+    n = args.samples
+
+    # ASCII path: one Frame per line, 100 samples/s timestamps
+    line = b"M4:X=+123 T=27C S=00A5"
+    frames = [parse_frame(line, i * 0.01) for i in range(n)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for spill in (None, os.path.join(tmp, "samples.raw")):
+            store, dt, peak = bench_append(frames, args.capacity, spill)
+            check_store(store, n)
+            label = "append+spill" if spill else "append"
+            print(f"{label:13s} {n:8d} samples {dt * 1000:8.1f} ms {n / dt:12,.0f} samples/s"
+                  f"  peak alloc {peak / 1024:.1f} KiB")
+            if spill:
+                disk = open_spill(spill)
+                assert len(disk) == n and (disk["seq"] == np.arange(n)).all()
+                assert (disk["accel_x"] == 123).all() and (disk["switch_value"] == 0xA5).all()
+
+    # Binary path: whole decoded blocks at once
+    data = FrameSimulator(seed=2).stream(n)
+    decoder = BinaryDecoder()
+    store = SampleStore(args.capacity)
+    t0 = time.perf_counter()
+    for i in range(0, len(data), 4096):
+        block = decoder.feed_array(data[i:i + 4096])
+        t = np.full(len(block), store.count * 0.01) + np.arange(len(block)) * 0.01
+        store.append_block({"t": t, "mode": block["mode"], "accel_x": block["accel_x"],
+                            "accel_y": block["accel_y"], "accel_z": block["accel_z"],
+                            "temperature": block["temp_raw"] * 0.25,
+                            "switch_value": block["switch_value"],
+                            "pc_led_value": block["pc_led_value"]})
+    dt = time.perf_counter() - t0
+    check_store(store, n)
+    print(f"{'append_block':13s} {n:8d} samples {dt * 1000:8.1f} ms {n / dt:12,.0f} samples/s")
+
+    t0 = time.perf_counter()
+    for _ in range(10_000):
+        store.last_seconds(10.0)
+    dt = time.perf_counter() - t0
+    print(f"last_seconds(10) {dt / 10_000 * 1e6:8.1f} us/query ({len(store.last_seconds(10.0)['t'])} samples)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared-memory state benchmark and self-check: publisher cost per frame
+with 0 and N reader processes, reader state() / window cost, and torn-read
+checks (every field is derived from the sample number, so a mixed record
+is detected) while the publisher runs flat out
+
+    python benchmarks/bench_shm.py [--frames 200000] [--readers 4]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from frame_parser import Frame  # noqa: E402
+from shmstate import ShmPublisher, ShmReader  # noqa: E402
+
+NAME = f"nexys_bench_{os.getpid()}"
+CAPACITY = 1024
+PACED_RATE = 1000.0
+PACED_FRAMES = 2000
+
+
+def make_frame(n):
+    v = n % 2000 - 1000
+    return Frame(n % 5, {"accel_x": v, "accel_y": -v, "accel_z": v // 2,
+                         "temperature": (n % 1000) / 4.0, "switch_value": n & 0xFFFF,
+                         "pc_led_value": (n * 7) & 0xFFFF}, float(n), True)
+
+
+def check_record(t, seq, mode, x, y, z, temp, sw, led):
+    n = int(t)
+    v = n % 2000 - 1000
+    assert seq == n and mode == n % 5 and (x, y, z) == (v, -v, v // 2), (t, seq, x, y, z)
+    assert temp == (n % 1000) / 4.0 and sw == n & 0xFFFF and led == (n * 7) & 0xFFFF, t
+
+
+def reader_proc(name, stop, result):
+    reader = ShmReader(name)
+    windows = 0
+    gen = None
+    t_state = []
+    while not stop.is_set():
+        gen = reader.wait(gen, timeout=0.05)
+        if gen is None:
+            continue
+        t0 = time.perf_counter()
+        s = reader.state()
+        t_state.append(time.perf_counter() - t0)
+        if s["count"]:
+            check_record(s["t"], s["count"] - 1, s["mode"], s["accel_x"], s["accel_y"], s["accel_z"],
+                         s["temperature"], s["switch_value"], s["pc_led_value"])
+
+        # Zero-copy window, validated after use; copy_last_n() for a private array
+        count = reader.count
+        start = reader.first(count - 64, count)
+        view = reader.window(start, count)
+        if len(view):
+            rows = view.tolist()
+            if reader.stable(start):
+                for row in rows:
+                    check_record(*row)
+                assert [r[1] for r in rows] == list(range(start, start + len(rows)))
+                windows += 1
+        for row in reader.copy_last_n(CAPACITY).tolist():
+            check_record(*row)
+    t_state.sort()
+    result.put((len(t_state), windows, reader.retries, t_state[len(t_state) // 2] if t_state else 0.0))
+    reader.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=200_000)
+    ap.add_argument("--readers", type=int, default=4)
+    args = ap.parse_args()
+
+    publisher = ShmPublisher(NAME, CAPACITY)
+    try:
+        frames = [make_frame(n) for n in range(args.frames)]
+        t0 = time.perf_counter()
+        for frame in frames:
+            publisher.on_frame(frame)
+        alone = (time.perf_counter() - t0) / args.frames
+        print(f"publisher, no readers      {alone * 1e6:6.2f} us/frame")
+
+        ctx = multiprocessing.get_context("spawn")
+        stop = ctx.Event()
+        result = ctx.Queue()
+        procs = [ctx.Process(target=reader_proc, args=(NAME, stop, result)) for _ in range(args.readers)]
+        for p in procs:
+            p.start()
+        time.sleep(1.0)
+        base = publisher.count
+        frames = [make_frame(base + n) for n in range(args.frames)]
+        t0 = time.perf_counter()
+        for frame in frames:
+            publisher.on_frame(frame)
+        shared = (time.perf_counter() - t0) / args.frames
+        # Then at a board-like rate (10 boards' worth of binary frames)
+        base = publisher.count
+        t_next = time.perf_counter()
+        for n in range(PACED_FRAMES):
+            publisher.on_frame(make_frame(base + n))
+            t_next += 1.0 / PACED_RATE
+            time.sleep(max(0.0, t_next - time.perf_counter()))
+        stop.set()
+        stats = [result.get(timeout=30) for _ in procs]
+        for p in procs:
+            p.join()
+            assert p.exitcode == 0, p.exitcode
+        print(f"publisher, {args.readers} readers       {shared * 1e6:6.2f} us/frame "
+              f"(readers compete for the CPU here: {os.cpu_count()} core(s))")
+        for i, (states, windows, retries, t_state) in enumerate(stats):
+            print(f"  reader {i}: {states} states (median {t_state * 1e6:.1f} us), "
+                  f"{windows} stable windows, {retries} retries, no torn records")
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
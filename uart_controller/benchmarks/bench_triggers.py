@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trigger benchmark and self-check: condition evaluation cost per frame for
+many boards, allocations during evaluation, and event captures around
+injected shocks / switch changes compared with the stream they came from
+
+    python benchmarks/bench_triggers.py [--boards 16] [--frames 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from capture import CaptureReader  # noqa: E402
+from frame_parser import parse_frame  # noqa: E402
+from samplestore import open_spill  # noqa: E402
+from telemetry import TelemetryEngine  # noqa: E402
+from triggers import TriggerMonitor, make_triggers  # noqa: E402
+
+SPECS = (
+    "shock=accel_mag > 1500",
+    "tilt=accel_z falls 700 hyst 50",
+    "hot=temperature outside 20..45",
+    "sw15=mode == 2 and switch_value & 0x8000 == 0x8000",
+    "swchg=switch_value changes & 0x00FF",
+    "quiet=not (accel_x inside -600..600 or mode != 0)",
+)
+PERIOD = 0.5
+
+
+def make_stream(frames, shocks, seed=0):
+    """(t, line) pairs: the GUI test sequence, with shocks and SW15 at known frames."""
+    rng = random.Random(seed)
+    out = []
+    t = 100.0
+    sw = 0
+    for i in range(frames):
+        t += PERIOD
+        mode = (i // 40) % 5
+        x, y, z = rng.randint(-200, 200), rng.randint(-200, 200), 1000 + rng.randint(-30, 30)
+        if i in shocks:
+            x, y, z = 1400, -900, 1800
+            mode = 0
+        if mode == 0:
+            line = b"M0:X=%+04d Y=%+04d Z=%+04d\r\n" % (x, y, z)
+        elif mode == 1:
+            line = b"M1:T=%d.%02dC\r\n" % (rng.randint(25, 35), rng.randrange(100))
+        elif mode == 2:
+            if rng.random() < 0.05:
+                sw ^= 1 << rng.randrange(16)
+            line = b"M2:SW=%04X\r\n" % sw
+        elif mode == 3:
+            line = b"M3:RX=%02X L=%04X\r\n" % (rng.randrange(256), rng.randrange(65536))
+        else:
+            line = b"M4:X=%+04d T=%dC S=%04X\r\n" % (x, rng.randint(25, 35), sw)
+        out.append((t, line))
+    return out
+
+
+def bench_eval(boards, frames):
+    stream = make_stream(frames, set(range(500, frames, 997)))
+    parsed = [parse_frame(line.strip(), t) for t, line in stream]
+    sets = [make_triggers(SPECS) for _ in range(boards)]
+
+    # Warm up (first values, cached label children)
+    for triggers in sets:
+        for frame in parsed[:10]:
+            for trig in triggers:
+                trig.check(frame)
+
+    blocks = sys.getallocatedblocks()
+    t0 = time.perf_counter()
+    fired = 0
+    for frame in parsed:
+        for triggers in sets:
+            for trig in triggers:
+                if trig.check(frame):
+                    fired += 1
+    dt = time.perf_counter() - t0
+    grown = sys.getallocatedblocks() - blocks
+    n = len(parsed) * boards
+    print(f"eval: {boards} boards x {len(SPECS)} triggers, {n} board-frames, "
+          f"{dt / n * 1e6:.2f} us/frame ({dt / n / len(SPECS) * 1e9:.0f} ns/trigger), "
+          f"{fired} firings, {grown} blocks retained")
+    assert grown < 100, grown
+
+
+def check_events(tmp):
+    shocks = {100, 400, 401, 900}
+    stream = make_stream(1200, shocks, seed=1)
+    engine = TelemetryEngine()
+    events = []
+    monitor = TriggerMonitor(make_triggers(SPECS, pre=3.0, post=2.0), tmp, on_event=events.append)
+    monitor.attach(engine)
+    t0 = time.perf_counter()
+    fed = []        # (time of the read that completed the line, line)
+    for t, line in stream:
+        # Every 7th line arrives split over two reads
+        if len(fed) % 7 == 0:
+            engine.feed(line[:5], t - 0.01)
+            engine.feed(line[5:], t)
+            fed.append((t, line))
+        else:
+            engine.feed(line, t - 0.01)
+            fed.append((t - 0.01, line))
+    monitor.close()
+    dt = time.perf_counter() - t0
+
+    done = [e for e in monitor.events if e.done]
+    assert len(done) == len(monitor.events) and events.count(done[0]) == 2
+    shock_t = sorted(e.t for e in done if e.trigger == "shock")
+    # 400 and 401 are within the holdoff: one event
+    assert shock_t == [fed[i][0] for i in sorted(shocks) if i != 401], shock_t
+
+    for event in done:
+        reader = CaptureReader(event.path)
+        records = list(reader.records())
+        reader.close()
+        assert records[0][0] >= event.t_start and records[-1][0] <= event.t_end, event.path
+        data = b"".join(bytes(d) for _, d in records)
+        # Lines wholly inside the window, in order, nothing else but a partial first one
+        want = b"".join(line for t, line in fed if event.t_start + 0.01 <= t <= event.t_end)
+        assert want in data and len(data) - len(want) < 40, event.path
+        samples = open_spill(event.samples_path)
+        assert event.t in samples["t"].tolist(), event.samples_path
+        assert samples["t"][0] >= event.t_start and samples["t"][-1] <= event.t_end
+    per = {}
+    for e in done:
+        per[e.trigger] = per.get(e.trigger, 0) + 1
+    print(f"events: {len(stream)} lines replayed in {dt * 1e3:.0f} ms, {len(done)} events {per}; "
+          f"captures and samples match the stream")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--boards", type=int, default=16)
+    ap.add_argument("--frames", type=int, default=20000)
+    args = ap.parse_args()
+
+    bench_eval(args.boards, args.frames)
+    with tempfile.TemporaryDirectory() as tmp:
+        check_events(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite - parser, framer, pty end-to-end latency, refresh tick cost
+with stubbed Tk widgets, log memory. Writes JSON; compares against a baseline.
+
+    python benchmarks/suite.py --output new.json
+    python benchmarks/suite.py --baseline old.json --threshold 0.15 [--quick]
+
+Exit status 1 if any metric is worse than the baseline by more than the
+threshold (relative). Timings are best-of-repeats to keep noise down.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from frame_parser import parse_batch  # noqa: E402
+from framer import RingFramer  # noqa: E402
+from render import AdaptiveInterval, WidgetCache  # noqa: E402
+from telemetry import BoardState, TelemetryEngine  # noqa: E402
+from uartlog import LogRing  # noqa: E402
+
+
+MODE_LINES = {
+    0: b"M0:X=+123 Y=-004 Z=+255",
+    1: b"M1:T=25.75C",
+    2: b"M2:SW=A5F0",
+    3: b"M3:RX=12 L=3412",
+    4: b"M4:X=-010 T=26C S=00FF",
+}
+DEFAULT_THRESHOLD = 0.15
+
+
+def best_of(func, repeat):
+    """Smallest wall time of `repeat` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def metric(value, unit, better, min_threshold=0.0):
+    """min_threshold: tolerance floor for metrics that are noisy by nature."""
+    result = {"value": value, "unit": unit, "better": better}
+    if min_threshold:
+        result["min_threshold"] = min_threshold
+    return result
+
+
+# ============================================================================
+# Cases
+# ============================================================================
+def bench_parser(scale, repeat):
+    results = {}
+    count = 100_000 * scale
+    for mode, line in MODE_LINES.items():
+        lines = [line] * count
+        dt = best_of(lambda: parse_batch(lines), repeat)
+        results[f"parser.m{mode}"] = metric(count / dt, "lines/s", "higher")
+    return results
+
+
+def bench_framer(scale, repeat):
+    rng = random.Random(0)
+    lines = list(MODE_LINES.values())
+    burst = b"".join(rng.choice(lines) + b"\r\n" for _ in range(20_000 * scale))
+    expected = burst.count(b"\n")
+    results = {}
+    for name, chunk in (("burst", len(burst)), ("chunk4k", 4096), ("chunk64", 64)):
+        parts = [burst[i:i + chunk] for i in range(0, len(burst), chunk)]
+
+        def run():
+            framer = RingFramer()
+            count = 0
+            for part in parts:
+                count += len(framer.split(part))
+            assert count == expected, (count, expected)
+
+        dt = best_of(run, repeat)
+        results[f"framer.{name}"] = metric(len(burst) / dt / 1e6, "MB/s", "higher")
+    return results
+
+
+def bench_latency(samples):
+    """os.write() on the pty master -> frame event after BoardState.apply()."""
+    try:
+        import pty
+        import tty
+    except ImportError:
+        return {}
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    engine = TelemetryEngine(os.ttyname(slave))
+    arrived = threading.Event()
+    stamp = [0.0]
+
+    def on_frame(frame):
+        stamp[0] = time.perf_counter()
+        arrived.set()
+
+    engine.subscribe("frame", on_frame)
+    engine.open()
+    latencies = []
+    try:
+        for i in range(samples + 10):
+            arrived.clear()
+            line = f"M2:SW={i & 0xFFFF:04X}\r\n".encode()
+            t0 = time.perf_counter()
+            os.write(master, line)
+            if not arrived.wait(1.0):
+                raise RuntimeError("no frame within 1 s")
+            if i >= 10:     # warm-up
+                latencies.append(stamp[0] - t0)
+            time.sleep(0.001)
+    finally:
+        engine.close()
+        os.close(master)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return {
+        "latency.pty.p50": metric(p50 * 1e6, "us", "lower"),
+        "latency.pty.p99": metric(p99 * 1e6, "us", "lower", min_threshold=0.5),
+    }
+
+
+class StubWidget:
+    """Accepts config() like a Tk widget and counts calls."""
+
+    calls = 0
+
+    def config(self, **options):
+        StubWidget.calls += 1
+
+    configure = config
+
+
+class StubRoot:
+    def after(self, ms, func=None):
+        return None
+
+
+def make_stub_gui():
+    """FPGAIntegratedGUI with the refresh path wired to stub widgets."""
+    from metrics import CallbackLag
+    from uartgui import (REFRESH_IDLE_MS, REFRESH_LAG, REFRESH_RATE_MS,
+                         FPGAIntegratedGUI)
+
+    gui = FPGAIntegratedGUI.__new__(FPGAIntegratedGUI)
+    gui.root = StubRoot()
+    gui.state = BoardState()
+    gui.render = WidgetCache()
+    gui.refresh_interval = AdaptiveInterval(REFRESH_RATE_MS, REFRESH_IDLE_MS)
+    gui.refresh_lag = CallbackLag(REFRESH_LAG)
+    gui.shown_mode = None
+    gui.shown_switch = None
+    gui.dsp = None
+    gui.mode_labels = [StubWidget() for _ in range(5)]
+    gui.sw_indicators = [StubWidget() for _ in range(16)]
+    for name in ("accel_x_label", "accel_y_label", "accel_z_label",
+                 "temp_label", "sw_hex_label", "sw_binary_label"):
+        setattr(gui, name, StubWidget())
+    return gui
+
+
+def bench_refresh(scale, repeat):
+    """Cost of one refresh_ui() tick on a busy link, with stubbed Tk."""
+    try:
+        gui = make_stub_gui()
+    except ImportError:     # no tkinter on this interpreter
+        return {}
+    rng = random.Random(0)
+    ticks = 2_000 * scale
+    # Each tick: a few frames coalesced, accel moving, one switch flipping
+    updates = []
+    sw = 0
+    for i in range(ticks):
+        sw ^= 1 << rng.randrange(16)
+        updates.append((i % 5, {"accel_x": rng.randint(-300, 300), "accel_y": rng.randint(-300, 300),
+                                "accel_z": 250, "temperature": 25.0 + (i // 50) * 0.0625,
+                                "switch_value": sw}))
+    gui.refresh_ui()
+
+    def run():
+        for mode, fields in updates:
+            gui.state.apply(mode, fields)
+            gui.refresh_ui()
+
+    StubWidget.calls = 0
+    dt = best_of(run, repeat)
+    calls = StubWidget.calls / (ticks * repeat)
+    return {
+        "refresh.tick": metric(dt / ticks * 1e6, "us/tick", "lower"),
+        "refresh.widget_calls": metric(calls, "calls/tick", "lower"),
+    }
+
+
+def bench_log_memory(scale):
+    """Heap held by the log after N records, and per-record cost."""
+    lines = 200_000 * scale
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    log = LogRing()
+    for i in range(lines):
+        log.append("rx", f"RX <- M0:X=+{i % 1000:03d} Y=-004 Z=+255")
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    held = current - base
+    return {
+        "log.held": metric(held / 2**20, "MiB", "lower"),
+        "log.per_record": metric(held / min(lines, log.capacity), "bytes", "lower"),
+        "log.peak": metric((peak - base) / 2**20, "MiB", "lower"),
+    }
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run_suite(quick=False, only=None):
+    scale = 1 if quick else 3
+    repeat = 3 if quick else 5
+    cases = {
+        "parser": lambda: bench_parser(scale, repeat),
+        "framer": lambda: bench_framer(scale, repeat),
+        "latency": lambda: bench_latency(200 if quick else 1000),
+        "refresh": lambda: bench_refresh(scale, repeat),
+        "log": lambda: bench_log_memory(scale),
+    }
+    results = {}
+    for name, case in cases.items():
+        if only and name not in only:
+            continue
+        results.update(case())
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """List of (name, old, new, change) for metrics worse than threshold."""
+    regressions = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        worse = -change if new["better"] == "higher" else change
+        if worse > max(threshold, new.get("min_threshold", 0.0)):
+            regressions.append((name, old["value"], new["value"], change))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--output", help="write results JSON here")
+    ap.add_argument("--baseline", help="results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="allowed relative slowdown (default %(default)s)")
+    ap.add_argument("--quick", action="store_true", help="smaller workloads")
+    ap.add_argument("--only", nargs="*", choices=("parser", "framer", "latency", "refresh", "log"))
+    args = ap.parse_args()
+
+    current = run_suite(args.quick, args.only)
+    for name, m in current["results"].items():
+        print(f"{name:24s} {m['value']:14,.2f} {m['unit']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:,.2f} -> {new:,.2f} ({change:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"no regression over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
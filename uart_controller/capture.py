@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Raw capture / replay - FPGA Nexys A7-100T UART
+Timestamped chunk recording and a serial.Serial stand-in that plays it back.
+
+File layout (little-endian):
+    header   "NXCAP" version flags  wall-clock start (f64)        16 bytes
+    record   t_monotonic (f64)  length (u32)  data[length]      repeated
+    index    "NXIDX\\0\\0\\0" count (u64), count x (t f64, offset u64, record u64)
+    footer   index offset (u64) "NXCAPEND"                        16 bytes
+
+Index and footer are written by close(). A file cut short (crash, power
+loss) has neither; the reader then scans the records and stops at the
+first truncated one.
+"""
+
+import mmap
+import struct
+import threading
+import time
+from bisect import bisect_right
+
+
+MAGIC = b"NXCAP"
+VERSION = 1
+FLAG_BINARY = 0x01          # stream carries binframe frames, not ASCII lines
+
+HEADER = struct.Struct("<5sBBxd")
+RECORD = struct.Struct("<dI")
+INDEX_HEAD = struct.Struct("<8sQ")
+INDEX_ENTRY = struct.Struct("<dQQ")
+FOOTER = struct.Struct("<Q8s")
+INDEX_MAGIC = b"NXIDX\0\0\0"
+FOOTER_MAGIC = b"NXCAPEND"
+
+# One seek index entry per this many records
+INDEX_EVERY = 256
+WRITE_BUFFER = 1 << 20
+# Same meaning as telemetry.READ_TIMEOUT for the replay port
+REPLAY_TIMEOUT = 0.5
+
+
+# ============================================================================
+# Writer
+# ============================================================================
+class CaptureWriter:
+    """
+    Append raw chunks with their receive time.
+
+    Writes go through a large userspace buffer, so write() is a struct pack
+    and two buffered writes. wall_start is the wall-clock time of the first
+    record (default: now). Attach to an engine with `engine.capture = w`;
+    close() may be called from another thread while the reader is running,
+    chunks arriving after it are ignored.
+    """
+
+    def __init__(self, path, binary=False, index_every=INDEX_EVERY, wall_start=None):
+        self.path = path
+        self.index_every = index_every
+        if wall_start is None:
+            wall_start = time.time()
+        self.f = open(path, "wb", buffering=WRITE_BUFFER)
+        self.f.write(HEADER.pack(MAGIC, VERSION, FLAG_BINARY if binary else 0, wall_start))
+        self.offset = HEADER.size
+        self.index = []
+        self.lock = threading.Lock()
+
+        # Stats
+        self.records = 0
+        self.bytes = 0
+
+    def write(self, data, t=None):
+        if t is None:
+            t = time.monotonic()
+        size = len(data)
+        with self.lock:
+            f = self.f
+            if f is None:
+                return
+            if self.records % self.index_every == 0:
+                self.index.append((t, self.offset, self.records))
+            f.write(RECORD.pack(t, size))
+            f.write(data)
+            self.offset += RECORD.size + size
+            self.records += 1
+            self.bytes += size
+
+    def close(self):
+        with self.lock:
+            f = self.f
+            if f is None:
+                return
+            self.f = None
+        f.write(INDEX_HEAD.pack(INDEX_MAGIC, len(self.index)))
+        for entry in self.index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.write(FOOTER.pack(self.offset, FOOTER_MAGIC))
+        f.close()
+
+
+# ============================================================================
+# Reader
+# ============================================================================
+class CaptureReader:
+    """
+    Memory-mapped read access to a capture file.
+
+    records() yields (t, bytes) in file order; seek(t) positions the next
+    records() call at the last indexed record at or before `t`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, self.wall_start = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a capture file")
+        self.binary = bool(flags & FLAG_BINARY)
+
+        self.index = []
+        self.data_end = None
+        self.complete = self._load_index()
+        if not self.complete:
+            self._scan()
+
+        self.t_first = self.index[0][0] if self.index else 0.0
+
+    @property
+    def duration(self):
+        return self.t_last - self.t_first
+
+    def close(self):
+        self.mm.close()
+
+    # ------------------------------------------------------------------
+    # Iteration
+    # ------------------------------------------------------------------
+    def records(self, start=None):
+        """(t, data) for every record, from time `start` (or the beginning)."""
+        mm = self.mm
+        end = self.data_end
+        unpack = RECORD.unpack_from
+        offset = self.seek(start) if start is not None else HEADER.size
+        while offset + RECORD.size <= end:
+            t, size = unpack(mm, offset)
+            offset += RECORD.size
+            if start is not None and t < start:
+                offset += size
+                continue
+            yield t, mm[offset:offset + size]
+            offset += size
+
+    def seek(self, t):
+        """File offset of the indexed record at or before `t`."""
+        i = bisect_right(self.index, (t, float("inf"))) - 1
+        return self.index[i][1] if i >= 0 else HEADER.size
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _load_index(self):
+        mm = self.mm
+        if len(mm) < HEADER.size + INDEX_HEAD.size + FOOTER.size:
+            return False
+        index_at, magic = FOOTER.unpack_from(mm, len(mm) - FOOTER.size)
+        if magic != FOOTER_MAGIC:
+            return False
+        head, count = INDEX_HEAD.unpack_from(mm, index_at)
+        if head != INDEX_MAGIC:
+            return False
+        base = index_at + INDEX_HEAD.size
+        self.index = [INDEX_ENTRY.unpack_from(mm, base + i * INDEX_ENTRY.size) for i in range(count)]
+        self.data_end = index_at
+
+        # Last record: walk forward from the last index entry
+        self.count = 0
+        self.t_last = 0.0
+        if self.index:
+            _, offset, record = self.index[-1]
+            self._walk(offset, record)
+        return True
+
+    def _scan(self):
+        """Rebuild index and end of data for a file without footer."""
+        mm = self.mm
+        self.data_end = len(mm)
+        self.index = []
+        self._walk(HEADER.size, 0, build_index=True)
+
+    def _walk(self, offset, record, build_index=False):
+        mm = self.mm
+        end = self.data_end
+        t = 0.0
+        while offset + RECORD.size <= end:
+            t_rec, size = RECORD.unpack_from(mm, offset)
+            if offset + RECORD.size + size > end:
+                break
+            if build_index and record % INDEX_EVERY == 0:
+                self.index.append((t_rec, offset, record))
+            t = t_rec
+            offset += RECORD.size + size
+            record += 1
+        if build_index:
+            self.data_end = offset
+        self.count = record
+        self.t_last = t
+
+
+# ============================================================================
+# Replay port
+# ============================================================================
+class ReplaySerial:
+    """
+    Plays a capture back through the subset of the serial.Serial API the
+    engine uses: read(), in_waiting, write(), cancel_read(), close().
+
+    speed=1.0 reproduces the recorded timing, speed=N runs N times faster,
+    speed=None hands out recorded chunks as fast as they are read (one
+    chunk per read(1) + read(in_waiting), as the board delivered them).
+    Writes are counted and discarded. `finished` is set at end of file
+    unless loop=True.
+
+        engine = TelemetryEngine(ser=ReplaySerial("run.cap", speed=None))
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, start=None, timeout=REPLAY_TIMEOUT):
+        self.port = path
+        self.timeout = timeout
+        self.speed = speed
+        self.loop = loop
+        self.start = start
+        self.reader = CaptureReader(path)
+        self.binary = self.reader.binary
+
+        self.buf = bytearray()
+        self.records = self.reader.records(start)
+        self.next = None        # record read from file but not yet due
+        self.t0 = None          # capture time that maps to wall0
+        self.wall0 = None
+        self.cancel = threading.Event()
+        self.finished = threading.Event()
+        self.is_open = True
+
+        # Stats
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.loops = 0
+
+    # ------------------------------------------------------------------
+    # serial.Serial subset
+    # ------------------------------------------------------------------
+    @property
+    def in_waiting(self):
+        self._fill(1)
+        return len(self.buf)
+
+    def read(self, size=1):
+        buf = self.buf
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while len(buf) < size:
+            wait = self._fill(size)
+            if len(buf) >= size:
+                break
+            if wait is None:
+                if self.loop:
+                    self._rewind()
+                    continue
+                self.finished.set()
+                wait = self.timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                wait = remaining if wait is None else min(wait, remaining)
+            if self.cancel.wait(wait):
+                self.cancel.clear()
+                break
+        data = bytes(buf[:size])
+        del buf[:size]
+        self.bytes_read += len(data)
+        return data
+
+    def write(self, data):
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        self.buf.clear()
+
+    def cancel_read(self):
+        self.cancel.set()
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            self.cancel.set()
+            self.records.close()
+            self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _fill(self, want):
+        """Move due records into buf; seconds until the next one, None at end."""
+        while True:
+            if self.next is None:
+                self.next = next(self.records, None)
+                if self.next is None:
+                    return None
+            t, data = self.next
+            if self.speed:
+                if self.wall0 is None:
+                    self.wall0 = time.monotonic()
+                    self.t0 = t
+                wait = self.wall0 + (t - self.t0) / self.speed - time.monotonic()
+                if wait > 0:
+                    return wait
+            elif len(self.buf) >= want:
+                return 0.0
+            self.buf += data
+            self.next = None
+
+    def _rewind(self):
+        self.records = self.reader.records(self.start)
+        self.wall0 = None
+        self.loops += 1
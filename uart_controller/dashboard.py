@@ -0,0 +1,921 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard - FPGA Nexys A7-100T UART
+Live board state in a browser: HTTP page plus a WebSocket feed, on asyncio.
+
+    python uartserial.py dashboard --port /dev/ttyUSB1 /dev/ttyUSB3
+    python uartserial.py dashboard --shm all --host 0.0.0.0
+    then open http://127.0.0.1:8765/
+
+Boards are polled, not pushed: every PUSH_INTERVAL the loop reads each
+board's state and the samples added since the last tick, diffs the state
+against what was last sent, min/max-decimates the samples to at most
+BATCH_POINTS and encodes ONE update message that every client gets as
+the same bytes. The serial reader's cost does not depend on the number
+of viewers: an EngineBoard costs one deque append per frame, a ShmBoard
+(a board another process publishes, e.g. the GUI) nothing.
+
+Backpressure: a client whose socket still holds more than
+CLIENT_HIGH_WATER unsent bytes is skipped; its state deltas are merged
+into one pending dict and, once it drains, it gets a single catch-up
+message (merged state, one decimated batch over everything it missed).
+A slow viewer therefore costs a bounded buffer, never a growing queue.
+
+Client -> server (JSON text frames):
+    {"type": "led", "board": NAME, "value": 0..65535}
+LED commands go to the board's set_leds (a TxQueue in `run`, the GUI's
+send_led_16bit path when the GUI serves). Binding to a LAN address lets
+anyone who can reach the port set LEDs; use --read-only to refuse them.
+Browsers send an Origin with the upgrade: it must be the dashboard's own
+(http:// plus the Host the page was loaded from) or one given with
+--allow-origin, otherwise the upgrade gets a 403, so a foreign page open
+in the same browser cannot drive the LEDs. Requests without an Origin
+(scripts, benchmarks) are not browsers and are let through.
+
+WebSocket (RFC 6455) is implemented here on asyncio streams: handshake,
+framing, fragmentation, ping/close; no extensions. Stdlib only.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from collections import deque
+
+from hotplug import supervise
+from telemetry import BAUDRATE, TelemetryEngine
+
+
+DASHBOARD_HOST = "127.0.0.1"
+DASHBOARD_PORT = 8765
+PUSH_INTERVAL = 0.1
+# Per board and update; samples are min/max pairs per bucket
+BATCH_POINTS = 50
+# Sent to a new client: the last BACKFILL_SAMPLES as BACKFILL_POINTS
+BACKFILL_SAMPLES = 6000
+BACKFILL_POINTS = 600
+# Samples kept per EngineBoard (only new ones are read each tick)
+HISTORY = 1 << 14
+# Unsent bytes (ours plus the kernel's, see CLIENT_SNDBUF) before a client is skipped
+CLIENT_HIGH_WATER = 64 * 1024
+CLIENT_SNDBUF = 64 * 1024
+MAX_MESSAGE = 4096          # client messages are tiny JSON commands
+MAX_REQUEST = 8192
+REQUEST_TIMEOUT = 10.0
+PLOT_CHANNELS = ("accel_x", "accel_y", "accel_z", "temperature")
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_CONT = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+CLOSE_NORMAL = 1000
+CLOSE_GOING_AWAY = 1001
+CLOSE_PROTOCOL = 1002
+CLOSE_TOO_BIG = 1009
+
+
+# ============================================================================
+# WebSocket framing
+# ============================================================================
+class ProtocolError(ValueError):
+    """Invalid WebSocket data from a client; `code` is the close code to send."""
+
+    def __init__(self, message, code=CLOSE_PROTOCOL):
+        super().__init__(message)
+        self.code = code
+
+
+def accept_key(key):
+    """Sec-WebSocket-Accept for a client's Sec-WebSocket-Key."""
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+
+
+def ws_frame(payload, opcode=OP_TEXT):
+    """One unmasked, final frame (server -> client)."""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 0x10000:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+def close_frame(code, reason=""):
+    return ws_frame(struct.pack("!H", code) + reason.encode()[:120], OP_CLOSE)
+
+
+def unmask(data, mask):
+    n = len(data)
+    key = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big")
+
+
+async def read_frame(reader):
+    """(fin, opcode, payload) of one client frame; client frames must be masked."""
+    b0, b1 = await reader.readexactly(2)
+    if b0 & 0x70:
+        raise ProtocolError("reserved bits set")
+    if not b1 & 0x80:
+        raise ProtocolError("unmasked client frame")
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", await reader.readexactly(8))[0]
+    opcode = b0 & 0x0F
+    if opcode >= OP_CLOSE and (n > 125 or not b0 & 0x80):
+        raise ProtocolError("bad control frame")
+    if n > MAX_MESSAGE:
+        raise ProtocolError("message too big", CLOSE_TOO_BIG)
+    mask = await reader.readexactly(4)
+    return bool(b0 & 0x80), opcode, unmask(await reader.readexactly(n), mask) if n else b""
+
+
+async def read_message(reader, writer):
+    """
+    Next data message (opcode, payload), or (OP_CLOSE, payload). Fragments
+    are joined; pings in between are answered here, pongs ignored.
+    """
+    opcode = None
+    parts = []
+    size = 0
+    while True:
+        fin, op, payload = await read_frame(reader)
+        if op == OP_PING:
+            writer.write(ws_frame(payload, OP_PONG))
+            continue
+        if op == OP_PONG:
+            continue
+        if op == OP_CLOSE:
+            return OP_CLOSE, payload
+        if op == OP_CONT:
+            if opcode is None:
+                raise ProtocolError("continuation without a message")
+        elif op in (OP_TEXT, OP_BINARY):
+            if opcode is not None:
+                raise ProtocolError("new message inside a fragmented one")
+            opcode = op
+        else:
+            raise ProtocolError(f"unknown opcode {op}")
+        size += len(payload)
+        if size > MAX_MESSAGE:
+            raise ProtocolError("message too big", CLOSE_TOO_BIG)
+        parts.append(payload)
+        if fin:
+            return opcode, b"".join(parts)
+
+
+async def read_request(reader):
+    """(method, path, headers with lower-case names) of an HTTP/1.1 request head."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    if len(head) > MAX_REQUEST:
+        raise ValueError("request head too large")
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+        raise ValueError(f"bad request line {lines[0]!r}")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return parts[0], parts[1], headers
+
+
+def encode(message):
+    return json.dumps(message, separators=(",", ":")).encode()
+
+
+# ============================================================================
+# Boards
+# ============================================================================
+def sample_batch(cols, points, offset):
+    """JSON-ready min/max batch of a window: seq range, wall-clock t, per-channel min (and max)."""
+    import numpy as np
+
+    from decimate import minmax
+
+    seq = cols["seq"]
+    t, mins, maxs = minmax(cols, PLOT_CHANNELS, points)
+    batch = {
+        "seq": [int(seq[0]), int(seq[-1]) + 1],
+        "t": np.round(t + offset, 3).tolist(),
+        "min": {name: _values(mins[name]) for name in PLOT_CHANNELS},
+    }
+    if maxs is not mins:
+        batch["max"] = {name: _values(maxs[name]) for name in PLOT_CHANNELS}
+    return batch
+
+
+def _values(col):
+    if col.dtype.kind == "f":
+        return col.astype("f8").round(3).tolist()
+    return col.tolist()
+
+
+class EngineBoard:
+    """
+    A TelemetryEngine in this process.
+
+    The only work on the engine's thread is a deque append per frame;
+    poll() moves the frames into a SampleStore on the dashboard's loop,
+    which also reads engine.state. If the loop falls `capacity` frames
+    behind, the oldest are dropped. set_leds(value) is called on the loop
+    thread for LED commands (None: read-only board).
+    """
+
+    def __init__(self, name, engine, set_leds=None, capacity=HISTORY):
+        from samplestore import SampleStore
+
+        self.name = name
+        self.engine = engine
+        self.set_leds = set_leds
+        self.samples = SampleStore(capacity)
+        self.capacity = capacity
+        self.offset = time.time() - time.monotonic()
+        self.frames = deque(maxlen=capacity)
+        engine.subscribe("frame", self.frames.append)
+
+    def detach(self):
+        self.engine.unsubscribe("frame", self.frames.append)
+
+    def poll(self):
+        frames = self.frames
+        append = self.samples.append_frame
+        for _ in range(len(frames)):
+            append(frames.popleft())
+
+    @property
+    def count(self):
+        return self.samples.count
+
+    def window(self, start, stop):
+        return self.samples.window(start, stop)
+
+    def stable(self, start):
+        return self.samples.count < start + self.capacity
+
+    def snapshot(self):
+        state = self.engine.state
+        values = state.snapshot()
+        values["rx_count"] = state.rx_count
+        values["tx_count"] = state.tx_count
+        values["connected"] = self.engine.connected
+        return values
+
+
+class ShmBoard:
+    """
+    A board published by another process (shmstate.ShmPublisher, e.g. the
+    GUI). Read-only: LED commands need the process that owns the port.
+    """
+
+    set_leds = None
+
+    def __init__(self, name):
+        from shmstate import ShmReader
+
+        self.name = name
+        self.reader = ShmReader(name)
+        self.capacity = self.reader.capacity
+        self.offset = self.reader.offset
+
+    def detach(self):
+        self.reader.close()
+
+    def poll(self):
+        pass
+
+    @property
+    def count(self):
+        return self.reader.count
+
+    def window(self, start, stop):
+        return self.reader.window(start, stop)
+
+    def stable(self, start):
+        return self.reader.stable(start)
+
+    def snapshot(self):
+        values = self.reader.state()
+        for key in ("t", "count", "generation"):
+            del values[key]
+        values["temperature"] = round(values["temperature"], 3)
+        values["connected"] = not self.reader.closed
+        return values
+
+
+# ============================================================================
+# Server
+# ============================================================================
+class Client:
+    """One WebSocket viewer; `pending` is not None while it is being skipped."""
+
+    def __init__(self, writer, peer):
+        self.writer = writer
+        self.peer = peer
+        self.pending = None         # board -> merged state delta
+        self.since = None           # board -> first sample it has not received
+        self.deferred = 0
+
+        # Stats
+        self.messages = 0
+        self.skipped = 0
+
+    def buffered(self):
+        """Bytes written but not yet taken by the peer (asyncio buffer + socket send queue)."""
+        return self.writer.transport.get_write_buffer_size() + _unsent(self.writer)
+
+    def defer(self, updates, starts):
+        if self.pending is None:
+            self.pending = {}
+            self.since = dict(starts)
+            self.deferred = 0
+        self.deferred += 1
+        for name, entry in updates.items():
+            state = entry.get("state")
+            if state:
+                self.pending.setdefault(name, {}).update(state)
+
+
+def _unsent(writer):
+    # Linux: SIOCOUTQ, bytes in the socket send queue not yet acked
+    sock = writer.get_extra_info("socket")
+    if sock is None or not sys.platform.startswith("linux"):
+        return 0
+    import fcntl
+    import termios
+
+    try:
+        return struct.unpack("i", fcntl.ioctl(sock.fileno(), termios.TIOCOUTQ, b"\0\0\0\0"))[0]
+    except OSError:
+        return 0
+
+
+class Dashboard:
+    """
+    HTTP + WebSocket server for a set of boards (EngineBoard / ShmBoard).
+
+    Runs on an asyncio loop: `await serve_forever()` in a loop you own, or
+    start() / stop() to run it on a background thread (the GUI). Routes:
+        /          the dashboard page
+        /state     current state of every board as JSON
+        /ws        the WebSocket feed: a "hello" message (full state and
+                   recent history), then "update" messages with
+                   {"boards": {name: {"state": changed fields,
+                                      "samples": min/max batch}}}
+    port=0 binds a free port; the bound one is in `port` after open().
+    """
+
+    def __init__(self, boards, host=DASHBOARD_HOST, port=DASHBOARD_PORT, interval=PUSH_INTERVAL,
+                 points=BATCH_POINTS, high_water=CLIENT_HIGH_WATER, read_only=False, allow_origins=()):
+        self.boards = {}
+        for board in boards:
+            if board.name in self.boards:
+                raise ValueError(f"duplicate board name {board.name}")
+            self.boards[board.name] = board
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.points = points
+        self.high_water = high_water
+        self.read_only = read_only
+        self.allow_origins = {o.rstrip("/").lower() for o in allow_origins}
+
+        self.baseline = {name: {} for name in self.boards}     # state as last sent
+        self.next_seq = {name: board.count for name, board in self.boards.items()}
+        self.clients = set()
+        self.server = None
+        self.ticker = None
+        self.loop = None
+        self.thread = None
+        self.stopping = None
+        self.error = None
+
+        # Stats
+        self.ticks = 0
+        self.messages = 0
+        self.bytes_sent = 0
+        self.coalesced = 0          # client-ticks skipped for backpressure
+        self.catch_ups = 0
+        self.led_commands = 0
+        self.rejected = 0
+        self.foreign_origins = 0    # upgrades refused with 403
+        self.tick_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle (loop thread)
+    # ------------------------------------------------------------------
+    async def open(self):
+        # Imported here: asyncio costs ~70 ms at startup and most commands never serve
+        import asyncio
+
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_REQUEST)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ticker = asyncio.ensure_future(self.run_ticker())
+        return self
+
+    async def close(self):
+        import asyncio
+
+        if self.ticker is not None:
+            self.ticker.cancel()
+            self.ticker = None
+        if self.server is not None:
+            self.server.close()
+        for client in list(self.clients):
+            self.send(client, close_frame(CLOSE_GOING_AWAY, "server closing"))
+            client.writer.close()
+        self.clients.clear()
+        if self.server is not None:
+            try:
+                await asyncio.wait_for(self.server.wait_closed(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+            self.server = None
+
+    async def serve_forever(self):
+        import asyncio
+
+        await self.open()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.close()
+
+    def start(self):
+        """Serve on a daemon thread with its own loop; raises if binding fails."""
+        import threading
+
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._thread_main, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self.error is not None:
+            self.thread.join()
+            self.thread = None
+            raise self.error
+        return self
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.stopping.set)
+        self.thread.join()
+        self.thread = None
+
+    def _thread_main(self, ready):
+        import asyncio
+
+        async def main():
+            self.stopping = asyncio.Event()
+            try:
+                await self.open()
+            except Exception as e:
+                self.error = e
+                return
+            finally:
+                ready.set()
+            await self.stopping.wait()
+            await self.close()
+
+        asyncio.run(main())
+
+    # ------------------------------------------------------------------
+    # Updates (loop thread)
+    # ------------------------------------------------------------------
+    async def run_ticker(self):
+        import asyncio
+
+        while True:
+            t0 = time.perf_counter()
+            try:
+                self.tick()
+            except Exception as e:  # a board gone mid-read; try again next tick
+                print(f"Dashboard: {e}", file=sys.stderr)
+            self.tick_seconds = time.perf_counter() - t0
+            await asyncio.sleep(max(0.0, self.interval - self.tick_seconds))
+
+    def tick(self):
+        """Read every board once, then fan the one encoded update out to the clients."""
+        self.ticks += 1
+        starts = dict(self.next_seq)
+        updates = {}
+        for name, board in self.boards.items():
+            entry = self.collect(name, board)
+            if entry:
+                updates[name] = entry
+        shared = ws_frame(encode({"type": "update", "boards": updates})) if updates else None
+
+        for client in list(self.clients):
+            if client.buffered() > self.high_water:
+                client.defer(updates, starts)
+                client.skipped += 1
+                self.coalesced += 1
+            elif client.pending is not None:
+                client.defer(updates, starts)
+                self.send(client, self.catch_up(client))
+            elif shared is not None:
+                self.send(client, shared)
+
+    def collect(self, name, board):
+        """Changed fields and new samples of one board since the previous tick."""
+        entry = {}
+        board.poll()
+        values = board.snapshot()
+        baseline = self.baseline[name]
+        delta = {key: value for key, value in values.items() if baseline.get(key) != value}
+        if delta:
+            baseline.update(delta)
+            entry["state"] = delta
+        stop = board.count
+        if stop > self.next_seq[name]:
+            batch = self.batch(board, self.next_seq[name], stop, self.points)
+            self.next_seq[name] = stop
+            if batch is not None:
+                entry["samples"] = batch
+        return entry
+
+    def batch(self, board, start, stop, points):
+        """Decimated samples [start, stop) still held by the board, or None."""
+        while True:
+            # First sample number from the counter: the window's own seq may
+            # be from a record overwritten while it was read
+            first = max(start, board.count - board.capacity + 1, 0)
+            cols = board.window(first, stop)
+            if not len(cols["t"]):
+                return None
+            batch = sample_batch(cols, points, board.offset)
+            # Lapped by the writer while reading (the window was views): read again
+            if board.stable(first):
+                return batch
+            start = first + 1
+
+    def catch_up(self, client):
+        """Everything a skipped client missed, as one update."""
+        boards = {}
+        for name, board in self.boards.items():
+            entry = {}
+            state = client.pending.get(name)
+            if state:
+                entry["state"] = state
+            batch = self.batch(board, client.since[name], self.next_seq[name], self.points)
+            if batch is not None:
+                entry["samples"] = batch
+            if entry:
+                boards[name] = entry
+        message = {"type": "update", "boards": boards, "coalesced": client.deferred}
+        client.pending = client.since = None
+        self.catch_ups += 1
+        return ws_frame(encode(message))
+
+    def hello(self):
+        boards = {}
+        for name, board in self.boards.items():
+            entry = {"leds": board.set_leds is not None and not self.read_only,
+                     "state": dict(self.baseline[name])}
+            stop = self.next_seq[name]
+            batch = self.batch(board, stop - BACKFILL_SAMPLES, stop, BACKFILL_POINTS)
+            if batch is not None:
+                entry["samples"] = batch
+            boards[name] = entry
+        return ws_frame(encode({"type": "hello", "interval": self.interval,
+                                "channels": PLOT_CHANNELS, "boards": boards}))
+
+    def send(self, client, data):
+        if client.writer.is_closing():
+            return
+        client.writer.write(data)
+        client.messages += 1
+        self.messages += 1
+        self.bytes_sent += len(data)
+
+    # ------------------------------------------------------------------
+    # Connections (loop thread)
+    # ------------------------------------------------------------------
+    async def handle(self, reader, writer):
+        import asyncio
+
+        try:
+            method, path, headers = await asyncio.wait_for(read_request(reader), REQUEST_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError, ValueError):
+            writer.close()
+            return
+        path = path.split("?", 1)[0]
+        try:
+            if method != "GET":
+                await self.respond(writer, 405, "text/plain", b"GET only\n")
+            elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self.serve_websocket(reader, writer, headers)
+            elif path == "/":
+                await self.respond(writer, 200, "text/html; charset=utf-8", PAGE.encode())
+            elif path == "/state":
+                body = encode({name: board.snapshot() for name, board in self.boards.items()})
+                await self.respond(writer, 200, "application/json", body)
+            else:
+                await self.respond(writer, 404, "text/plain", b"not found\n")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, content_type, body):
+        reason = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+                  405: "Method Not Allowed"}[status]
+        writer.write((f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\n"
+                      f"Connection: close\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    async def serve_websocket(self, reader, writer, headers):
+        import asyncio
+        import socket
+
+        key = headers.get("sec-websocket-key")
+        if not key or headers.get("sec-websocket-version") != "13":
+            await self.respond(writer, 400, "text/plain", b"WebSocket version 13 only\n")
+            return
+        if not self.origin_allowed(headers):
+            self.foreign_origins += 1
+            await self.respond(writer, 403, "text/plain", b"origin not allowed\n")
+            return
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n").encode())
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # Keep the kernel's share of a slow client's backlog small too
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CLIENT_SNDBUF)
+
+        client = Client(writer, writer.get_extra_info("peername"))
+        self.send(client, self.hello())
+        self.clients.add(client)
+        try:
+            while True:
+                opcode, payload = await read_message(reader, writer)
+                if opcode == OP_CLOSE:
+                    self.send(client, ws_frame(payload[:2], OP_CLOSE))
+                    break
+                if opcode == OP_TEXT:
+                    self.on_message(client, payload)
+        except ProtocolError as e:
+            self.send(client, close_frame(e.code, str(e)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+
+    def origin_allowed(self, headers):
+        """Same-origin check for a WebSocket upgrade (see the module docstring)."""
+        origin = headers.get("origin")
+        if origin is None:
+            return True
+        origin = origin.rstrip("/").lower()
+        host = headers.get("host", "").lower()
+        return (bool(host) and origin in (f"http://{host}", f"https://{host}")) or origin in self.allow_origins
+
+    def on_message(self, client, payload):
+        try:
+            message = json.loads(payload)
+            kind = message.get("type")
+        except (ValueError, AttributeError):
+            self.reject(client, "not a JSON object")
+            return
+        if kind != "led":
+            self.reject(client, f"unknown message type {kind!r}")
+            return
+        name = message.get("board")
+        value = message.get("value")
+        board = self.boards.get(name)
+        if board is None:
+            self.reject(client, f"no board {name!r}")
+        elif self.read_only or board.set_leds is None:
+            self.reject(client, f"{name}: LED commands not accepted")
+        elif type(value) is not int or not 0 <= value <= 0xFFFF:
+            self.reject(client, "LED value must be an integer 0..65535")
+        else:
+            board.set_leds(value)
+            self.led_commands += 1
+            self.send(client, ws_frame(encode({"type": "ack", "board": name, "value": value})))
+
+    def reject(self, client, text):
+        self.rejected += 1
+        self.send(client, ws_frame(encode({"type": "error", "message": text})))
+
+    def stats(self):
+        return {
+            "clients": len(self.clients),
+            "ticks": self.ticks,
+            "messages": self.messages,
+            "bytes": self.bytes_sent,
+            "coalesced": self.coalesced,
+            "catch_ups": self.catch_ups,
+            "led_commands": self.led_commands,
+            "rejected": self.rejected,
+            "foreign_origins": self.foreign_origins,
+            "tick_seconds": self.tick_seconds,
+        }
+
+
+# ============================================================================
+# Page
+# ============================================================================
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Nexys A7 dashboard</title>
+<style>
+body{font-family:sans-serif;background:#f4f4f4;margin:10px}
+.board{display:inline-block;vertical-align:top;background:#fff;border:1px solid #ccc;margin:5px;padding:8px;width:430px}
+.board h3{margin:0 0 6px 0}.off{color:#c60}
+.accel span{display:inline-block;width:90px;font:bold 20px Consolas,monospace}
+.temp{font:bold 22px Consolas,monospace}.mono{font-family:Consolas,monospace}
+.sw i{display:inline-block;width:20px;height:18px;margin:1px;font:9px sans-serif;text-align:center;background:#888;color:#fff}
+.sw i.on{background:#2a2}canvas{border:1px solid #ddd;margin-top:4px}
+</style></head><body>
+<div id="status" class="mono">connecting...</div><div id="boards"></div>
+<script>
+const KEEP = 1200, COLORS = {accel_x: "red", accel_y: "green", accel_z: "blue", temperature: "#c60"};
+const boards = {};
+let channels = [];
+
+function card(name, leds) {
+  const el = document.createElement("div");
+  el.className = "board";
+  el.innerHTML = '<h3></h3><div class="mono mode"></div>' +
+    '<div class="accel"><span class="x" style="color:red"></span><span class="y" style="color:green"></span>' +
+    '<span class="z" style="color:blue"></span></div><div class="temp"></div>' +
+    '<div class="sw"></div><div class="mono led"></div>' +
+    (leds ? '<input size="6" placeholder="1234"> <button>Send LEDs</button>' : '') +
+    '<canvas width="420" height="120"></canvas><canvas width="420" height="50"></canvas>';
+  el.querySelector("h3").textContent = name;
+  const sw = el.querySelector(".sw");
+  for (let i = 15; i >= 0; i--) sw.insertAdjacentHTML("beforeend", "<i>" + i + "</i>");
+  if (leds) el.querySelector("button").onclick = () => {
+    const value = parseInt(el.querySelector("input").value, 16);
+    ws.send(JSON.stringify({type: "led", board: name, value: value}));
+  };
+  document.getElementById("boards").appendChild(el);
+  const b = {el: el, state: {}, t: [], lo: {}, hi: {}, dirty: true};
+  for (const ch of channels) { b.lo[ch] = []; b.hi[ch] = []; }
+  return b;
+}
+
+function push(b, s) {
+  const hi = s.max || s.min;
+  b.t.push(...s.t);
+  for (const ch of channels) { b.lo[ch].push(...s.min[ch]); b.hi[ch].push(...hi[ch]); }
+  const extra = b.t.length - KEEP;
+  if (extra > 0) {
+    b.t.splice(0, extra);
+    for (const ch of channels) { b.lo[ch].splice(0, extra); b.hi[ch].splice(0, extra); }
+  }
+}
+
+function apply(name, e) {
+  const b = boards[name] || (boards[name] = card(name, e.leds));
+  if (e.state) Object.assign(b.state, e.state);
+  if (e.samples) push(b, e.samples);
+  b.dirty = true;
+}
+
+function plot(canvas, b, chans) {
+  const g = canvas.getContext("2d"), w = canvas.width, h = canvas.height, n = b.t.length;
+  g.clearRect(0, 0, w, h);
+  if (n < 2) return;
+  let lo = Infinity, hi = -Infinity;
+  for (const ch of chans) for (let i = 0; i < n; i++) { lo = Math.min(lo, b.lo[ch][i]); hi = Math.max(hi, b.hi[ch][i]); }
+  if (hi - lo < 1e-6) { lo -= 1; hi += 1; }
+  const y = v => h - 2 - (v - lo) / (hi - lo) * (h - 4);
+  for (const ch of chans) {
+    g.strokeStyle = COLORS[ch];
+    g.beginPath();
+    for (let i = 0; i < n; i++) {
+      const x = i * (w - 1) / (n - 1);
+      g.moveTo(x, y(b.lo[ch][i]));
+      g.lineTo(x, y(b.hi[ch][i]) - 0.5);
+    }
+    g.stroke();
+  }
+}
+
+function hex(v) { return (v >>> 0).toString(16).toUpperCase().padStart(4, "0"); }
+function sign(v) { return (v < 0 ? "-" : "+") + String(Math.abs(v)).padStart(3, "0"); }
+
+function render(b) {
+  const s = b.state, q = sel => b.el.querySelector(sel);
+  q("h3").className = s.connected === false ? "off" : "";
+  q(".mode").textContent = "MODE " + s.mode + "   RX " + s.rx_count + " B   TX " + s.tx_count + " B";
+  q(".x").textContent = "X " + sign(s.accel_x);
+  q(".y").textContent = "Y " + sign(s.accel_y);
+  q(".z").textContent = "Z " + sign(s.accel_z);
+  q(".temp").textContent = Number(s.temperature).toFixed(2) + " \\u00b0C";
+  b.el.querySelectorAll(".sw i").forEach((el, i) => el.classList.toggle("on", (s.switch_value >> (15 - i)) & 1));
+  q(".led").textContent = "SW 0x" + hex(s.switch_value) + "   PC LED 0x" + hex(s.pc_led_value);
+  const canvases = b.el.querySelectorAll("canvas");
+  plot(canvases[0], b, ["accel_x", "accel_y", "accel_z"]);
+  plot(canvases[1], b, ["temperature"]);
+}
+
+function frame() {
+  for (const b of Object.values(boards)) if (b.dirty) { render(b); b.dirty = false; }
+  requestAnimationFrame(frame);
+}
+
+const ws = new WebSocket((location.protocol === "https:" ? "wss://" : "ws://") + location.host + "/ws");
+ws.onmessage = ev => {
+  const m = JSON.parse(ev.data);
+  if (m.type === "hello") channels = m.channels;
+  if (m.type === "hello" || m.type === "update") {
+    for (const [name, e] of Object.entries(m.boards)) apply(name, e);
+    document.getElementById("status").textContent = "live" + (m.coalesced ? " (caught up " + m.coalesced + " updates)" : "");
+  } else if (m.type === "error") {
+    document.getElementById("status").textContent = "error: " + m.message;
+  }
+};
+ws.onclose = () => { document.getElementById("status").textContent = "disconnected"; };
+requestAnimationFrame(frame);
+</script></body></html>
+"""
+
+
+# ============================================================================
+# Command line (uartserial.py dashboard)
+# ============================================================================
+def add_arguments(ap):
+    ap.add_argument("--port", nargs="*", default=[], help="serial ports to open, e.g. /dev/ttyUSB1 COM5")
+    ap.add_argument("--binary", action="store_true", help="firmware sends binary frames (TX_BINARY = 1)")
+    ap.add_argument("--shm", nargs="*", default=[], metavar="NAME",
+                    help="boards published by other processes (read-only); 'all' for every one")
+    ap.add_argument("--host", default=DASHBOARD_HOST, help="address to bind; 0.0.0.0 for every interface")
+    ap.add_argument("--http-port", type=int, default=DASHBOARD_PORT, help="TCP port to listen on")
+    ap.add_argument("--interval", type=float, default=PUSH_INTERVAL, help="seconds between updates")
+    ap.add_argument("--read-only", action="store_true", help="refuse LED commands")
+    ap.add_argument("--allow-origin", nargs="*", default=[], metavar="ORIGIN",
+                    help="extra page origins allowed to connect, e.g. http://nexys-lab:8080")
+
+
+def run(args):
+    import asyncio
+
+    from shmstate import list_published
+    from txqueue import TxQueue
+
+    boards = []
+    engines = []
+    queues = []
+    for port in args.port:
+        engine = TelemetryEngine(port, BAUDRATE, binary=args.binary)
+        supervise(engine, "dashboard")
+        tx = TxQueue(engine.write, on_error=lambda e, port=port: print(f"dashboard: {port}: TX error: {e}",
+                                                                        file=sys.stderr))
+        boards.append(EngineBoard(os.path.basename(port), engine, tx.set_leds))
+        engines.append(engine)
+        queues.append(tx)
+    names = list_published() if "all" in args.shm else args.shm
+    try:
+        for name in names:
+            boards.append(ShmBoard(name))
+        dashboard = Dashboard(boards, args.host, args.http_port, args.interval, read_only=args.read_only,
+                              allow_origins=args.allow_origin)
+    except (FileNotFoundError, ValueError) as e:
+        sys.exit(f"dashboard: {e}")
+    if not boards:
+        sys.exit("dashboard: no boards (give --port and/or --shm)")
+
+    async def main():
+        await dashboard.open()
+        print(f"dashboard: {len(boards)} board(s) on http://{args.host}:{dashboard.port}/", file=sys.stderr)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await dashboard.close()
+
+    try:
+        for engine, tx in zip(engines, queues):
+            engine.open()
+            tx.start()
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        sys.exit(f"dashboard: {e}")
+    finally:
+        for tx in queues:
+            tx.stop(flush=True, timeout=0.5)
+        for engine in engines:
+            engine.close()
+        for board in boards:
+            board.detach()
+    s = dashboard.stats()
+    print(f"dashboard: {s['messages']} messages, {s['bytes']} bytes, {s['coalesced']} coalesced, "
+          f"{s['led_commands']} LED commands", file=sys.stderr)
+    return 0
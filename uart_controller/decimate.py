@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decimation - FPGA Nexys A7-100T UART
+Reduce a window of samples to a fixed number of points for display.
+
+minmax() keeps the minimum and maximum of every bucket, so a short spike
+survives any amount of reduction (a plain stride would drop it). The work
+is a few vectorized reduceat() calls over views from SampleStore /
+ShmReader; nothing is done per sample in Python.
+"""
+
+import numpy as np
+
+
+def bucket_starts(n, buckets):
+    """Start index of each of `buckets` near-equal buckets over n samples (n > buckets)."""
+    return np.linspace(0, n, buckets, endpoint=False).astype(np.intp)
+
+
+def minmax(cols, names, buckets):
+    """
+    Min/max per bucket of columns `names` (cols: dict or record array).
+
+    Returns (t, mins, maxs): t is the time of each bucket's first sample,
+    mins / maxs map each name to an array of len(t) values. With no more
+    than `buckets` samples every sample is its own bucket and mins and
+    maxs are the same arrays.
+    """
+    t = cols["t"]
+    n = len(t)
+    if n <= buckets:
+        values = {name: cols[name] for name in names}
+        return t, values, values
+    starts = bucket_starts(n, buckets)
+    mins = {name: np.minimum.reduceat(cols[name], starts) for name in names}
+    maxs = {name: np.maximum.reduceat(cols[name], starts) for name in names}
+    return t[starts], mins, maxs
+
+
+# ============================================================================
+# Incremental buckets for scrolling plots
+# ============================================================================
+class BucketCache:
+    """
+    Min/max per fixed-width time bucket over a SampleStore, kept up to date
+    incrementally for a scrolling plot.
+
+    Buckets are `width` seconds long and aligned to multiples of it, so a
+    bucket never changes once a later one has samples: update() reduces only
+    the samples from the start of the newest (still open) bucket on, however
+    long the history is. The last `size` buckets are kept in a ring (one per
+    pixel column of the plot). Channels in `bitwise` keep AND / OR instead
+    of min / max, which per bit is its min / max over the bucket.
+    """
+
+    def __init__(self, store, names, bitwise=(), size=600, width=0.05):
+        self.store = store
+        self.names = tuple(names)
+        self.bitwise = tuple(bitwise)
+        self.reset(size, width)
+
+    def reset(self, size=None, width=None):
+        """New geometry or span; the next update() rebuilds from the store."""
+        if size is not None:
+            self.size = size
+        if width is not None:
+            self.width = width
+        cols = self.store.cols
+        self.ids = np.full(self.size, -1, dtype=np.int64)     # bucket number held by each slot
+        self.lo = {name: np.zeros(self.size, dtype=cols[name].dtype) for name in self.names + self.bitwise}
+        self.hi = {name: np.zeros(self.size, dtype=cols[name].dtype) for name in self.names + self.bitwise}
+        self.open_seq = None        # first sample of the newest bucket
+        self.last_id = None
+        self.seen = -1              # store.count at the last update()
+
+    def update(self):
+        """Fold in samples that arrived since the last call; False if there were none."""
+        store = self.store
+        count = store.count
+        if count == self.seen:
+            return False
+        self.seen = count
+        if self.open_seq is None:
+            cols = store.last_seconds(self.size * self.width)
+        else:
+            cols = store.window(self.open_seq, count)
+        t = cols["t"]
+        if not len(t):
+            return False
+
+        ids = np.floor_divide(t, self.width).astype(np.int64)
+        starts = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+        if len(starts) >= self.size:
+            # Only the newest `size` buckets can be shown
+            first = starts[-self.size]
+            cols = {name: cols[name][first:] for name in ("seq",) + self.names + self.bitwise}
+            ids = ids[first:]
+            starts = starts[-self.size + 1:] - first
+        starts = np.concatenate(([0], starts))
+        bucket_ids = ids[starts]
+        slots = bucket_ids % self.size
+        for name in self.names:
+            self.lo[name][slots] = np.minimum.reduceat(cols[name], starts)
+            self.hi[name][slots] = np.maximum.reduceat(cols[name], starts)
+        for name in self.bitwise:
+            self.lo[name][slots] = np.bitwise_and.reduceat(cols[name], starts)
+            self.hi[name][slots] = np.bitwise_or.reduceat(cols[name], starts)
+        self.ids[slots] = bucket_ids
+        self.open_seq = int(cols["seq"][starts[-1]])
+        self.last_id = int(bucket_ids[-1])
+        return True
+
+    def view(self):
+        """
+        (columns, slots) of the buckets that have samples among the last
+        `size`, oldest first: columns are 0..size-1 from the left, and
+        lo[name][slots] / hi[name][slots] their values.
+        """
+        if self.last_id is None:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty
+        wanted = np.arange(self.last_id - self.size + 1, self.last_id + 1)
+        slots = wanted % self.size
+        present = self.ids[slots] == wanted
+        return np.flatnonzero(present), slots[present]
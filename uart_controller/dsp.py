@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Accelerometer DSP - FPGA Nexys A7-100T UART
+Block-wise NumPy filters with carried state: EMA, moving average,
+magnitude / tilt, Welford statistics, vibration spectrum.
+
+Every stage takes a block of samples (shape (n,) or (n, channels)) and
+keeps what it needs between blocks, so feeding a stream in blocks of any
+size gives the same output as feeding it one sample at a time (up to
+float rounding).
+"""
+
+import math
+
+import numpy as np
+
+
+# ACC_IN at which the firmware acc_scaled_to_deg_* LUTs reach 90 degrees
+COUNTS_PER_G = 1024
+# EMA: the closed form below multiplies by (1 - alpha) ** -k; segments are
+# cut so that factor stays below 10 ** EMA_SCALE_DIGITS
+EMA_SCALE_DIGITS = 8
+# ADXL362 ODR with TX_BINARY builds (TOP.v), and the ASCII line rate
+RATE_BINARY = 100.0
+RATE_ASCII = 2.0
+
+
+def _as_block(block):
+    return np.asarray(block, dtype=np.float64)
+
+
+# ============================================================================
+# Smoothing
+# ============================================================================
+class Ema:
+    """
+    y[n] = y[n-1] + alpha * (x[n] - y[n-1]), starting at the first sample.
+
+    A block is solved in closed form,
+        y[k] = b**(k+1) * y[-1] + alpha * sum_j b**(k-j) * x[j],  b = 1 - alpha,
+    with one cumsum per segment instead of a Python loop per sample.
+    """
+
+    def __init__(self, alpha):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.y = None
+        b = 1.0 - alpha
+        self.segment = int(EMA_SCALE_DIGITS * math.log(10) / -math.log(b)) if b > 0 else None
+
+    def reset(self):
+        self.y = None
+
+    def process(self, block):
+        x = _as_block(block)
+        if not len(x):
+            return x.copy()
+        if self.alpha == 1.0:
+            self.y = x[-1].copy()
+            return x.copy()
+        if self.y is None:
+            self.y = x[0].copy()
+
+        a = self.alpha
+        b = 1.0 - a
+        out = np.empty_like(x)
+        seg = max(1, self.segment)
+        y = self.y
+        for start in range(0, len(x), seg):
+            xs = x[start:start + seg]
+            k = np.arange(len(xs), dtype=np.float64)
+            if xs.ndim > 1:
+                k = k[:, None]
+            acc = np.cumsum(xs * b ** -k, axis=0)
+            ys = b ** k * (a * acc + b * y)
+            out[start:start + len(xs)] = ys
+            y = ys[-1]
+        self.y = y.copy() if isinstance(y, np.ndarray) else y
+        return out
+
+
+class MovingAverage:
+    """Mean of the last `window` samples (fewer until that many were seen)."""
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.tail = None        # last window - 1 samples
+        self.seen = 0
+
+    def reset(self):
+        self.tail = None
+        self.seen = 0
+
+    def process(self, block):
+        x = _as_block(block)
+        n = len(x)
+        if not n:
+            return x.copy()
+        w = self.window
+        tail = self.tail if self.tail is not None else x[:0]
+        full = np.concatenate([tail, x])
+        csum = np.concatenate([np.zeros((1,) + x.shape[1:]), np.cumsum(full, axis=0)])
+        end = np.arange(len(tail) + 1, len(full) + 1)
+        start = np.maximum(end - w, 0)
+        count = np.minimum(self.seen + np.arange(1, n + 1), w).astype(np.float64)
+        if x.ndim > 1:
+            count = count[:, None]
+        out = (csum[end] - csum[start]) / count
+        self.tail = full[-(w - 1):].copy() if w > 1 else x[:0].copy()
+        self.seen += n
+        return out
+
+
+# ============================================================================
+# Geometry (stateless)
+# ============================================================================
+def magnitude(x, y, z):
+    x, y, z = _as_block(x), _as_block(y), _as_block(z)
+    return np.sqrt(x * x + y * y + z * z)
+
+
+def tilt(x, y, z):
+    """
+    (pitch, roll, inclination) in degrees: X and Y axis above the horizontal
+    plane, and Z away from vertical. Ratios of axes, so independent of the
+    counts-per-g scale.
+    """
+    x, y, z = _as_block(x), _as_block(y), _as_block(z)
+    pitch = np.degrees(np.arctan2(x, np.hypot(y, z)))
+    roll = np.degrees(np.arctan2(y, np.hypot(x, z)))
+    incline = np.degrees(np.arctan2(np.hypot(x, y), z))
+    return pitch, roll, incline
+
+
+def axis_degrees(counts, one_g=COUNTS_PER_G):
+    """
+    Host-side acc_scaled_to_deg_*: |counts| / one_g -> 0..90 degrees (asin,
+    saturating at 1 g), the per-axis angle the firmware LUTs approximate.
+    """
+    ratio = np.minimum(np.abs(_as_block(counts)) / one_g, 1.0)
+    return np.degrees(np.arcsin(ratio))
+
+
+# ============================================================================
+# Statistics
+# ============================================================================
+class Welford:
+    """
+    Running mean / variance per channel.
+
+    Each block's count, mean and sum of squared deviations come from NumPy
+    and are combined with the running values using Chan et al.'s pairwise
+    update, which is what per-sample Welford computes, without the loop.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def process(self, block):
+        x = _as_block(block)
+        nb = len(x)
+        if not nb:
+            return
+        mean_b = x.mean(axis=0)
+        m2_b = ((x - mean_b) ** 2).sum(axis=0)
+        n = self.count
+        total = n + nb
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (nb / total)
+        self.m2 = self.m2 + m2_b + delta * delta * (n * nb / total)
+        self.count = total
+
+    @property
+    def variance(self):
+        """Sample variance (n - 1); 0 until two samples were seen."""
+        if self.count < 2:
+            return self.m2 * 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+# ============================================================================
+# Spectrum
+# ============================================================================
+class Spectrum:
+    """
+    Vibration spectrum from FFT segments of `size` samples.
+
+    Samples are buffered until a segment is full; segments start every
+    size * (1 - overlap) samples no matter how the input was blocked. Each
+    segment has its mean removed and a Hann window applied; `latest` is the
+    amplitude spectrum of the last segment and `average` the running mean
+    power (Welch) over all segments so far.
+    """
+
+    def __init__(self, size=256, rate=RATE_BINARY, overlap=0.5):
+        if size < 2 or not 0.0 <= overlap < 1.0:
+            raise ValueError("size must be >= 2 and overlap in [0, 1)")
+        self.size = size
+        self.rate = rate
+        self.step = max(1, int(size * (1.0 - overlap)))
+        self.window = np.hanning(size)
+        self.scale = 2.0 / self.window.sum()
+        self.freqs = np.fft.rfftfreq(size, 1.0 / rate)
+        self.buf = np.zeros(0)
+        self.latest = None
+        self.power_sum = np.zeros(len(self.freqs))
+        self.segments = 0
+
+    def reset(self):
+        self.buf = np.zeros(0)
+        self.latest = None
+        self.power_sum[:] = 0.0
+        self.segments = 0
+
+    def process(self, block):
+        """Add samples (1-D); returns the amplitude spectra of segments completed."""
+        buf = np.concatenate([self.buf, _as_block(block).ravel()])
+        starts = range(0, len(buf) - self.size + 1, self.step)
+        if not len(starts):
+            self.buf = buf
+            return []
+        segs = np.stack([buf[s:s + self.size] for s in starts])
+        segs = (segs - segs.mean(axis=1, keepdims=True)) * self.window
+        amps = np.abs(np.fft.rfft(segs, axis=1)) * self.scale
+        self.power_sum += (amps * amps).sum(axis=0)
+        self.segments += len(amps)
+        self.latest = amps[-1]
+        self.buf = buf[starts[-1] + self.step:]
+        return list(amps)
+
+    @property
+    def average(self):
+        if not self.segments:
+            return None
+        return np.sqrt(self.power_sum / self.segments)
+
+    def peak(self):
+        """(frequency, amplitude) of the strongest non-DC bin of the average."""
+        avg = self.average
+        if avg is None or len(avg) < 2:
+            return None
+        i = int(np.argmax(avg[1:])) + 1
+        return float(self.freqs[i]), float(avg[i])
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+class AccelPipeline:
+    """
+    Derived channels for blocks of (x, y, z) accelerometer samples.
+
+    process(block) with block shape (n, 3) returns a dict of arrays:
+        smooth      EMA of x, y, z              (n, 3)
+        magnitude   |a| in counts               (n,)
+        mag_avg     moving average of |a|       (n,)
+        pitch, roll, incline   degrees          (n,)
+    and updates `stats` (Welford over x, y, z, |a|) and `spectrum` (FFT of
+    |a|, i.e. vibration independent of orientation).
+    """
+
+    def __init__(self, rate=RATE_BINARY, alpha=0.2, window=10, fft_size=256):
+        self.ema = Ema(alpha)
+        self.mag_avg = MovingAverage(window)
+        self.stats = Welford()
+        self.spectrum = Spectrum(fft_size, rate)
+        self.last = None
+
+    def reset(self):
+        for stage in (self.ema, self.mag_avg, self.stats, self.spectrum):
+            stage.reset()
+        self.last = None
+
+    def process(self, block):
+        xyz = _as_block(block).reshape(-1, 3)
+        if not len(xyz):
+            return None
+        x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+        mag = magnitude(x, y, z)
+        pitch, roll, incline = tilt(x, y, z)
+        self.stats.process(np.column_stack([xyz, mag]))
+        self.spectrum.process(mag)
+        self.last = {
+            "smooth": self.ema.process(xyz),
+            "magnitude": mag,
+            "mag_avg": self.mag_avg.process(mag),
+            "pitch": pitch,
+            "roll": roll,
+            "incline": incline,
+        }
+        return self.last
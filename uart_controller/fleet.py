@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet manager - FPGA Nexys A7-100T UART
+Many boards on one selector thread, aggregate statistics.
+
+    python fleet.py [--vid 0403 --pid 6010] [--serial 210292A...] [--binary]
+
+POSIX only: serial fds are multiplexed with the selectors module.
+"""
+
+import argparse
+import os
+import selectors
+import sys
+import threading
+import time
+
+import serial
+import serial.tools.list_ports
+
+from telemetry import BAUDRATE, TelemetryEngine
+
+
+# Nexys A7 USB-UART: FTDI FT2232HQ
+DIGILENT_VID = 0x0403
+DIGILENT_PID = 0x6010
+READ_SIZE = 4096
+# Select timeout: bounds how long stop() and add() wait for the loop
+SELECT_TIMEOUT = 0.5
+# A board with no frame for this long is reported as stale
+STALE_AFTER = 2.0
+
+
+def match_ports(vid=None, pid=None, serial_numbers=None, ports=None):
+    """comports() entries matching every given filter, sorted by device."""
+    if ports is None:
+        ports = serial.tools.list_ports.comports()
+    out = []
+    for p in ports:
+        if vid is not None and p.vid != vid:
+            continue
+        if pid is not None and p.pid != pid:
+            continue
+        if serial_numbers and p.serial_number not in serial_numbers:
+            continue
+        out.append(p)
+    return sorted(out, key=lambda p: p.device)
+
+
+# ============================================================================
+# Board record
+# ============================================================================
+class FleetBoard:
+    """One port of the fleet: its engine plus counters the view reads."""
+
+    def __init__(self, port, engine, serial_number=None):
+        self.port = port
+        self.serial_number = serial_number
+        self.engine = engine
+        self.state = engine.state
+        self.connected = True
+        self.last_error = None
+
+        # Stats (written on the fleet thread, read by anyone)
+        self.frames = 0
+        self.bad_frames = 0
+        self.errors = 0
+        self.last_seen = None
+
+        engine.subscribe("frame", self.on_frame)
+
+    def on_frame(self, frame):
+        self.frames += 1
+        self.last_seen = frame.t_rx
+        if not frame.ok:
+            self.bad_frames += 1
+
+    def row(self, now):
+        """Values for one grid row."""
+        state = self.state
+        seen = None if self.last_seen is None else now - self.last_seen
+        return {
+            "port": self.port,
+            "serial": self.serial_number or "",
+            "connected": self.connected,
+            "mode": state.current_mode,
+            "accel": (state.accel_x, state.accel_y, state.accel_z),
+            "temperature": state.temperature,
+            "switches": state.switch_value,
+            "leds": state.pc_led_value,
+            "frames": self.frames,
+            "errors": self.errors + self.bad_frames + self.engine.framer.resyncs,
+            "last_seen": seen,
+            "stale": seen is None or seen > STALE_AFTER,
+        }
+
+
+# ============================================================================
+# Fleet
+# ============================================================================
+class Fleet:
+    """
+    Reads every board from one thread.
+
+    All serial fds are registered with a single selector; a readable fd is
+    read once (non-blocking) and its bytes go through that board's
+    TelemetryEngine.feed(). Engine events therefore fire on the fleet
+    thread. add()/remove() may be called from any thread: they are queued
+    and applied by the loop, which a pipe wakes up.
+    """
+
+    def __init__(self, baudrate=BAUDRATE, binary=False):
+        self.baudrate = baudrate
+        self.binary = binary
+        self.boards = {}            # port -> FleetBoard
+        self.selector = selectors.DefaultSelector()
+        self.lock = threading.Lock()
+        self.pending = []           # ("add" | "remove", board)
+        self.running = False
+        self.thread = None
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        self.selector.register(self.wake_r, selectors.EVENT_READ, None)
+
+        # Aggregate rate bookkeeping for stats()
+        self.last_stats = (time.monotonic(), 0)
+
+    # ------------------------------------------------------------------
+    # Boards
+    # ------------------------------------------------------------------
+    def add(self, port, serial_number=None, ser=None):
+        if ser is None:
+            ser = serial.Serial(port, self.baudrate, timeout=0)
+        engine = TelemetryEngine(port, self.baudrate, ser=ser, binary=self.binary)
+        board = FleetBoard(port, engine, serial_number)
+        with self.lock:
+            self.boards[port] = board
+            self.pending.append(("add", board))
+        self._wake()
+        return board
+
+    def add_matching(self, vid=DIGILENT_VID, pid=DIGILENT_PID, serial_numbers=None):
+        """
+        Open every matching port not already connected. A board that failed
+        (unplugged) is replaced by a fresh one, so a re-plugged board comes
+        back. Returns (added, failed): the new boards, and (device, error)
+        for ports that would not open (busy, no permission, unplugged
+        meanwhile).
+        """
+        added = []
+        failed = []
+        for info in match_ports(vid, pid, serial_numbers):
+            board = self.boards.get(info.device)
+            if board is not None and board.connected:
+                continue
+            try:
+                added.append(self.add(info.device, info.serial_number))
+            except serial.SerialException as e:
+                failed.append((info.device, e))
+        return added, failed
+
+    def remove(self, port):
+        with self.lock:
+            board = self.boards.pop(port, None)
+            if board is not None:
+                self.pending.append(("remove", board))
+        self._wake()
+
+    def write(self, port, data):
+        self.boards[port].engine.write(data)
+
+    def broadcast(self, data):
+        for board in list(self.boards.values()):
+            if board.connected:
+                board.engine.write(data)
+
+    # ------------------------------------------------------------------
+    # Thread
+    # ------------------------------------------------------------------
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        if self.thread is not None:
+            self.thread.join(SELECT_TIMEOUT * 2)
+            self.thread = None
+        for port in list(self.boards):
+            self._close(self.boards.pop(port))
+        self.selector.close()
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+
+    def run(self):
+        select = self.selector.select
+        monotonic = time.monotonic
+        while self.running:
+            if self.pending:
+                self._apply_pending()
+            for key, _ in select(SELECT_TIMEOUT):
+                board = key.data
+                if board is None:
+                    self._drain_wake()
+                    continue
+                try:
+                    data = os.read(key.fd, READ_SIZE)
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    self._fail(board, e)
+                    continue
+                if not data:
+                    self._fail(board, serial.SerialException("device disconnected"))
+                    continue
+                board.engine.feed(data, monotonic())
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+    def rows(self):
+        now = time.monotonic()
+        return [board.row(now) for _, board in sorted(self.boards.items())]
+
+    def stats(self, rows=None):
+        """Fleet totals; frames/s is measured since the previous stats() call."""
+        if rows is None:
+            rows = self.rows()
+        now = time.monotonic()
+        frames = sum(r["frames"] for r in rows)
+        t_prev, frames_prev = self.last_stats
+        self.last_stats = (now, frames)
+        dt = now - t_prev
+        return {
+            "boards": len(rows),
+            "connected": sum(r["connected"] for r in rows),
+            "stale": sum(r["stale"] for r in rows),
+            "frames": frames,
+            "frames_per_s": (frames - frames_prev) / dt if dt > 0 else 0.0,
+            "errors": sum(r["errors"] for r in rows),
+            "rx_bytes": sum(b.state.rx_count for b in self.boards.values()),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _wake(self):
+        try:
+            os.write(self.wake_w, b"\0")
+        except OSError:
+            pass
+
+    def _drain_wake(self):
+        try:
+            os.read(self.wake_r, 4096)
+        except BlockingIOError:
+            pass
+
+    def _apply_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for op, board in pending:
+            fd = board.engine.ser.fileno()
+            if op == "add":
+                os.set_blocking(fd, False)
+                self.selector.register(fd, selectors.EVENT_READ, board)
+            else:
+                self._close(board)
+
+    def _fail(self, board, exc):
+        board.errors += 1
+        board.last_error = exc
+        board.engine.emit("error", exc)
+        self._close(board)
+
+    def _close(self, board):
+        if not board.connected:
+            return
+        board.connected = False
+        ser = board.engine.ser
+        try:
+            self.selector.unregister(ser.fileno())
+        except (KeyError, ValueError, OSError):
+            pass
+        try:
+            ser.close()
+        except Exception:
+            pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Open every matching board and print fleet stats")
+    ap.add_argument("--vid", type=lambda s: int(s, 16), default=DIGILENT_VID)
+    ap.add_argument("--pid", type=lambda s: int(s, 16), default=DIGILENT_PID)
+    ap.add_argument("--serial", nargs="*", help="only these USB serial numbers")
+    ap.add_argument("--port", nargs="*", default=[], help="extra ports to open (e.g. virtual boards)")
+    ap.add_argument("--binary", action="store_true")
+    ap.add_argument("--interval", type=float, default=1.0)
+    args = ap.parse_args()
+
+    fleet = Fleet(binary=args.binary)
+    _, failed = fleet.add_matching(args.vid, args.pid, args.serial)
+    for device, e in failed:
+        print(f"{device}: {e}", file=sys.stderr)
+    for port in args.port:
+        fleet.add(port)
+    fleet.start()
+    try:
+        while True:
+            time.sleep(args.interval)
+            s = fleet.stats()
+            print(f"boards={s['boards']} connected={s['connected']} stale={s['stale']} "
+                  f"frames/s={s['frames_per_s']:.1f} errors={s['errors']}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fleet.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet view - FPGA Nexys A7-100T UART
+One Treeview row per board, refreshed by a single timer.
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from fleet import DIGILENT_PID, DIGILENT_VID, Fleet
+
+
+FLEET_REFRESH_MS = 500
+COLUMNS = (
+    ("port", "Port", 110),
+    ("serial", "Serial", 110),
+    ("mode", "Mode", 45),
+    ("accel", "X / Y / Z", 120),
+    ("temperature", "Temp", 60),
+    ("switches", "SW", 55),
+    ("leds", "LED", 55),
+    ("frames", "Frames", 70),
+    ("errors", "Errors", 55),
+    ("last_seen", "Last seen", 70),
+)
+
+
+def format_row(row):
+    x, y, z = row["accel"]
+    seen = row["last_seen"]
+    return (
+        row["port"],
+        row["serial"],
+        f"M{row['mode']}",
+        f"{x:+4d} {y:+4d} {z:+4d}",
+        f"{row['temperature']:.2f}",
+        f"{row['switches']:04X}",
+        f"{row['leds']:04X}",
+        row["frames"],
+        row["errors"],
+        "-" if seen is None else f"{seen:.1f} s",
+    )
+
+
+class FleetWindow:
+    """
+    Toplevel with the fleet grid and totals.
+
+    Boards are read on the Fleet thread; this window only polls Fleet.rows()
+    once per FLEET_REFRESH_MS and pushes a row to the Treeview when its
+    formatted values differ from what is shown, so idle boards cost nothing
+    and there is exactly one Tk timer for the whole fleet.
+    """
+
+    def __init__(self, root, binary=False):
+        self.root = root
+        self.fleet = Fleet(binary=binary).start()
+        self.shown = {}         # port -> values tuple on screen
+        self.after_id = None
+
+        self.win = tk.Toplevel(root)
+        self.win.title("FPGA Nexys A7 - Fleet")
+        self.win.geometry("900x500")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+        self.build_ui()
+        self.refresh()
+
+    def build_ui(self):
+        top = ttk.Frame(self.win, padding=5)
+        top.pack(fill="x")
+
+        ttk.Label(top, text="VID:").pack(side="left")
+        self.vid_var = tk.StringVar(value=f"{DIGILENT_VID:04X}")
+        ttk.Entry(top, textvariable=self.vid_var, width=6).pack(side="left", padx=(0, 5))
+        ttk.Label(top, text="PID:").pack(side="left")
+        self.pid_var = tk.StringVar(value=f"{DIGILENT_PID:04X}")
+        ttk.Entry(top, textvariable=self.pid_var, width=6).pack(side="left", padx=(0, 5))
+        ttk.Label(top, text="Serial:").pack(side="left")
+        self.serial_var = tk.StringVar()
+        ttk.Entry(top, textvariable=self.serial_var, width=14).pack(side="left", padx=(0, 5))
+        ttk.Button(top, text="Open matching", command=self.open_matching).pack(side="left", padx=5)
+
+        ttk.Label(top, text="LED (hex):").pack(side="left", padx=(15, 0))
+        self.led_var = tk.StringVar(value="0000")
+        ttk.Entry(top, textvariable=self.led_var, width=6).pack(side="left", padx=(0, 5))
+        ttk.Button(top, text="Send to all", command=self.broadcast_leds).pack(side="left")
+
+        self.tree = ttk.Treeview(self.win, columns=[c[0] for c in COLUMNS], show="headings")
+        for name, title, width in COLUMNS:
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, anchor="center", stretch=False)
+        self.tree.tag_configure("stale", foreground="gray")
+        self.tree.tag_configure("down", foreground="red")
+        self.tree.pack(fill="both", expand=True, padx=5)
+
+        self.totals_var = tk.StringVar(value="No boards")
+        ttk.Label(self.win, textvariable=self.totals_var, relief="sunken").pack(fill="x", padx=5, pady=5)
+
+    # ========================================================================
+    # Actions
+    # ========================================================================
+    def open_matching(self):
+        try:
+            vid = int(self.vid_var.get(), 16) if self.vid_var.get().strip() else None
+            pid = int(self.pid_var.get(), 16) if self.pid_var.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Error", "VID/PID must be hex", parent=self.win)
+            return
+        serials = self.serial_var.get().split() or None
+        added, failed = self.fleet.add_matching(vid, pid, serials)
+        self.totals_var.set(f"Opened {len(added)} new port(s)"
+                            + (f", {len(failed)} failed" if failed else ""))
+        if failed:
+            messagebox.showwarning("Open failed", "\n".join(f"{device}: {e}" for device, e in failed),
+                                   parent=self.win)
+
+    def broadcast_leds(self):
+        try:
+            value = int(self.led_var.get(), 16) & 0xFFFF
+        except ValueError:
+            messagebox.showerror("Error", "Invalid hex", parent=self.win)
+            return
+        self.fleet.broadcast(bytes([value & 0xFF, value >> 8]))
+
+    def close(self):
+        if self.after_id is not None:
+            self.win.after_cancel(self.after_id)
+        self.fleet.stop()
+        self.win.destroy()
+
+    # ========================================================================
+    # Refresh (single timer for the whole fleet)
+    # ========================================================================
+    def refresh(self):
+        rows = self.fleet.rows()
+        shown = self.shown
+        for row in rows:
+            port = row["port"]
+            values = format_row(row)
+            tag = "down" if not row["connected"] else "stale" if row["stale"] else ""
+            key = (values, tag)
+            if shown.get(port) == key:
+                continue
+            if port in shown:
+                self.tree.item(port, values=values, tags=(tag,))
+            else:
+                self.tree.insert("", "end", iid=port, values=values, tags=(tag,))
+            shown[port] = key
+
+        s = self.fleet.stats(rows)
+        self.totals_var.set(
+            f"Boards: {s['boards']}  connected: {s['connected']}  stale: {s['stale']}  "
+            f"frames/s: {s['frames_per_s']:.1f}  errors: {s['errors']}  RX bytes: {s['rx_bytes']}")
+        self.after_id = self.win.after(FLEET_REFRESH_MS, self.refresh)
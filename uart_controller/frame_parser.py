@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Frame parser - FPGA Nexys A7-100T UART
+Table-driven, fixed-offset decoding with a regex fallback, batch API.
+
+Line formats (TOP.v, TX Message Builder):
+    M0:X=+xxx Y=+xxx Z=+xxx
+    M1:T=xx.xxC
+    M2:SW=xxxx
+    M3:RX=xx L=xxxx
+    M4:X=+xxx T=xxC S=xxxx
+"""
+
+import re
+from collections import namedtuple
+
+
+# mode, fields (dict of BoardState attribute -> value), receive timestamp,
+# ok (False if the prefix was known but the body did not match; an M4 line
+# with some fields unreadable keeps the others, with ok False)
+Frame = namedtuple("Frame", "mode fields t_rx ok")
+
+# namedtuple.__new__ is a Python function; this is the C constructor
+_new_frame = tuple.__new__
+
+
+# ============================================================================
+# Fixed-offset decoders (TOP.v writes every field at a fixed position)
+# ============================================================================
+# Value slots are looked up in these tables, which hold exactly the strings
+# the firmware can send; anything else raises KeyError.
+_HEX = "0123456789ABCDEFabcdef"
+SIGNED3 = {b"%c%03d" % (sign, i): -i if sign == ord("-") else i for sign in b"+-" for i in range(1000)}
+DEC2 = {b"%02d" % i: i for i in range(100)}
+HEX2 = {(a + b).encode(): int(a + b, 16) for a in _HEX for b in _HEX}
+
+# A line's shape: every byte a value slot may hold becomes '#', so one dict
+# lookup checks the length and every separator at once. The mode digit and
+# the 'C' unit (a hex digit) are shaped too; the decoders check them.
+VALUE_CHARS = b"0123456789+-ABCDEFabcdef"
+SHAPE = bytes.maketrans(VALUE_CHARS, b"#" * len(VALUE_CHARS))
+
+
+def _fixed_m0(line):
+    # M0:X=+xxx Y=+xxx Z=+xxx
+    if line[1] != 0x30:
+        return None
+    return {"accel_x": SIGNED3[line[5:9]], "accel_y": SIGNED3[line[12:16]], "accel_z": SIGNED3[line[19:23]]}
+
+
+def _fixed_m1(line):
+    # M1:T=xx.xxC; same arithmetic as the old parse_rx_line
+    if line[1] != 0x31 or line[10] != 0x43:
+        return None
+    return {"temperature": DEC2[line[5:7]] + DEC2[line[8:10]] / 100.0}
+
+
+def _fixed_m2(line):
+    # M2:SW=xxxx
+    if line[1] != 0x32:
+        return None
+    return {"switch_value": HEX2[line[6:8]] << 8 | HEX2[line[8:10]]}
+
+
+def _fixed_m3(line):
+    # M3:RX=xx L=xxxx (RX is not kept, so its slot is not decoded)
+    if line[1] != 0x33:
+        return None
+    return {"pc_led_value": HEX2[line[11:13]] << 8 | HEX2[line[13:15]]}
+
+
+def _fixed_m4(line):
+    # M4:X=+xxx T=xxC S=xxxx
+    if line[1] != 0x34 or line[14] != 0x43:
+        return None
+    return {"accel_x": SIGNED3[line[5:9]], "temperature": float(DEC2[line[12:14]]),
+            "switch_value": HEX2[line[18:20]] << 8 | HEX2[line[20:22]]}
+
+
+# Shape of each firmware line -> (mode, decoder)
+FIXED_TABLE = {
+    b"M0:X=+000 Y=+000 Z=+000".translate(SHAPE): (0, _fixed_m0),
+    b"M1:T=00.00C".translate(SHAPE): (1, _fixed_m1),
+    b"M2:SW=0000".translate(SHAPE): (2, _fixed_m2),
+    b"M3:RX=00 L=0000".translate(SHAPE): (3, _fixed_m3),
+    b"M4:X=+000 T=00C S=0000".translate(SHAPE): (4, _fixed_m4),
+}
+
+
+# ============================================================================
+# Regex fallback: lines that are not exactly what the firmware writes
+# (other widths, spacing, a corrupted byte) -> (fields, ok)
+# ============================================================================
+HEX4 = rb"([0-9A-Fa-f]{4})"
+INT = rb"([+-]?\d+)"
+
+
+def _matcher(pattern, build):
+    match = re.compile(pattern).match
+
+    def fallback(line):
+        m = match(line, 3)
+        if m is None:
+            return {}, False
+        return build(*m.groups()), True
+    return fallback
+
+
+def _build_m0(x, y, z):
+    return {"accel_x": int(x), "accel_y": int(y), "accel_z": int(z)}
+
+
+def _build_m1(int_part, frac_part):
+    return {"temperature": int(int_part) + int(frac_part) / 100.0}
+
+
+def _build_m2(sw):
+    return {"switch_value": int(sw, 16)}
+
+
+def _build_m3(led):
+    return {"pc_led_value": int(led, 16)}
+
+
+# M4 fields are searched one by one, as the old parser did: a line with a
+# bad T still updates X and S (the frame is not ok)
+M4_FIELDS = (
+    (re.compile(rb"X=" + INT).search, "accel_x", int),
+    (re.compile(rb"T=(\d+)C").search, "temperature", lambda v: float(int(v))),
+    (re.compile(rb"S=" + HEX4).search, "switch_value", lambda v: int(v, 16)),
+)
+
+
+def _search_m4(line):
+    fields = {}
+    for search, name, convert in M4_FIELDS:
+        m = search(line, 3)
+        if m is not None:
+            fields[name] = convert(m.group(1))
+    return fields, len(fields) == len(M4_FIELDS)
+
+
+# ============================================================================
+# Fallback table: 3-byte prefix -> (mode, fallback)
+# ============================================================================
+FRAME_TABLE = {
+    b"M0:": (0, _matcher(rb"\s*X=" + INT + rb"\s+Y=" + INT + rb"\s+Z=" + INT, _build_m0)),
+    b"M1:": (1, _matcher(rb"\s*T=(\d+)\.(\d+)C", _build_m1)),
+    b"M2:": (2, _matcher(rb"\s*SW=" + HEX4, _build_m2)),
+    b"M3:": (3, _matcher(rb"\s*(?:RX=[0-9A-Fa-f]{2}\s+)?L=" + HEX4, _build_m3)),
+    b"M4:": (4, _search_m4),
+}
+
+
+def parse_frame(line, t_rx=0.0):
+    """Parse one line (bytes, stripped). Return a Frame, or None if not M0..M4."""
+    frames = parse_batch((line,), t_rx)
+    return frames[0] if frames else None
+
+
+def parse_batch(lines, t_rx=0.0):
+    """Parse many framed lines received at `t_rx`; unknown lines are skipped."""
+    fixed_get = FIXED_TABLE.get
+    get = FRAME_TABLE.get
+    new = _new_frame
+    frames = []
+    append = frames.append
+    for line in lines:
+        entry = fixed_get(line.translate(SHAPE))
+        if entry is not None:
+            mode, fixed = entry
+            try:
+                fields = fixed(line)
+            except KeyError:        # a value slot holds something the firmware never sends
+                fields = None
+            if fields is not None:
+                append(new(Frame, (mode, fields, t_rx, True)))
+                continue
+        entry = get(line[:3])
+        if entry is None:
+            continue
+        mode, fallback = entry
+        fields, ok = fallback(line)
+        append(new(Frame, (mode, fields, t_rx, ok)))
+    return frames
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Line framer - FPGA Nexys A7-100T UART
+Preallocated bytearray ring, zero-copy line views.
+"""
+
+DEFAULT_CAPACITY = 64 * 1024
+# Firmware TX buffer is r_tx_buffer[0:63], anything much longer is noise
+MAX_LINE = 256
+DELIMITER = 0x0A
+WHITESPACE = b" \t\r\n\x00"
+
+
+class RingFramer:
+    """
+    Split a byte stream on '\\n' without building intermediate strings.
+
+    Incoming bytes are copied once into a fixed bytearray. Delimiters are
+    found with bytearray.find() and every line is handed out as a memoryview
+    into that buffer (CR/whitespace trimmed). Unread bytes are moved back to
+    the start of the buffer only when the end is reached; at most one partial
+    line (<= max_line bytes) is ever moved, so the buffer never grows.
+
+    Garbage handling: if more than max_line bytes arrive without a newline,
+    they are dropped and the framer discards up to the next newline before
+    handing out lines again (counted in `resyncs` / `dropped_bytes`).
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_line=MAX_LINE):
+        if capacity <= max_line:
+            raise ValueError("capacity must be larger than max_line")
+        self.capacity = capacity
+        self.max_line = max_line
+        self.buf = bytearray(capacity)
+        self.view = memoryview(self.buf)
+
+        self.head = 0       # first unread byte
+        self.tail = 0       # end of valid data
+        self.scan = 0       # resume point for the delimiter search
+        self.discarding = False
+
+        # Stats
+        self.lines = 0
+        self.resyncs = 0
+        self.dropped_bytes = 0
+
+    def reset(self):
+        self.head = self.tail = self.scan = 0
+        self.discarding = False
+
+    @property
+    def pending(self):
+        return self.tail - self.head
+
+    # ------------------------------------------------------------------
+    # Feeding
+    # ------------------------------------------------------------------
+    def feed(self, data):
+        """
+        Generator of memoryview lines for `data`.
+
+        Each view points into the ring and is only valid until the generator
+        is advanced; decode or copy it before asking for the next line. The
+        generator must be exhausted for all of `data` to be consumed.
+        """
+        src = memoryview(data)
+        pos = 0
+        size = len(src)
+        while pos < size:
+            if self.tail == self.capacity:
+                self._compact()
+            chunk = min(self.capacity - self.tail, size - pos)
+            self.buf[self.tail:self.tail + chunk] = src[pos:pos + chunk]
+            self.tail += chunk
+            pos += chunk
+            # Views stay valid until the next chunk is copied in
+            yield from self._frames()
+
+    def split(self, data):
+        """
+        List of complete lines (bytes) for `data`.
+
+        Same buffering and garbage rules as feed(), but the complete region of
+        the ring is cut with one C-level bytes.split() per chunk. Use this when
+        the caller wants owned bytes anyway (decoding, batch parsing): it
+        avoids one Python-level find() and memoryview per line.
+        """
+        src = memoryview(data)
+        pos = 0
+        size = len(src)
+        lines = []
+        while pos < size:
+            if self.tail == self.capacity:
+                self._compact()
+            chunk = min(self.capacity - self.tail, size - pos)
+            self.buf[self.tail:self.tail + chunk] = src[pos:pos + chunk]
+            self.tail += chunk
+            pos += chunk
+            self._split_region(lines)
+        return lines
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _compact(self):
+        pending = self.tail - self.head
+        if pending:
+            # Source and destination may overlap, go through a small copy
+            self.buf[0:pending] = bytes(self.view[self.head:self.tail])
+        self.scan -= self.head
+        self.head = 0
+        self.tail = pending
+
+    def _drop(self, count):
+        self.dropped_bytes += count
+        if not self.discarding:
+            self.resyncs += 1
+
+    def _split_region(self, out):
+        buf = self.buf
+        head = self.head
+        tail = self.tail
+
+        last = buf.rfind(DELIMITER, self.scan, tail)
+        if last < 0:
+            self._leftover(head, tail)
+            return
+
+        if self.discarding:
+            first = buf.find(DELIMITER, head, tail)
+            self.dropped_bytes += first + 1 - head
+            self.discarding = False
+            head = first + 1
+
+        if head <= last:
+            lines = [line.strip(WHITESPACE) for line in bytes(self.view[head:last]).split(b"\n")]
+            if max(map(len, lines)) > self.max_line:
+                for line in lines:
+                    if len(line) > self.max_line:
+                        self.dropped_bytes += len(line) + 1
+                        self.resyncs += 1
+                lines = [line for line in lines if len(line) <= self.max_line]
+            count = len(out)
+            out.extend(filter(None, lines))
+            self.lines += len(out) - count
+
+        self._leftover(last + 1, tail)
+
+    def _leftover(self, head, tail):
+        """Bookkeeping for the bytes after the last newline."""
+        pending = tail - head
+        # Over max_line only by its CR / padding is not too long yet (the
+        # complete line is measured trimmed); a ring full of it is
+        if pending > self.max_line and (self.discarding or pending == self.capacity
+                                        or len(self.buf[head:tail].strip(WHITESPACE)) > self.max_line):
+            self._drop(pending)
+            self.discarding = True
+            self.head = self.scan = self.tail = 0
+        elif pending == 0:
+            self.head = self.scan = self.tail = 0
+        else:
+            self.head = head
+            self.scan = tail
+
+    def _frames(self):
+        """Views for every complete line currently in the buffer."""
+        buf = self.buf
+        view = self.view
+        find = buf.find
+        max_line = self.max_line
+        head = self.head
+        tail = self.tail
+        lines = []
+
+        idx = find(DELIMITER, self.scan, tail)
+        if idx >= 0 and self.discarding:
+            # Tail end of a garbage run: drop it, next line is clean
+            self.dropped_bytes += idx + 1 - head
+            self.discarding = False
+            head = idx + 1
+            idx = find(DELIMITER, head, tail)
+
+        while idx >= 0:
+            start = head
+            end = idx
+            head = idx + 1
+            # Cheap check first, full trim only when needed
+            if end > start and (buf[start] <= 0x20 or buf[end - 1] <= 0x20):
+                while start < end and buf[start] in WHITESPACE:
+                    start += 1
+                while end > start and buf[end - 1] in WHITESPACE:
+                    end -= 1
+            if end - start > max_line:
+                self.dropped_bytes += end - start + 1
+                self.resyncs += 1
+            elif end > start:
+                lines.append(view[start:end])
+            idx = find(DELIMITER, head, tail)
+
+        self.lines += len(lines)
+        self._leftover(head, tail)
+        return lines
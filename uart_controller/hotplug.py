@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hotplug - FPGA Nexys A7-100T UART
+Background port discovery and automatic reconnect of a lost board.
+
+PortMonitor keeps the comports() list on its own thread. Each poll only
+lists /dev (names and inode numbers of serial device nodes, a directory
+read, no sysfs walk); comports() runs when that changes, or on every
+poll where there is no /dev (Windows). Added / removed ports are found
+by diffing with the cached list.
+
+Supervisor plugs into TelemetryEngine.on_lost: when the port fails it
+finds the same physical board again - by USB serial number and interface
+(the FT2232 on the Nexys A7 has one serial number for its JTAG and UART
+interfaces), or the same device path when there is none - and reopens
+it with exponential backoff. A PortMonitor "added" event wakes it
+immediately, so the gap is the board's own enumeration time plus one
+poll.
+
+    python hotplug.py               print port changes as they happen
+"""
+
+import os
+import sys
+import threading
+import time
+
+import serial
+import serial.tools.list_ports
+
+from telemetry import READ_TIMEOUT
+
+
+POLL_INTERVAL = 0.25
+# Serial device nodes worth a comports() scan when they appear or change
+DEV_PREFIXES = ("ttyUSB", "ttyACM", "ttyAMA", "ttyS", "rfcomm", "cu.", "tty.")
+BACKOFF_INITIAL = 0.05
+BACKOFF_MAX = 2.0
+MONITOR_EVENTS = ("added", "removed", "changed")
+
+
+def dev_fingerprint(path="/dev"):
+    """(name, inode) of serial nodes in `path`; None where it does not exist."""
+    try:
+        with os.scandir(path) as entries:
+            # DirEntry.inode() comes from the directory read, no stat()
+            return frozenset((e.name, e.inode()) for e in entries if e.name.startswith(DEV_PREFIXES))
+    except OSError:
+        return None
+
+
+def board_key(info):
+    """(serial number, USB interface) of a comports() entry; None without a serial number."""
+    if not getattr(info, "serial_number", None):
+        return None
+    location = getattr(info, "location", None) or ""
+    interface = location.rsplit(":", 1)[1] if ":" in location else None
+    return info.serial_number, interface
+
+
+# ============================================================================
+# Port monitor
+# ============================================================================
+class PortMonitor:
+    """
+    Cached, diffed comports() list maintained by a background thread.
+
+    Subscribers run on the monitor thread:
+        added(info)        a port appeared (serial.tools.list_ports info)
+        removed(info)      a port went away
+        changed(devices)   sorted device names, after any added/removed
+    refresh() forces a comports() scan on the next poll and wakes the
+    thread; stop() wakes it too and joins it. list_func replaces comports()
+    (tests, virtual boards).
+    """
+
+    def __init__(self, interval=POLL_INTERVAL, list_func=None, dev_path="/dev"):
+        self.interval = interval
+        self.list_func = list_func or serial.tools.list_ports.comports
+        self.dev_path = dev_path
+        self.ports = {}             # device -> info
+        self.fingerprint = None
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+        self.listeners = {name: [] for name in MONITOR_EVENTS}
+
+        # Stats
+        self.polls = 0
+        self.scans = 0
+
+    def subscribe(self, event, callback):
+        self.listeners[event].append(callback)
+        return callback
+
+    def unsubscribe(self, event, callback):
+        try:
+            self.listeners[event].remove(callback)
+        except ValueError:
+            pass
+
+    def emit(self, event, *args):
+        for callback in self.listeners[event]:
+            callback(*args)
+
+    # ------------------------------------------------------------------
+    # Thread
+    # ------------------------------------------------------------------
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def refresh(self):
+        self.fingerprint = None
+        self.wakeup.set()
+
+    def run(self):
+        while self.running:
+            self.wakeup.clear()
+            try:
+                self.poll()
+            except Exception as e:  # e.g. comports() racing a removal
+                print(f"PortMonitor: {e}")
+            self.wakeup.wait(self.interval)
+
+    def poll(self):
+        """Scan if the device nodes changed (always without /dev); True if it scanned."""
+        self.polls += 1
+        fingerprint = dev_fingerprint(self.dev_path)
+        if fingerprint is not None and fingerprint == self.fingerprint:
+            return False
+        self.fingerprint = fingerprint
+        self.scan()
+        return True
+
+    def scan(self):
+        self.scans += 1
+        current = {info.device: info for info in self.list_func()}
+        with self.lock:
+            previous, self.ports = self.ports, current
+        removed = [info for device, info in previous.items() if device not in current]
+        added = [info for device, info in current.items()
+                 if device not in previous or board_key(info) != board_key(previous[device])]
+        for info in removed:
+            self.emit("removed", info)
+        for info in added:
+            self.emit("added", info)
+        if added or removed or self.scans == 1:
+            self.emit("changed", sorted(current))
+
+    # ------------------------------------------------------------------
+    # Queries (any thread)
+    # ------------------------------------------------------------------
+    def devices(self):
+        with self.lock:
+            return sorted(self.ports)
+
+    def info(self, device):
+        with self.lock:
+            return self.ports.get(device)
+
+    def find(self, key):
+        """Device of the board with board_key() == key, or None."""
+        with self.lock:
+            for device, info in sorted(self.ports.items()):
+                if board_key(info) == key:
+                    return device
+        return None
+
+
+# ============================================================================
+# Reconnect supervisor
+# ============================================================================
+class Supervisor:
+    """
+    Reopens an engine's board when its port fails.
+
+    reopen() runs on the engine's reader thread (engine.on_lost) and
+    returns a new serial.Serial, or None once the engine is closing. It
+    tries right away, then waits BACKOFF_INITIAL, doubling up to
+    BACKOFF_MAX; a matching "added" event from `monitor` or engine.close()
+    ends the wait early. Without a monitor the board is looked up with
+    comports() at each attempt (or by path if it has no serial number).
+    """
+
+    def __init__(self, engine, monitor=None, key=None, backoff=BACKOFF_INITIAL, backoff_max=BACKOFF_MAX):
+        self.engine = engine
+        self.monitor = monitor
+        self.port = engine.port
+        if key is None and self.port:
+            info = monitor.info(self.port) if monitor else self._lookup_info(self.port)
+            key = board_key(info) if info is not None else None
+        self.key = key
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.last_error = None
+
+        # Stats
+        self.losses = 0
+        self.attempts = 0
+        self.restores = 0
+        self.last_gap = None        # seconds from loss to reopened port
+
+        engine.on_lost = self.reopen
+        if monitor is not None:
+            monitor.subscribe("added", self.on_added)
+
+    def detach(self):
+        if self.engine.on_lost == self.reopen:
+            self.engine.on_lost = None
+        if self.monitor is not None:
+            self.monitor.unsubscribe("added", self.on_added)
+
+    def on_added(self, info):
+        if (self.key is not None and board_key(info) == self.key) or info.device == self.port:
+            self.engine.wakeup.set()
+
+    def reopen(self, exc):
+        engine = self.engine
+        self.losses += 1
+        self.last_error = exc
+        t_lost = time.monotonic()
+        delay = self.backoff
+        while engine.running:
+            # Cleared before looking, so an "added" event during the attempt
+            # still ends the wait below
+            engine.wakeup.clear()
+            if not engine.running:
+                break
+            port = self.locate()
+            if port is not None:
+                self.attempts += 1
+                try:
+                    ser = serial.Serial(port, engine.baudrate, timeout=READ_TIMEOUT)
+                except (serial.SerialException, OSError) as e:
+                    self.last_error = e
+                else:
+                    self.port = engine.port = port
+                    self.restores += 1
+                    self.last_gap = time.monotonic() - t_lost
+                    return ser
+            engine.wakeup.wait(delay)
+            delay = min(delay * 2, self.backoff_max)
+        return None
+
+    def locate(self):
+        """Current device of the board, or None while it is gone."""
+        if self.key is None:
+            # No serial number (virtual port, built-in UART): same path
+            return self.port if self.port and (os.name != "posix" or os.path.exists(self.port)) else None
+        if self.monitor is not None:
+            return self.monitor.find(self.key)
+        for info in serial.tools.list_ports.comports():
+            if board_key(info) == self.key:
+                return info.device
+        return None
+
+    @staticmethod
+    def _lookup_info(device):
+        for info in serial.tools.list_ports.comports():
+            if info.device == device:
+                return info
+        return None
+
+
+def supervise(engine, name, monitor=None):
+    """Supervisor for a headless command; loss and reconnect are reported on stderr."""
+    supervisor = Supervisor(engine, monitor)
+    engine.subscribe("lost", lambda e: print(f"{name}: port lost ({e}), reconnecting", file=sys.stderr))
+    engine.subscribe("restored", lambda port: print(
+        f"{name}: reconnected to {port} after {supervisor.last_gap:.2f} s", file=sys.stderr))
+    return supervisor
+
+
+def main():
+    monitor = PortMonitor()
+    monitor.subscribe("added", lambda i: print(f"+ {i.device:20s} {board_key(i) or '-'}  {i.description}",
+                                               flush=True))
+    monitor.subscribe("removed", lambda i: print(f"- {i.device}", flush=True))
+    monitor.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+    print(f"{monitor.polls} polls, {monitor.scans} comports() scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latency probe - FPGA Nexys A7-100T UART
+Round-trip time through the mode-3 echo, log-bucket histogram, drift.
+
+    python latency.py --port /dev/ttyUSB1 [--count 1000] [--interval 0.01]
+    python latency.py --port /dev/ttyUSB1 --duration 3600 --window 60
+
+The board must be in mode 3 (BTND). TOP.v sends M3:RX=xx L=xxxx as soon as
+a byte arrives; the probe writes a tagged LED value and waits for the line
+whose L= low byte carries the tag. The firmware echoes on the first byte of
+the pair, so only the low byte is guaranteed to be new in the echo.
+"""
+
+import argparse
+import threading
+import time
+from array import array
+
+from telemetry import BAUDRATE
+
+
+# Histogram: values in microseconds, 2**SUB_BITS linear buckets per power of
+# two, i.e. about 3 % resolution from 1 us up to MAX_US
+SUB_BITS = 5
+SUB_COUNT = 1 << SUB_BITS
+MAX_US = 1 << 36                # ~19 h
+# An echo takes ~2 ms; a trigger that hits a busy TX is dropped by the
+# firmware and the tag only shows up in the next periodic line (<= 0.5 s),
+# which must count as lost rather than as a 100+ ms round trip
+PROBE_TIMEOUT = 0.1
+PROBE_INTERVAL = 0.01
+DRIFT_WINDOW = 60.0
+
+
+# ============================================================================
+# Histogram
+# ============================================================================
+class LatencyHistogram:
+    """
+    HDR-style histogram with logarithmic buckets and linear sub-buckets.
+
+    record() is a couple of integer operations and one array increment;
+    percentiles walk the ~1000 buckets. Reported values are bucket
+    midpoints, so they are within ~1.5 % of the true value.
+    """
+
+    BUCKETS = SUB_COUNT + (MAX_US.bit_length() - SUB_BITS) * SUB_COUNT
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * self.BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def index(us):
+        if us < SUB_COUNT:
+            return us
+        shift = us.bit_length() - SUB_BITS - 1
+        return SUB_COUNT + shift * SUB_COUNT + (us >> shift) - SUB_COUNT
+
+    @staticmethod
+    def bucket_range(idx):
+        """[low, high) of bucket idx, in microseconds."""
+        if idx < SUB_COUNT:
+            return idx, idx + 1
+        shift, sub = divmod(idx - SUB_COUNT, SUB_COUNT)
+        low = (sub + SUB_COUNT) << shift
+        return low, low + (1 << shift)
+
+    def record(self, seconds):
+        us = min(max(int(seconds * 1e6), 0), MAX_US - 1)
+        self.counts[self.index(us)] += 1
+        self.count += 1
+        self.total += us
+        if self.min is None or us < self.min:
+            self.min = us
+        if self.max is None or us > self.max:
+            self.max = us
+
+    def merge(self, other):
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        """Value in microseconds below which p percent of samples fall."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= rank:
+                    low, high = self.bucket_range(i)
+                    return min((low + high) / 2.0, float(self.max))
+        return float(self.max)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "min_us": self.min or 0,
+            "mean_us": self.total / self.count if self.count else 0.0,
+            "p50_us": self.percentile(50),
+            "p99_us": self.percentile(99),
+            "p999_us": self.percentile(99.9),
+            "max_us": self.max or 0,
+        }
+
+    def bars(self, width=40):
+        """Text rendering: one line per non-empty bucket group (power of two)."""
+        groups = {}
+        for i, c in enumerate(self.counts):
+            if c:
+                low, _ = self.bucket_range(i)
+                top = 1 << max(low.bit_length() - 1, 0)
+                groups[top] = groups.get(top, 0) + c
+        if not groups:
+            return ""
+        peak = max(groups.values())
+        lines = []
+        for top in sorted(groups):
+            c = groups[top]
+            lines.append(f"{top:>9d} us {c:>8d} {'#' * max(1, c * width // peak)}")
+        return "\n".join(lines)
+
+
+# ============================================================================
+# Probe
+# ============================================================================
+class LatencyProbe:
+    """
+    Ping-pong RTT measurement on a running TelemetryEngine.
+
+    One probe is in flight at a time: the low byte of the LED value is a
+    tag that differs from the previous one, the echo is matched on the
+    engine's reader thread (t_rx = when the read returned). A GUI can add a
+    second stage with mark_ui() when it drains the same frame, which then
+    includes queueing and Tk scheduling. Every `window` seconds the window
+    histogram is summarized into `drift`.
+    """
+
+    def __init__(self, engine, write=None, interval=PROBE_INTERVAL, timeout=PROBE_TIMEOUT,
+                 window=DRIFT_WINDOW):
+        self.engine = engine
+        self.write = write or engine.write
+        self.interval = interval
+        self.timeout = timeout
+        self.window = window
+
+        self.rtt = LatencyHistogram()
+        self.ui = LatencyHistogram()
+        self.window_hist = LatencyHistogram()
+        self.drift = []             # (t since start, summary of that window)
+        self.sent = 0
+        self.lost = 0
+        self.window_lost = 0
+
+        self.tag = 0
+        self.t_send = None          # send time of the probe in flight
+        self.pending_ui = None      # (echo frame, t_send) for mark_ui()
+        self.echo = threading.Event()
+        self.running = False
+        self.thread = None
+        self.t_start = None
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+    def start(self, count=None, duration=None):
+        self.engine.subscribe("frame", self.on_frame)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, args=(count, duration), daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.echo.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+            self.thread = None
+        self.engine.unsubscribe("frame", self.on_frame)
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self, count=None, duration=None):
+        self.t_start = time.monotonic()
+        window_start = self.t_start
+        end = None if duration is None else self.t_start + duration
+        while self.running:
+            if count is not None and self.sent >= count:
+                break
+            now = time.monotonic()
+            if end is not None and now >= end:
+                break
+            if now - window_start >= self.window:
+                self._close_window(now)
+                window_start = now
+
+            self.tag = (self.tag + 1) & 0xFF or 1
+            self.echo.clear()
+            self.t_send = time.monotonic()
+            try:
+                self.write(bytes((self.tag, self.tag)))
+            except Exception:
+                self.running = False
+                break
+            self.sent += 1
+            if not self.echo.wait(self.timeout) and self.running:
+                self.lost += 1
+                self.window_lost += 1
+            self.t_send = None
+            time.sleep(self.interval)
+        if self.window_hist.count or self.window_lost:
+            self._close_window(time.monotonic())
+        self.running = False
+
+    # ------------------------------------------------------------------
+    # Matching (reader thread)
+    # ------------------------------------------------------------------
+    def on_frame(self, frame):
+        t_send = self.t_send
+        if t_send is None or frame.mode != 3 or "pc_led_value" not in frame.fields:
+            return
+        if frame.fields["pc_led_value"] & 0xFF != self.tag:
+            return
+        rtt = frame.t_rx - t_send
+        self.rtt.record(rtt)
+        self.window_hist.record(rtt)
+        self.t_send = None
+        self.pending_ui = (frame, t_send)
+        self.echo.set()
+
+    def mark_ui(self, frame, now=None):
+        """Record the consumer-side stage for an echo frame being handled now."""
+        pending = self.pending_ui
+        if pending is None or pending[0] is not frame:
+            return
+        self.pending_ui = None
+        self.ui.record((time.monotonic() if now is None else now) - pending[1])
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def _close_window(self, now):
+        summary = self.window_hist.summary()
+        summary["lost"] = self.window_lost
+        self.drift.append((now - self.t_start, summary))
+        self.window_hist = LatencyHistogram()
+        self.window_lost = 0
+
+    def drift_slope(self):
+        """Least-squares trend of the window p50, in microseconds per hour."""
+        points = [(t, s["p50_us"]) for t, s in self.drift if s["count"]]
+        if len(points) < 2:
+            return 0.0
+        n = len(points)
+        mt = sum(t for t, _ in points) / n
+        mv = sum(v for _, v in points) / n
+        var = sum((t - mt) ** 2 for t, _ in points)
+        if not var:
+            return 0.0
+        return sum((t - mt) * (v - mv) for t, v in points) / var * 3600.0
+
+    def report(self):
+        lines = [f"probes {self.sent}  echoed {self.rtt.count}  lost {self.lost}"]
+        for name, hist in (("rtt", self.rtt), ("ui", self.ui)):
+            if not hist.count:
+                continue
+            s = hist.summary()
+            lines.append(f"{name:4s} p50 {s['p50_us'] / 1e3:8.3f} ms  p99 {s['p99_us'] / 1e3:8.3f} ms  "
+                         f"p999 {s['p999_us'] / 1e3:8.3f} ms  max {s['max_us'] / 1e3:8.3f} ms")
+        if self.rtt.count:
+            lines.append(self.rtt.bars())
+        if len(self.drift) > 1:
+            lines.append(f"drift: {len(self.drift)} windows, p50 trend {self.drift_slope():+.1f} us/h")
+            for t, s in self.drift:
+                lines.append(f"  {t:8.1f} s  n={s['count']:6d} p50 {s['p50_us'] / 1e3:7.3f} ms "
+                             f"p99 {s['p99_us'] / 1e3:7.3f} ms lost {s['lost']}")
+        return "\n".join(lines)
+
+
+def main():
+    from telemetry import TelemetryEngine
+
+    ap = argparse.ArgumentParser(description="RTT through the mode-3 echo")
+    ap.add_argument("--port", required=True)
+    ap.add_argument("--count", type=int, default=1000)
+    ap.add_argument("--duration", type=float, help="run for this many seconds instead of --count")
+    ap.add_argument("--interval", type=float, default=PROBE_INTERVAL)
+    ap.add_argument("--window", type=float, default=DRIFT_WINDOW, help="drift window in seconds")
+    args = ap.parse_args()
+
+    engine = TelemetryEngine(args.port, BAUDRATE)
+    engine.open()
+    probe = LatencyProbe(engine, interval=args.interval, window=args.window)
+    try:
+        probe.start(None if args.duration else args.count, args.duration)
+        probe.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        probe.stop()
+        engine.close()
+    print(probe.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LED pattern streamer - FPGA Nexys A7-100T UART
+Pre-encoded 16-bit LED frames sent on monotonic deadlines (mode 3 PC->LED).
+
+    python ledstream.py --port /dev/ttyUSB1 --pattern bounce --rate 200 --frames 2000
+"""
+
+import argparse
+import os
+import threading
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # lists / generators / text files still work
+    np = None
+
+from telemetry import BAUDRATE
+
+
+BYTES_PER_FRAME = 2     # TOP.v 2-byte protocol: low byte, high byte
+BITS_PER_BYTE = 10      # 8N1
+# Highest frame rate the line can carry
+MAX_RATE = BAUDRATE / BITS_PER_BYTE / BYTES_PER_FRAME
+# Sleep until this close to a deadline, then spin
+SPIN_MARGIN = 0.0005
+# rate=None: frames per write when streaming as fast as the line allows
+BURST_FRAMES = 256
+# Lateness kept for the report (most recent frames of long runs)
+LATE_SAMPLES = 1 << 16
+
+
+# ============================================================================
+# Patterns
+# ============================================================================
+def walking_bit(count=16):
+    return [1 << (i % 16) for i in range(count)]
+
+
+def bounce(count=30):
+    """Knight-rider: one LED running left and back."""
+    path = list(range(16)) + list(range(14, 0, -1))
+    return [1 << path[i % len(path)] for i in range(count)]
+
+
+def counter(count=65536):
+    return range(count)
+
+
+def fill(count=32):
+    """LEDs switching on one by one, then off again."""
+    return [((1 << (i % 32 + 1)) - 1) & 0xFFFF if i % 32 < 16 else 0xFFFF >> (i % 32 - 15)
+            for i in range(count)]
+
+
+PATTERNS = {
+    "walking": walking_bit,
+    "bounce": bounce,
+    "counter": counter,
+    "fill": fill,
+}
+
+
+# ============================================================================
+# Encoding
+# ============================================================================
+def encode_frames(frames):
+    """16-bit LED values -> bytes, two per frame (little-endian)."""
+    if isinstance(frames, (bytes, bytearray)):
+        return bytes(frames)
+    if np is not None and isinstance(frames, np.ndarray):
+        return (frames.astype(np.int64) & 0xFFFF).astype("<u2").tobytes()
+    values = array("H", (v & 0xFFFF for v in frames))
+    if values.itemsize != 2:
+        raise RuntimeError("array('H') is not 16-bit on this platform")
+    if array("H", [1]).tobytes() != b"\x01\x00":
+        values.byteswap()
+    return values.tobytes()
+
+
+def load_pattern(path):
+    """
+    Frames from a file: .npy (any integer array), .bin (raw little-endian
+    uint16) or text with one hex value per token (0x prefix optional).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        if np is None:
+            raise RuntimeError(".npy patterns need numpy")
+        return encode_frames(np.load(path).ravel())
+    if ext == ".bin":
+        with open(path, "rb") as f:
+            data = f.read()
+        return data[:len(data) - len(data) % BYTES_PER_FRAME]
+    with open(path, encoding="ascii") as f:
+        return encode_frames(int(tok, 16) for tok in f.read().replace(",", " ").split())
+
+
+# ============================================================================
+# Streamer
+# ============================================================================
+class LedStreamer:
+    """
+    Send pre-encoded LED frames at a fixed rate.
+
+    Frame k is due at t0 + k / rate. The streamer sleeps until just before
+    each deadline and spins the last SPIN_MARGIN, so errors do not add up
+    the way `sleep(1 / rate)` loops drift. A frame more than one period late
+    is skipped when skip_late is set (timing kept, frames lost), otherwise
+    sent immediately (all frames, timing slips). rate=None streams in
+    BURST_FRAMES writes as fast as the port accepts them.
+
+    Lateness (send time - deadline) of the last LATE_SAMPLES frames is kept
+    for report(), in a buffer allocated once per play().
+    `write` must be thread-safe and the only writer to the port while a
+    pattern runs: a blocking port write, or TxQueue.write_leds to share
+    the port with other commands (lateness is then measured at enqueue,
+    and a frame the line has no time for is replaced by the next one).
+    """
+
+    def __init__(self, write, rate=100.0, skip_late=False, spin=SPIN_MARGIN):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        self.write = write
+        self.rate = rate
+        self.skip_late = skip_late
+        self.spin = spin
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.result = None
+
+    def play(self, frames, repeat=1):
+        """Stream `frames` (values or pre-encoded bytes) `repeat` times; return report()."""
+        data = encode_frames(frames) if not isinstance(frames, bytes) else frames
+        total = len(data) // BYTES_PER_FRAME * repeat
+        self.stop_event.clear()
+        self.late = array("d", bytes(8 * min(total, LATE_SAMPLES)))
+        self.sent = 0
+        self.skipped = 0
+        t_start = time.monotonic()
+        if self.rate is None:
+            self._burst(data, repeat)
+        else:
+            self._paced(data, repeat)
+        self.duration = time.monotonic() - t_start
+        self.result = self.report()
+        return self.result
+
+    def start(self, frames, repeat=1, on_done=None):
+        """play() on a background thread; on_done(report) when finished."""
+        def run():
+            result = self.play(frames, repeat)
+            if on_done is not None:
+                on_done(result)
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self, timeout=None):
+        """Stop the pattern; wait for the thread up to `timeout` seconds (None: until it ends)."""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+            if not self.thread.is_alive():
+                self.thread = None
+
+    def report(self):
+        sent = self.sent
+        out = {
+            "frames": sent,
+            "skipped": self.skipped,
+            "seconds": self.duration,
+            "rate": sent / self.duration if self.duration > 0 else 0.0,
+            "target_rate": self.rate,
+        }
+        if self.rate and sent:
+            late = sorted(self.late[:min(sent + self.skipped, len(self.late))])
+            n = len(late)
+            out.update({
+                "late_mean_ms": sum(late) / n * 1e3,
+                "late_p50_ms": late[n // 2] * 1e3,
+                "late_p99_ms": late[min(n - 1, int(n * 0.99))] * 1e3,
+                "late_max_ms": late[-1] * 1e3,
+            })
+        return out
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _paced(self, data, repeat):
+        write = self.write
+        period = 1.0 / self.rate
+        spin = self.spin
+        late = self.late
+        slots = len(late)
+        stopped = self.stop_event.is_set
+        monotonic = time.monotonic
+        sleep = time.sleep
+        view = memoryview(data)
+        frames = len(data) // BYTES_PER_FRAME
+        t0 = monotonic()
+        k = 0
+        for _ in range(repeat):
+            for i in range(0, frames * BYTES_PER_FRAME, BYTES_PER_FRAME):
+                if stopped():
+                    return
+                deadline = t0 + k * period
+                now = monotonic()
+                if deadline - now > spin:
+                    sleep(deadline - now - spin)
+                while monotonic() < deadline:
+                    pass
+                now = monotonic()
+                late[k % slots] = now - deadline
+                k += 1
+                if self.skip_late and now - deadline > period:
+                    self.skipped += 1
+                    continue
+                write(view[i:i + BYTES_PER_FRAME])
+                self.sent += 1
+
+    def _burst(self, data, repeat):
+        step = BURST_FRAMES * BYTES_PER_FRAME
+        view = memoryview(data)
+        for _ in range(repeat):
+            for i in range(0, len(data), step):
+                if self.stop_event.is_set():
+                    return
+                chunk = view[i:i + step]
+                self.write(chunk)
+                self.sent += len(chunk) // BYTES_PER_FRAME
+
+
+def main():
+    import serial
+
+    ap = argparse.ArgumentParser(description="Stream an LED pattern to the board (mode 3)")
+    ap.add_argument("--port", required=True)
+    ap.add_argument("--pattern", default="bounce", help=f"{', '.join(PATTERNS)} or a file")
+    ap.add_argument("--frames", type=int, default=1000, help="length of a built-in pattern")
+    ap.add_argument("--rate", type=float, default=100.0, help="frames/s, 0 = as fast as the line")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--skip-late", action="store_true")
+    args = ap.parse_args()
+
+    if args.pattern in PATTERNS:
+        data = encode_frames(PATTERNS[args.pattern](args.frames))
+    else:
+        data = load_pattern(args.pattern)
+    if args.rate > MAX_RATE:
+        print(f"note: {args.rate:g} frames/s is above the {MAX_RATE:.0f} frames/s the line carries")
+
+    with serial.Serial(args.port, BAUDRATE) as ser:
+        streamer = LedStreamer(ser.write, args.rate or None, args.skip_late)
+        result = streamer.play(data, args.repeat)
+    for key, value in result.items():
+        print(f"{key:14s} {value:.3f}" if isinstance(value, float) else f"{key:14s} {value}")
+
+
+if __name__ == "__main__":
+    main()
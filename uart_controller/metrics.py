@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Metrics - FPGA Nexys A7-100T UART
+Counters, gauges and histograms with Prometheus text export.
+
+Hot paths only do attribute arithmetic (no locks): increments from several
+threads on the same metric may occasionally lose a count, which is fine for
+monitoring and keeps the reader thread fast.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+
+# Seconds; covers a 10 us parse up to a multi-second Tk stall
+TIME_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
+
+
+def _label_text(labelnames, values):
+    if not labelnames:
+        return ""
+    pairs = ",".join(f'{k}="{v}"' for k, v in zip(labelnames, values))
+    return "{" + pairs + "}"
+
+
+# ============================================================================
+# Metric types
+# ============================================================================
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.value = 0
+        self.children = {}
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def labels(self, *values):
+        """Child metric for one label combination (cache it on hot paths)."""
+        values = tuple(str(v) for v in values)
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = type(self)(self.name, self.help)
+        return child
+
+    def samples(self):
+        """(suffix, label text, value) rows for export."""
+        if self.labelnames:
+            return [("", _label_text(self.labelnames, k), c.value)
+                    for k, c in sorted(self.children.items())]
+        return [("", "", self.value)]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value):
+        self.value = value
+
+
+class GaugeFunc:
+    """Gauge read at export time, e.g. a queue depth; costs nothing in between."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, func):
+        self.name = name
+        self.help = help_text
+        self.func = func
+
+    def samples(self):
+        try:
+            value = self.func()
+        except Exception:
+            value = float("nan")
+        return [("", "", value)]
+
+
+class Histogram:
+    """Fixed upper bounds, cumulative only when exported."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=TIME_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile q (0..1)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, c in zip(self.bounds, self.counts):
+            seen += c
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def samples(self):
+        rows = []
+        seen = 0
+        for bound, c in zip(self.bounds, self.counts):
+            seen += c
+            rows.append(("_bucket", f'{{le="{bound:g}"}}', seen))
+        rows.append(("_bucket", '{le="+Inf"}', self.count))
+        rows.append(("_sum", "", self.sum))
+        rows.append(("_count", "", self.count))
+        return rows
+
+
+# ============================================================================
+# Registry
+# ============================================================================
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _add(self, metric):
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text):
+        return self._add(Gauge(name, help_text))
+
+    def gauge_func(self, name, help_text, func):
+        """Register (or replace) a gauge computed at export time."""
+        metric = GaugeFunc(name, help_text, func)
+        self.metrics[name] = metric
+        return metric
+
+    def histogram(self, name, help_text, buckets=TIME_BUCKETS):
+        return self._add(Histogram(name, help_text, buckets))
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def render(self):
+        """Prometheus text exposition format 0.0.4."""
+        out = []
+        for name, metric in sorted(self.metrics.items()):
+            out.append(f"# HELP {name} {metric.help}")
+            out.append(f"# TYPE {name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                out.append(f"{name}{suffix}{labels} {value:g}" if isinstance(value, float)
+                           else f"{name}{suffix}{labels} {value}")
+        return "\n".join(out) + "\n"
+
+    def dump(self, path):
+        """Write render() to `path` atomically (node_exporter textfile style)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def snapshot(self):
+        """name -> value (counters/gauges) or summary dict (histograms)."""
+        out = {}
+        for name, metric in sorted(self.metrics.items()):
+            if isinstance(metric, Histogram):
+                out[name] = {
+                    "count": metric.count,
+                    "mean": metric.sum / metric.count if metric.count else 0.0,
+                    "p50": metric.quantile(0.5),
+                    "p99": metric.quantile(0.99),
+                    "max": metric.max,
+                }
+            elif isinstance(metric, Counter) and metric.labelnames:
+                for key, child in sorted(metric.children.items()):
+                    out[name + _label_text(metric.labelnames, key)] = child.value
+            else:
+                out[name] = metric.samples()[0][2]
+        return out
+
+    def serve(self, port=METRICS_PORT, host=METRICS_HOST):
+        """Serve /metrics on a daemon thread; returns the server (call shutdown())."""
+        # Imported here: http.server costs ~40 ms at startup and most
+        # processes never serve
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+REGISTRY = Registry()
+
+
+# ============================================================================
+# Tk callback lag
+# ============================================================================
+class CallbackLag:
+    """
+    Lateness of a periodic after() callback.
+
+    Call expect(delay_ms) when scheduling and tick() first thing in the
+    callback; the difference between actual and scheduled time is observed
+    into the histogram.
+    """
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.due = None
+
+    def expect(self, delay_ms):
+        self.due = time.perf_counter() + delay_ms / 1000.0
+
+    def tick(self):
+        if self.due is not None:
+            self.histogram.observe(max(0.0, time.perf_counter() - self.due))
+            self.due = None
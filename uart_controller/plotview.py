@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Plot view - FPGA Nexys A7-100T UART
+Scrolling history plots on a Tk Canvas: X/Y/Z, temperature and switch bits.
+
+Every plot is drawn from a decimate.BucketCache with one bucket per pixel
+column, so a redraw costs the same for ten seconds or an hour of samples:
+each trace is one Canvas line item whose coords() are replaced (no item is
+deleted or created after setup), and nothing is redrawn while no sample
+arrives. Coordinates go to Tk as a flat list of ints, which tkinter turns
+into Tcl integer objects directly (no number formatting or parsing).
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from decimate import BucketCache
+
+
+PLOT_REFRESH_MS = 16        # ~60 fps; a tick without new samples is one compare
+SPANS = (("10 s", 10.0), ("1 min", 60.0), ("10 min", 600.0), ("1 h", 3600.0))
+DEFAULT_SPAN = "1 min"
+ACCEL_TRACES = (("accel_x", "red"), ("accel_y", "green"), ("accel_z", "blue"))
+TEMP_TRACES = (("temperature", "#C06000"),)
+ACCEL_HEIGHT = 110
+TEMP_HEIGHT = 50
+BIT_LANE = 6                # pixels per switch bit
+MARGIN = 44                 # left strip for scale / bit labels
+MIN_COLUMNS = 50
+
+
+def flat_coords(points):
+    """Int32 array of x, y pairs -> the flat list coords() takes."""
+    return points.ravel().tolist()
+
+
+def envelope_coords(x, y_lo, y_hi):
+    """Min/max envelope: every column goes from its min to its max, then on to the next."""
+    points = np.empty((len(x), 4), dtype=np.int32)
+    points[:, 0] = x
+    points[:, 1] = y_lo
+    points[:, 2] = x
+    points[:, 3] = y_hi
+    return flat_coords(points)
+
+
+def step_coords(x, state, levels):
+    """
+    Logic trace: state is 0 (low), 1 (toggled within the column) or 2
+    (high) per column; one horizontal segment per run of equal state.
+    """
+    n = len(x)
+    change = np.flatnonzero(state[1:] != state[:-1]) + 1
+    first = np.concatenate(([0], change))
+    last = np.concatenate((change - 1, [n - 1]))
+    y = levels[state[first]]
+    points = np.empty((len(first), 4), dtype=np.int32)
+    points[:, 0] = x[first]
+    points[:, 1] = y
+    points[:, 2] = x[last]
+    points[:, 3] = y
+    return flat_coords(points)
+
+
+# ============================================================================
+# Plots (draw into an existing Canvas)
+# ============================================================================
+class TracePlot:
+    """Min/max envelopes of some channels, auto-scaled, with the scale on the left."""
+
+    def __init__(self, canvas, traces, height, fmt="{:.0f}"):
+        self.canvas = canvas
+        self.names = tuple(name for name, _ in traces)
+        self.height = height
+        self.fmt = fmt
+        self.items = {name: canvas.create_line(0, 0, 0, 0, fill=color, state="hidden")
+                      for name, color in traces}
+        self.top_text = canvas.create_text(2, 1, anchor="nw", font=("Consolas", 8), fill="gray40")
+        self.bottom_text = canvas.create_text(2, height - 1, anchor="sw", font=("Consolas", 8), fill="gray40")
+        self.shown_range = None
+        self.hidden = True
+
+    def draw(self, cache, x, slots):
+        canvas = self.canvas
+        if len(x) < 2:
+            self._hide()
+            return
+        lo = [cache.lo[name][slots] for name in self.names]
+        hi = [cache.hi[name][slots] for name in self.names]
+        vmin = float(min(a.min() for a in lo))
+        vmax = float(max(a.max() for a in hi))
+        if vmax - vmin < 1e-6:
+            vmin -= 1.0
+            vmax += 1.0
+        if (vmin, vmax) != self.shown_range:
+            canvas.itemconfigure(self.top_text, text=self.fmt.format(vmax))
+            canvas.itemconfigure(self.bottom_text, text=self.fmt.format(vmin))
+            self.shown_range = (vmin, vmax)
+        scale = (self.height - 3) / (vmax - vmin)
+        top = vmax * scale + 1
+        for name, a, b in zip(self.names, lo, hi):
+            # Screen y grows downwards
+            canvas.coords(self.items[name], envelope_coords(x, top - a * scale, top - b * scale))
+        if self.hidden:
+            for item in self.items.values():
+                canvas.itemconfigure(item, state="normal")
+            self.hidden = False
+
+    def _hide(self):
+        if not self.hidden:
+            for item in self.items.values():
+                self.canvas.itemconfigure(item, state="hidden")
+            self.hidden = True
+
+
+class BitPlot:
+    """SW15..SW0 as logic traces, one lane each; a bit that toggled within a column is drawn mid-lane."""
+
+    def __init__(self, canvas, name="switch_value", bits=16, lane=BIT_LANE):
+        self.canvas = canvas
+        self.name = name
+        self.bits = bits
+        self.lane = lane
+        self.items = []
+        for i in range(bits):
+            bit = bits - 1 - i
+            y = i * lane + lane // 2
+            canvas.create_text(MARGIN - 4, y, anchor="e", text=f"SW{bit}", font=("Consolas", 6), fill="gray40")
+            self.items.append(canvas.create_line(0, 0, 0, 0, fill="#208020", state="hidden"))
+        self.hidden = True
+
+    @property
+    def height(self):
+        return self.bits * self.lane
+
+    def draw(self, cache, x, slots):
+        canvas = self.canvas
+        if len(x) < 2:
+            if not self.hidden:
+                for item in self.items:
+                    canvas.itemconfigure(item, state="hidden")
+                self.hidden = True
+            return
+        lo = cache.lo[self.name][slots].astype(np.int32)
+        hi = cache.hi[self.name][slots].astype(np.int32)
+        lane = self.lane
+        for i, item in enumerate(self.items):
+            bit = self.bits - 1 - i
+            state = ((lo >> bit) & 1) + ((hi >> bit) & 1)
+            top = i * lane + 1
+            levels = np.array((top + lane - 2, top + (lane - 2) // 2, top), dtype=np.int32)
+            canvas.coords(item, step_coords(x, state, levels))
+        if self.hidden:
+            for item in self.items:
+                canvas.itemconfigure(item, state="normal")
+            self.hidden = False
+
+
+# ============================================================================
+# Monitor tab panel
+# ============================================================================
+class HistoryPanel:
+    """
+    "History" frame of the Monitor tab: span selector plus accelerometer,
+    temperature and switch plots sharing one BucketCache over the GUI's
+    SampleStore. The GUI calls refresh() every PLOT_REFRESH_MS while the
+    tab is shown; it returns False without touching Tk when no sample
+    arrived and nothing was resized.
+    """
+
+    def __init__(self, parent, store):
+        self.span = dict(SPANS)[DEFAULT_SPAN]
+        self.columns = MIN_COLUMNS
+        self.cache = BucketCache(store, ("accel_x", "accel_y", "accel_z", "temperature"),
+                                 bitwise=("switch_value",), size=self.columns, width=self.span / self.columns)
+        self.dirty = True
+
+        # Stats
+        self.redraws = 0
+        self.skipped = 0
+
+        self.frame = ttk.LabelFrame(parent, text="History", padding=5)
+        top = ttk.Frame(self.frame)
+        top.pack(fill="x")
+        ttk.Label(top, text="Span:").pack(side="left")
+        self.span_var = tk.StringVar(value=DEFAULT_SPAN)
+        combo = ttk.Combobox(top, textvariable=self.span_var, values=[name for name, _ in SPANS],
+                             width=7, state="readonly")
+        combo.pack(side="left", padx=5)
+        combo.bind("<<ComboboxSelected>>", lambda e: self.set_span(dict(SPANS)[self.span_var.get()]))
+        for name, color in ACCEL_TRACES + TEMP_TRACES:
+            tk.Label(top, text=name.replace("accel_", "").upper() if name != "temperature" else "Temp",
+                     fg=color, font=("Arial", 9, "bold")).pack(side="left", padx=4)
+
+        canvases = []
+        for height in (ACCEL_HEIGHT, TEMP_HEIGHT, 16 * BIT_LANE):
+            canvas = tk.Canvas(self.frame, height=height, bg="white", highlightthickness=0)
+            canvas.pack(fill="x", pady=2)
+            canvases.append(canvas)
+        self.plots = (
+            TracePlot(canvases[0], ACCEL_TRACES, ACCEL_HEIGHT),
+            TracePlot(canvases[1], TEMP_TRACES, TEMP_HEIGHT, fmt="{:.2f}"),
+            BitPlot(canvases[2]),
+        )
+        canvases[0].bind("<Configure>", self.on_resize)
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def set_span(self, seconds):
+        self.span = seconds
+        self.cache.reset(width=seconds / self.columns)
+        self.dirty = True
+
+    def on_resize(self, event):
+        columns = max(event.width - MARGIN, MIN_COLUMNS)
+        if columns != self.columns:
+            self.columns = columns
+            self.cache.reset(size=columns, width=self.span / columns)
+            self.dirty = True
+
+    def refresh(self):
+        if not self.cache.update() and not self.dirty:
+            self.skipped += 1
+            return False
+        self.dirty = False
+        columns, slots = self.cache.view()
+        x = columns + MARGIN
+        for plot in self.plots:
+            plot.draw(self.cache, x, slots)
+        self.redraws += 1
+        return True
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recorder - FPGA Nexys A7-100T UART
+Headless decode of M0..M4 frames to NDJSON / CSV / binary records.
+
+    python uartserial.py record --port /dev/ttyUSB1 --format ndjson > run.ndjson
+    python uartserial.py record --port /dev/ttyUSB1 --format csv -o run.csv --rotate 1G
+    python uartserial.py record --replay run.cap --format bin -o run.bin
+
+Formats:
+    ndjson  one object per frame: t, mode, the fields the frame carries
+            ("ok": false on a line whose body did not parse)
+    csv     t, mode, ok and every field column, empty where the frame
+            does not carry it
+    bin     RECORD_STRUCT per frame, the samplestore.SAMPLE_DTYPE layout
+            with t in Unix seconds and fields carried forward from earlier
+            frames; np.fromfile(path, dtype=SAMPLE_DTYPE) reads it back
+    cap     raw capture (capture.py), replayable; no rotation, no stdout
+
+t is wall-clock time (Unix seconds) of the read that delivered the frame.
+No Tk, and nothing heavier than pyserial is imported.
+"""
+
+import json
+import os
+import struct
+import sys
+import threading
+import time
+
+from hotplug import supervise
+from telemetry import BAUDRATE, STATE_FIELDS, TelemetryEngine
+
+
+FORMATS = ("ndjson", "csv", "bin", "cap")
+# Output is collected here and handed to the OS in writes of this size
+WRITE_BUFFER = 1 << 20
+# Flush and fsync the output file this often (seconds)
+FSYNC_INTERVAL = 5.0
+
+VALUE_FIELDS = STATE_FIELDS[1:]
+# Same layout as samplestore.SAMPLE_DTYPE (packed, little-endian)
+RECORD_STRUCT = struct.Struct("<dqB3hfHH")
+CSV_HEADER = ("t,mode,ok," + ",".join(VALUE_FIELDS) + "\n").encode()
+
+SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+def parse_size(text):
+    """'1G', '500MB', '64KiB', '4096' -> bytes (units are powers of 1024)."""
+    s = text.strip().lower()
+    for suffix in ("ib", "b"):
+        if s.endswith(suffix) and s[:-len(suffix)][-1:] in SIZE_UNITS:
+            s = s[:-len(suffix)]
+            break
+    unit = s[-1:] if s[-1:].isalpha() else ""
+    if unit not in SIZE_UNITS:
+        raise ValueError(f"bad size: {text!r}")
+    size = int(float(s[:len(s) - len(unit)]) * SIZE_UNITS[unit])
+    if size <= 0:
+        raise ValueError(f"bad size: {text!r}")
+    return size
+
+
+# ============================================================================
+# Output
+# ============================================================================
+class RecordSink:
+    """
+    Buffered output file with optional size-based rotation.
+
+    write() only appends to a bytearray; the file sees one write per
+    WRITE_BUFFER bytes. sync() pushes the buffer out and fsyncs, and is
+    meant to be called periodically from a thread other than the reader.
+    With `rotate`, output goes to <stem>-0000<ext>, <stem>-0001<ext>, ...
+    and a new file is started before one would grow past `rotate` bytes;
+    every file begins with `header`. path None or "-" writes to stdout.
+    """
+
+    def __init__(self, path=None, header=b"", rotate=None, buffer_size=WRITE_BUFFER):
+        self.header = header
+        self.rotate = rotate if path not in (None, "-") else None
+        self.buffer_size = buffer_size
+        self.buf = bytearray()
+        self.lock = threading.Lock()
+        self.path = path
+        self.paths = []
+        self.file_bytes = 0     # in the current file, including buf
+
+        # Stats
+        self.bytes = 0
+        self.syncs = 0
+
+        if path in (None, "-"):
+            self.f = sys.stdout.buffer
+            self.owned = False
+            self._start_file(None)
+        else:
+            self.f = None
+            self.owned = True
+            self._open_next()
+
+    def write(self, data):
+        with self.lock:
+            if self.rotate and self.file_bytes + len(data) > self.rotate and self.file_bytes > len(self.header):
+                self._flush()
+                self.f.close()
+                self._open_next()
+            self.buf += data
+            self.file_bytes += len(data)
+            self.bytes += len(data)
+            if len(self.buf) >= self.buffer_size:
+                self._flush()
+
+    def sync(self):
+        with self.lock:
+            self._flush()
+            self.f.flush()
+            try:
+                os.fsync(self.f.fileno())
+            except (OSError, ValueError):   # pipe / tty / no fd
+                pass
+            self.syncs += 1
+
+    def close(self):
+        self.sync()
+        if self.owned:
+            self.f.close()
+
+    # ------------------------------------------------------------------
+    # Internals (lock held)
+    # ------------------------------------------------------------------
+    def _flush(self):
+        if self.buf:
+            self.f.write(self.buf)
+            self.buf.clear()
+
+    def _open_next(self):
+        if self.rotate:
+            stem, ext = os.path.splitext(self.path)
+            path = f"{stem}-{len(self.paths):04d}{ext}"
+        else:
+            path = self.path
+        self.f = open(path, "wb", buffering=0)
+        self._start_file(path)
+
+    def _start_file(self, path):
+        self.paths.append(path)
+        self.buf += self.header
+        self.file_bytes = len(self.header)
+        self.bytes += len(self.header)
+
+
+# ============================================================================
+# Recorder
+# ============================================================================
+class Recorder:
+    """
+    Frame subscriber that formats every frame into a RecordSink.
+
+    on_frame() runs on the engine's reader thread. `offset` converts the
+    frame's monotonic t_rx to wall-clock time. After `count` records (if
+    given) or a write error, further frames are ignored and `done` is set.
+    """
+
+    def __init__(self, sink, fmt="ndjson", count=None, offset=None):
+        self.sink = sink
+        self.count = count
+        self.offset = time.time() - time.monotonic() if offset is None else offset
+        self.format = {"ndjson": self.format_ndjson, "csv": self.format_csv,
+                       "bin": self.format_bin}[fmt]
+        self.last = dict.fromkeys(VALUE_FIELDS, 0)
+        self.done = threading.Event()
+        self.error = None
+
+        # Stats
+        self.records = 0
+
+    def on_frame(self, frame):
+        if self.done.is_set():
+            return
+        try:
+            self.sink.write(self.format(frame))
+        except (OSError, ValueError) as e:     # e.g. stdout pipe closed
+            self.error = e
+            self.done.set()
+            return
+        self.records += 1
+        if self.count is not None and self.records >= self.count:
+            self.done.set()
+
+    # ------------------------------------------------------------------
+    # Formats: Frame -> bytes
+    # ------------------------------------------------------------------
+    def format_ndjson(self, frame):
+        record = {"t": round(frame.t_rx + self.offset, 6), "mode": frame.mode}
+        record.update(frame.fields)
+        if not frame.ok:
+            record["ok"] = False
+        return (json.dumps(record, separators=(",", ":")) + "\n").encode()
+
+    def format_csv(self, frame):
+        fields = frame.fields
+        values = ",".join(str(fields[name]) if name in fields else "" for name in VALUE_FIELDS)
+        return f"{frame.t_rx + self.offset:.6f},{frame.mode},{int(frame.ok)},{values}\n".encode()
+
+    def format_bin(self, frame):
+        last = self.last
+        last.update(frame.fields)
+        return RECORD_STRUCT.pack(
+            frame.t_rx + self.offset, self.records, frame.mode,
+            last["accel_x"], last["accel_y"], last["accel_z"], last["temperature"],
+            last["switch_value"], last["pc_led_value"])
+
+
+# ============================================================================
+# Command line (uartserial.py record)
+# ============================================================================
+def add_arguments(ap):
+    ap.add_argument("--port", help="serial port, e.g. /dev/ttyUSB1 or COM5")
+    ap.add_argument("--replay", metavar="CAP", help="decode a capture file instead of a port")
+    ap.add_argument("--binary", action="store_true", help="firmware sends binary frames (TX_BINARY = 1)")
+    ap.add_argument("--format", choices=FORMATS, default="ndjson")
+    ap.add_argument("-o", "--output", default="-", help="output file, - for stdout (default)")
+    ap.add_argument("--rotate", type=parse_size, metavar="SIZE", help="start a new file every SIZE, e.g. 1G")
+    ap.add_argument("--duration", type=float, help="stop after this many seconds")
+    ap.add_argument("--count", type=int, help="stop after this many records")
+    ap.add_argument("--fsync", type=float, default=FSYNC_INTERVAL, metavar="SECONDS",
+                    help="flush + fsync interval")
+
+
+def run(args):
+    if bool(args.port) == bool(args.replay):
+        sys.exit("record: give exactly one of --port or --replay")
+    if args.format == "cap":
+        if args.replay or args.output == "-" or args.rotate:
+            sys.exit("record: --format cap needs --port and -o FILE, and cannot rotate")
+        return record_capture(args)
+    if args.replay:
+        return convert_capture(args)
+
+    engine = TelemetryEngine(args.port, BAUDRATE, binary=args.binary)
+    supervise(engine, "record")
+    sink = RecordSink(args.output, CSV_HEADER if args.format == "csv" else b"", args.rotate)
+    recorder = Recorder(sink, args.format, args.count)
+    engine.subscribe("frame", recorder.on_frame)
+    engine.subscribe("error", lambda e: print(f"record: read error: {e}", file=sys.stderr))
+    engine.open()
+    end = None if args.duration is None else time.monotonic() + args.duration
+    try:
+        while not recorder.done.is_set():
+            wait = args.fsync if end is None else min(args.fsync, end - time.monotonic())
+            if wait <= 0:
+                break
+            recorder.done.wait(wait)
+            try:
+                sink.sync()
+            except OSError as e:
+                recorder.error = e
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+        close_sink(sink)
+    report(recorder, sink)
+    return 1 if recorder.error is not None and not isinstance(recorder.error, BrokenPipeError) else 0
+
+
+def convert_capture(args):
+    """Decode a capture at full speed, with its recorded timestamps."""
+    from capture import CaptureReader
+
+    reader = CaptureReader(args.replay)
+    engine = TelemetryEngine(binary=reader.binary or args.binary)
+    sink = RecordSink(args.output, CSV_HEADER if args.format == "csv" else b"", args.rotate)
+    # Header holds wall time at capture start, records hold monotonic time
+    recorder = Recorder(sink, args.format, args.count, offset=reader.wall_start - reader.t_first)
+    engine.subscribe("frame", recorder.on_frame)
+    try:
+        for t, data in reader.records():
+            if recorder.done.is_set():
+                break
+            if args.duration is not None and t - reader.t_first > args.duration:
+                break
+            engine.feed(data, t)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+        close_sink(sink)
+    report(recorder, sink)
+    return 0
+
+
+def record_capture(args):
+    from capture import CaptureWriter
+
+    engine = TelemetryEngine(args.port, BAUDRATE, binary=args.binary)
+    supervise(engine, "record")
+    engine.capture = CaptureWriter(args.output, binary=args.binary)
+    engine.open()
+    try:
+        time.sleep(args.duration if args.duration is not None else 1e9)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+        capture = engine.capture
+        engine.capture = None
+        capture.close()
+    print(f"record: {capture.records} chunks, {capture.bytes} bytes -> {args.output}", file=sys.stderr)
+    return 0
+
+
+def close_sink(sink):
+    try:
+        sink.close()
+    except BrokenPipeError:
+        # Reader of stdout went away (e.g. `| head`); keep the exit quiet
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def report(recorder, sink):
+    files = ", ".join(p for p in sink.paths if p) or "stdout"
+    print(f"record: {recorder.records} records, {sink.bytes} bytes -> {files}", file=sys.stderr)
+    if recorder.error is not None and not isinstance(recorder.error, BrokenPipeError):
+        print(f"record: write error: {recorder.error}", file=sys.stderr)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental rendering helpers - FPGA Nexys A7-100T UART
+Skip Tcl round trips for widgets whose displayed value did not change.
+"""
+
+
+class WidgetCache:
+    """Remember the last options pushed to each widget / variable."""
+
+    def __init__(self):
+        self.last = {}
+        self.calls = 0      # Tcl round trips actually made
+        self.skipped = 0    # updates avoided because nothing changed
+
+    def config(self, widget, **options):
+        if self.last.get(widget) == options:
+            self.skipped += 1
+            return False
+        widget.config(**options)
+        self.last[widget] = options
+        self.calls += 1
+        return True
+
+    def set_var(self, var, value):
+        if self.last.get(var) == value:
+            self.skipped += 1
+            return False
+        var.set(value)
+        self.last[var] = value
+        self.calls += 1
+        return True
+
+    def invalidate(self):
+        self.last.clear()
+
+
+class AdaptiveInterval:
+    """
+    Refresh period that backs off while nothing changes.
+
+    Busy ticks run at `fast_ms`; every idle tick doubles the period up to
+    `idle_ms`. Any change snaps back to `fast_ms`. Frames that arrive between
+    ticks are coalesced by the dirty set, so a busy link never schedules more
+    than one redraw per `fast_ms`.
+    """
+
+    def __init__(self, fast_ms, idle_ms):
+        self.fast_ms = fast_ms
+        self.idle_ms = idle_ms
+        self.current = fast_ms
+
+    def next(self, changed):
+        if changed:
+            self.current = self.fast_ms
+        else:
+            self.current = min(self.current * 2, self.idle_ms)
+        return self.current
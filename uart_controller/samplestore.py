@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sample store - FPGA Nexys A7-100T UART
+Preallocated NumPy ring per channel, window queries as views,
+optional append-only spill file readable with np.memmap.
+"""
+
+import os
+
+import numpy as np
+
+
+DEFAULT_CAPACITY = 1 << 20     # ~3 h at 100 samples/s
+SPILL_CHUNK = 4096
+
+# One record per sample; also the on-disk layout of the spill file
+SAMPLE_DTYPE = np.dtype([
+    ("t", "<f8"),               # time.monotonic() at receive
+    ("seq", "<i8"),             # absolute sample number in this store
+    ("mode", "u1"),
+    ("accel_x", "<i2"),
+    ("accel_y", "<i2"),
+    ("accel_z", "<i2"),
+    ("temperature", "<f4"),
+    ("switch_value", "<u2"),
+    ("pc_led_value", "<u2"),
+])
+CHANNELS = SAMPLE_DTYPE.names
+VALUE_FIELDS = CHANNELS[3:]
+
+
+class SampleStore:
+    """
+    Fixed-capacity columnar history.
+
+    Each column is allocated at twice the capacity and every sample is
+    written at i and i + capacity (mirrored ring). Any window of up to
+    `capacity` samples is therefore one contiguous slice, so queries return
+    views without copying or concatenating. Views stay valid until the
+    samples they cover are overwritten, i.e. `capacity` appends later.
+
+    append() writes scalars into existing arrays and allocates nothing.
+    With spill_path, samples are also appended to a raw SAMPLE_DTYPE file
+    in SPILL_CHUNK batches; open_spill() maps it back with np.memmap.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, spill_path=None, spill_chunk=SPILL_CHUNK):
+        if spill_path and spill_chunk > capacity:
+            raise ValueError("spill_chunk must not exceed capacity")
+        self.capacity = capacity
+        self.cols = {name: np.zeros(2 * capacity, dtype=SAMPLE_DTYPE[name]) for name in CHANNELS}
+        self.count = 0
+
+        # Last value of every field, carried into samples whose frame lacks it
+        # (M1 only has temperature, M2 only switches, ...)
+        self.last = {name: 0 for name in VALUE_FIELDS}
+
+        self.spill_chunk = spill_chunk
+        self.spilled = 0
+        self.spill = open(spill_path, "ab") if spill_path else None
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    # ------------------------------------------------------------------
+    # Append
+    # ------------------------------------------------------------------
+    def append(self, t, mode, accel_x, accel_y, accel_z, temperature, switch_value, pc_led_value):
+        c = self.cols
+        i = self.count % self.capacity
+        j = i + self.capacity
+        c["t"][i] = c["t"][j] = t
+        c["seq"][i] = c["seq"][j] = self.count
+        c["mode"][i] = c["mode"][j] = mode
+        c["accel_x"][i] = c["accel_x"][j] = accel_x
+        c["accel_y"][i] = c["accel_y"][j] = accel_y
+        c["accel_z"][i] = c["accel_z"][j] = accel_z
+        c["temperature"][i] = c["temperature"][j] = temperature
+        c["switch_value"][i] = c["switch_value"][j] = switch_value
+        c["pc_led_value"][i] = c["pc_led_value"][j] = pc_led_value
+        self.count += 1
+
+        if self.spill is not None and self.count - self.spilled >= self.spill_chunk:
+            self.flush()
+
+    def append_frame(self, frame):
+        """Append a frame_parser.Frame; usable directly as an engine 'frame' subscriber."""
+        last = self.last
+        last.update(frame.fields)
+        self.append(frame.t_rx, frame.mode, last["accel_x"], last["accel_y"], last["accel_z"],
+                    last["temperature"], last["switch_value"], last["pc_led_value"])
+
+    def append_block(self, columns):
+        """
+        Vectorized append: `columns` maps channel names to equal-length arrays
+        (e.g. a binframe FRAME_DTYPE array plus a "t" column). Missing value
+        channels carry the last known value; "seq" is always assigned here.
+        """
+        n = len(columns["t"])
+        if n == 0:
+            return
+        if self.spill is not None and self.count + n - self.spilled > self.capacity:
+            # The ring write would overwrite samples not in the file yet
+            self.flush()
+        if n > self.capacity:
+            # Leading rows never reach the ring; they go straight to the file
+            skip = n - self.capacity
+            if self.spill is not None:
+                self._block_records(columns, skip).tofile(self.spill)
+                self.spilled = self.count + skip
+            columns = {name: col[skip:] for name, col in columns.items()}
+            self.count += skip
+            n = self.capacity
+
+        cap = self.capacity
+        start = self.count % cap
+        first = min(n, cap - start)
+        seq = np.arange(self.count, self.count + n, dtype=np.int64)
+        for name in CHANNELS:
+            col = self.cols[name]
+            if name == "seq":
+                src = seq
+            elif name in columns:
+                src = columns[name]
+            else:
+                src = self.last[name]
+            for base in (0, cap):
+                if np.ndim(src):
+                    col[base + start:base + start + first] = src[:first]
+                    col[base:base + n - first] = src[first:]
+                else:
+                    col[base + start:base + start + first] = src
+                    col[base:base + n - first] = src
+        for name in VALUE_FIELDS:
+            if name in columns:
+                self.last[name] = columns[name][-1].item()
+        self.count += n
+
+        if self.spill is not None and self.count - self.spilled >= self.spill_chunk:
+            self.flush()
+
+    # ------------------------------------------------------------------
+    # Queries (views)
+    # ------------------------------------------------------------------
+    def window(self, start, stop):
+        """Columns for absolute samples [start, stop), as views."""
+        start = max(start, self.count - self.capacity, 0)
+        stop = min(stop, self.count)
+        if stop < start:
+            stop = start
+        base = start % self.capacity
+        return {name: col[base:base + stop - start] for name, col in self.cols.items()}
+
+    def last_n(self, n):
+        return self.window(self.count - n, self.count)
+
+    def last_seconds(self, seconds):
+        """Samples with t >= newest t - seconds."""
+        if self.count == 0:
+            return self.window(0, 0)
+        newest = self.cols["t"][(self.count - 1) % self.capacity]
+        return self.between(newest - seconds, float("inf"))
+
+    def between(self, t0, t1):
+        """Samples with t0 <= t < t1 (timestamps are monotonic)."""
+        oldest = max(self.count - self.capacity, 0)
+        t = self.window(oldest, self.count)["t"]
+        lo = int(np.searchsorted(t, t0, side="left"))
+        hi = int(np.searchsorted(t, t1, side="left"))
+        return self.window(oldest + lo, oldest + hi)
+
+    # ------------------------------------------------------------------
+    # Spill
+    # ------------------------------------------------------------------
+    def flush(self):
+        if self.spill is None or self.spilled >= self.count:
+            return
+        start = max(self.spilled, self.count - self.capacity)
+        to_records(self.window(start, self.count)).tofile(self.spill)
+        self.spill.flush()
+        self.spilled = self.count
+
+    def _block_records(self, columns, n):
+        """First n rows of an append_block() block as SAMPLE_DTYPE records."""
+        records = np.empty(n, dtype=SAMPLE_DTYPE)
+        for name in CHANNELS:
+            if name == "seq":
+                records[name] = np.arange(self.count, self.count + n, dtype=np.int64)
+            elif name in columns:
+                records[name] = columns[name][:n]
+            else:
+                records[name] = self.last[name]
+        return records
+
+    def close(self):
+        if self.spill is not None:
+            self.flush()
+            self.spill.close()
+            self.spill = None
+
+
+def to_records(cols):
+    """Columns from a query (views) -> one SAMPLE_DTYPE record array (a copy)."""
+    records = np.empty(len(cols["t"]), dtype=SAMPLE_DTYPE)
+    for name in CHANNELS:
+        records[name] = cols[name]
+    return records
+
+
+def open_spill(path):
+    """Map a spill file read-only as a SAMPLE_DTYPE record array."""
+    if os.path.getsize(path) < SAMPLE_DTYPE.itemsize:
+        return np.zeros(0, dtype=SAMPLE_DTYPE)
+    return np.memmap(path, dtype=SAMPLE_DTYPE, mode="r")
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared-memory state - FPGA Nexys A7-100T UART
+Latest decoded state and recent samples of one board, published in
+multiprocessing.shared_memory for any number of local readers.
+
+    python uartserial.py publish --port /dev/ttyUSB1      headless publisher
+    python uartserial.py watch nexys_ttyUSB1              print every update
+    python uartserial.py watch --list
+
+The GUI publishes the board it is connected to as shm_name(port), so
+other tools can read it while the GUI owns the port:
+
+    reader = ShmReader("nexys_ttyUSB1")
+    gen = None
+    while True:
+        gen = reader.wait(gen, timeout=1.0)
+        print(reader.state())
+        recent = reader.copy_last_n(100)    # private SAMPLE_DTYPE array
+
+Layout (little-endian, fixed; `capacity` ring slots):
+    0    header   HEADER: magic, version, capacity, seq, count, t_update,
+                  rx_bytes, tx_bytes, wall offset, pid, flags    72 bytes
+    80   state    RECORD, the latest sample with every field     31 bytes
+    128  ring     2 x capacity RECORDs, sample n at n % capacity and
+                  n % capacity + capacity (mirrored, so any window is
+                  one contiguous slice)
+
+RECORD is samplestore.SAMPLE_DTYPE: t (time.monotonic() at receive, the
+same clock in every process; + wall offset = Unix time), seq (= sample
+number), mode, then the BoardState fields carried forward from earlier
+frames.
+
+seq is a seqlock: the publisher makes it odd, writes state, ring slot
+and counters, and makes it even again. state() retries until it reads
+the same even seq before and after copying. Ring windows are not copied:
+sample s stays valid until the publisher starts writing sample
+s + capacity, which stable(s) checks after the data was used. The reader
+relies on the stores landing in program order (x86; on weakly ordered
+CPUs a torn read is possible, though unlikely at these rates).
+"""
+
+import os
+import re
+import struct
+import sys
+import time
+
+from hotplug import supervise
+from telemetry import BAUDRATE, STATE_FIELDS, TelemetryEngine
+
+
+MAGIC = b"NXSHM\0\0\0"
+VERSION = 1
+FLAG_BINARY = 0x01
+FLAG_CLOSED = 0x02          # publisher has gone; the data is the last it wrote
+
+HEADER = struct.Struct("<8sIIQQdQQdII")
+SEQ = struct.Struct("<Q")
+SEQ_AT = 16
+# count, t_update, rx_bytes, tx_bytes
+COUNTS = struct.Struct("<QdQQ")
+COUNTS_AT = 24
+FLAGS = struct.Struct("<I")
+FLAGS_AT = 68
+# samplestore.SAMPLE_DTYPE, packed
+RECORD = struct.Struct("<dqB3hfHH")
+STATE_AT = 80
+RING_AT = 128
+
+DEFAULT_CAPACITY = 8192     # ~80 s at 100 frames/s
+NAME_PREFIX = "nexys_"
+# Reader: retries of a torn state() read before sleeping SPIN_SLEEP (the
+# publisher may have been preempted mid-update), and the poll period of wait()
+SPIN_RETRIES = 20
+SPIN_SLEEP = 0.0001
+WAIT_INTERVAL = 0.002
+
+VALUE_FIELDS = STATE_FIELDS[1:]
+
+
+def shm_name(port):
+    """Segment name for a port: /dev/ttyUSB1 -> nexys_ttyUSB1, COM5 -> nexys_COM5."""
+    return NAME_PREFIX + re.sub(r"\W", "_", os.path.basename(port))
+
+
+def list_published():
+    """Names of segments published on this machine (POSIX /dev/shm only)."""
+    try:
+        return sorted(n for n in os.listdir("/dev/shm") if n.startswith(NAME_PREFIX))
+    except OSError:
+        return []
+
+
+def _attach(name):
+    from multiprocessing import shared_memory
+
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    if os.name != "posix":
+        return shared_memory.SharedMemory(name)
+    # Before 3.13 every attach is registered with the resource tracker, which
+    # unlinks the publisher's segment when this process exits; skip that
+    # (unregistering afterwards is wrong for children sharing a tracker)
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda n, rtype: None if rtype == "shared_memory" else register(n, rtype)
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+# ============================================================================
+# Publisher
+# ============================================================================
+class ShmPublisher:
+    """
+    Writes one board's frames into a shared-memory segment.
+
+    attach(engine) subscribes on_frame to the engine, so it runs on the
+    reader thread: a few struct.pack_into calls per frame, whatever the
+    number of readers. The segment is created on construction (an existing
+    one is an error unless replace=True, e.g. for one left in /dev/shm by
+    a killed publisher) and unlinked by close(); readers that are attached
+    keep their mapping and see FLAG_CLOSED.
+    """
+
+    def __init__(self, name, capacity=DEFAULT_CAPACITY, binary=False, replace=False):
+        from multiprocessing import shared_memory
+
+        size = RING_AT + 2 * capacity * RECORD.size
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            if not replace:
+                raise FileExistsError(f"shared memory {name!r} is already published") from None
+            old = shared_memory.SharedMemory(name)
+            old.close()
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = name
+        self.capacity = capacity
+        self.buf = self.shm.buf
+        self.flags = FLAG_BINARY if binary else 0
+        self.seq = 0
+        self.count = 0
+        self.board = None
+        self.last = dict.fromkeys(VALUE_FIELDS, 0)
+        HEADER.pack_into(self.buf, 0, MAGIC, VERSION, capacity, 0, 0, 0.0, 0, 0,
+                         time.time() - time.monotonic(), os.getpid(), self.flags)
+
+    def attach(self, engine):
+        """Publish `engine`'s frames (and its state's rx/tx byte counts)."""
+        self.board = engine.state
+        if engine.decoder is not None:
+            self._set_flags(self.flags | FLAG_BINARY)
+        engine.subscribe("frame", self.on_frame)
+        return self
+
+    def detach(self, engine):
+        engine.unsubscribe("frame", self.on_frame)
+
+    def on_frame(self, frame):
+        last = self.last
+        last.update(frame.fields)
+        buf = self.buf
+        n = self.count
+        seq = self.seq
+        values = (frame.t_rx, n, frame.mode, last["accel_x"], last["accel_y"], last["accel_z"],
+                  last["temperature"], last["switch_value"], last["pc_led_value"])
+
+        SEQ.pack_into(buf, SEQ_AT, seq + 1)
+        RECORD.pack_into(buf, STATE_AT, *values)
+        slot = RING_AT + (n % self.capacity) * RECORD.size
+        RECORD.pack_into(buf, slot, *values)
+        RECORD.pack_into(buf, slot + self.capacity * RECORD.size, *values)
+        board = self.board
+        COUNTS.pack_into(buf, COUNTS_AT, n + 1, frame.t_rx,
+                         board.rx_count if board else 0, board.tx_count if board else 0)
+        SEQ.pack_into(buf, SEQ_AT, seq + 2)
+        self.seq = seq + 2
+        self.count = n + 1
+
+    def close(self):
+        if self.buf is None:
+            return
+        self._set_flags(self.flags | FLAG_CLOSED)
+        self.buf = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _set_flags(self, flags):
+        self.flags = flags
+        SEQ.pack_into(self.buf, SEQ_AT, self.seq + 1)
+        FLAGS.pack_into(self.buf, FLAGS_AT, flags)
+        SEQ.pack_into(self.buf, SEQ_AT, self.seq + 2)
+        self.seq += 2
+
+
+# ============================================================================
+# Reader
+# ============================================================================
+class ShmReader:
+    """
+    Read access to a published board, for any number of processes.
+
+    Nothing is sent to the publisher and nothing is serialized: state()
+    copies one 31-byte record under the seqlock, window() / last_n() are
+    NumPy views straight into the segment (take start from first(), not
+    from the view, and check stable(start) after use; or use
+    copy_last_n()). wait() polls the 8-byte seq every WAIT_INTERVAL
+    seconds.
+    """
+
+    def __init__(self, name):
+        # numpy only on the reader side; the publisher packs with struct
+        import numpy as np
+
+        from samplestore import SAMPLE_DTYPE
+
+        self.name = name
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        header = HEADER.unpack_from(self.buf, 0)
+        if header[0] != MAGIC or header[1] != VERSION:
+            self.shm.close()
+            raise ValueError(f"{name}: not a board state segment")
+        self.capacity = capacity = header[2]
+        self.offset = header[8]         # wall clock - monotonic, for t
+        self.pid = header[9]
+        self.ring = np.ndarray((2 * capacity,), dtype=SAMPLE_DTYPE, buffer=self.buf, offset=RING_AT)
+
+        # Stats
+        self.retries = 0
+
+    def close(self):
+        if self.buf is None:
+            return
+        self.ring = None
+        self.buf = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # The caller still holds views; the mapping goes with them
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Header
+    # ------------------------------------------------------------------
+    @property
+    def generation(self):
+        """seq of the last complete update (changes on every frame)."""
+        return SEQ.unpack_from(self.buf, SEQ_AT)[0]
+
+    @property
+    def count(self):
+        return COUNTS.unpack_from(self.buf, COUNTS_AT)[0]
+
+    @property
+    def flags(self):
+        return FLAGS.unpack_from(self.buf, FLAGS_AT)[0]
+
+    @property
+    def closed(self):
+        return bool(self.flags & FLAG_CLOSED)
+
+    @property
+    def binary(self):
+        return bool(self.flags & FLAG_BINARY)
+
+    # ------------------------------------------------------------------
+    # Latest state
+    # ------------------------------------------------------------------
+    def state(self):
+        """Consistent latest state: BoardState.snapshot() keys plus t, count, rx/tx bytes."""
+        buf = self.buf
+        spins = 0
+        while True:
+            seq = SEQ.unpack_from(buf, SEQ_AT)[0]
+            if not seq & 1:
+                record = RECORD.unpack_from(buf, STATE_AT)
+                counts = COUNTS.unpack_from(buf, COUNTS_AT)
+                if SEQ.unpack_from(buf, SEQ_AT)[0] == seq:
+                    break
+            self.retries += 1
+            spins += 1
+            if spins % SPIN_RETRIES == 0:
+                time.sleep(SPIN_SLEEP)
+        t, _, mode, ax, ay, az, temp, sw, led = record
+        count, _, rx_bytes, tx_bytes = counts
+        return {
+            "t": t, "count": count, "generation": seq,
+            "mode": mode, "accel_x": ax, "accel_y": ay, "accel_z": az,
+            "temperature": temp, "switch_value": sw, "pc_led_value": led,
+            "rx_count": rx_bytes, "tx_count": tx_bytes,
+        }
+
+    def wait(self, generation=None, timeout=None):
+        """
+        Block until the generation differs from `generation` (None: return
+        the current one at once). Returns the new generation, or None on
+        timeout or when the publisher closed.
+        """
+        current = self.generation
+        if generation is None or current != generation:
+            return current
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.closed:
+                return None
+            time.sleep(WAIT_INTERVAL if end is None else max(0.0, min(WAIT_INTERVAL, end - time.monotonic())))
+            current = self.generation
+            if current != generation:
+                return current
+            if end is not None and time.monotonic() >= end:
+                return None
+
+    # ------------------------------------------------------------------
+    # Ring (views)
+    # ------------------------------------------------------------------
+    def first(self, start, count):
+        """Oldest sample from `start` on that was intact when the count was `count`."""
+        # The slot of sample `count` (aliasing count - capacity) may be mid-write
+        return max(start, count - self.capacity + 1, 0)
+
+    def window(self, start, stop):
+        """Samples [start, stop) that are still in the ring, as a view."""
+        return self._slice(start, stop, self.count)
+
+    def _slice(self, start, stop, count):
+        start = self.first(start, count)
+        stop = min(stop, count)
+        if stop < start:
+            stop = start
+        base = start % self.capacity
+        return self.ring[base:base + stop - start]
+
+    def last_n(self, n):
+        count = self.count
+        return self._slice(count - n, count, count)
+
+    def since(self, start):
+        """
+        Samples from number `start` on (or the oldest kept), and the next
+        start. The view begins at sample next - len(view): check
+        stable(next - len(view)) after use. Sample numbers come from the
+        counter, never from the view, which may be overwritten meanwhile.
+        """
+        count = self.count
+        return self._slice(start, count, count), max(start, count)
+
+    def stable(self, start):
+        """True if sample `start` (and so every later one) has not been overwritten."""
+        return self.count < start + self.capacity
+
+    def copy_last_n(self, n):
+        """last_n(n) as a private array, retried until consistent."""
+        while True:
+            # The first sample number comes from the counter before the copy:
+            # a seq read from the copy may itself be from an overwrite
+            count = self.count
+            start = self.first(count - n, count)
+            data = self._slice(start, count, count).copy()
+            if self.stable(start):
+                return data
+            self.retries += 1
+
+
+# ============================================================================
+# Command line (uartserial.py publish / watch)
+# ============================================================================
+def add_publish_arguments(ap):
+    ap.add_argument("--port", required=True, help="serial port, e.g. /dev/ttyUSB1 or COM5")
+    ap.add_argument("--binary", action="store_true", help="firmware sends binary frames (TX_BINARY = 1)")
+    ap.add_argument("--name", help="segment name (default: shm_name(port))")
+    ap.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="ring slots")
+    ap.add_argument("--replace", action="store_true", help="take over an existing segment of that name")
+
+
+def run_publish(args):
+    name = args.name or shm_name(args.port)
+    engine = TelemetryEngine(args.port, BAUDRATE, binary=args.binary)
+    supervise(engine, "publish")
+    try:
+        publisher = ShmPublisher(name, args.capacity, replace=args.replace).attach(engine)
+    except FileExistsError as e:
+        sys.exit(f"publish: {e} (--replace to take it over)")
+    engine.subscribe("error", lambda e: print(f"publish: read error: {e}", file=sys.stderr))
+    print(f"publish: {args.port} -> {name}", file=sys.stderr)
+    try:
+        engine.open()
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+        publisher.close()
+    print(f"publish: {publisher.count} frames", file=sys.stderr)
+    return 0
+
+
+def add_watch_arguments(ap):
+    ap.add_argument("name", nargs="?", help="segment name, e.g. nexys_ttyUSB1 (default: the only one)")
+    ap.add_argument("--list", action="store_true", help="list published boards and exit")
+    ap.add_argument("--timeout", type=float, default=5.0, help="give up after this long without an update")
+
+
+def run_watch(args):
+    names = list_published()
+    if args.list:
+        for name in names:
+            print(name)
+        return 0
+    name = args.name or (names[0] if len(names) == 1 else None)
+    if name is None:
+        sys.exit("watch: give a segment name (--list shows them)")
+    try:
+        reader = ShmReader(name)
+    except (FileNotFoundError, ValueError) as e:
+        sys.exit(f"watch: {e}")
+    gen = None
+    try:
+        while True:
+            gen = reader.wait(gen, args.timeout)
+            if gen is None:
+                print("watch: publisher closed" if reader.closed else "watch: no update", file=sys.stderr)
+                break
+            s = reader.state()
+            print(f"{s['t'] + reader.offset:.3f} #{s['count']} M{s['mode']} "
+                  f"X={s['accel_x']:+5d} Y={s['accel_y']:+5d} Z={s['accel_z']:+5d} "
+                  f"T={s['temperature']:6.2f} SW={s['switch_value']:04X} LED={s['pc_led_value']:04X}",
+                  flush=True)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    finally:
+        reader.close()
+    return 0
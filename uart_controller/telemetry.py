@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Telemetry core - FPGA Nexys A7-100T UART
+Headless connection / reader / framer / parser / state, no Tk needed.
+"""
+
+import threading
+import time
+from collections import deque
+
+import serial
+
+from frame_parser import parse_batch
+from framer import RingFramer
+from metrics import REGISTRY
+
+
+BAUDRATE = 115200
+# Blocking read timeout: only bounds how long stop() waits when the port
+# does not support cancel_read(); data wakes the reader immediately.
+READ_TIMEOUT = 0.5
+
+EVENTS = ("raw", "line", "frame", "error", "lost", "restored")
+RX_QUEUE_SIZE = 20000
+
+# Process-wide, summed over all engines (a fleet shares them)
+RX_BYTES = REGISTRY.counter("uart_rx_bytes_total", "Bytes read from the port(s)")
+RX_WAKEUPS = REGISTRY.counter("uart_reader_wakeups_total", "Returns from the blocking read")
+FRAMES = REGISTRY.counter("uart_frames_total", "Frames per mode, including ones that failed to parse", ("mode",))
+PARSE_ERRORS = REGISTRY.counter("uart_parse_errors_total",
+                                "M0..M4 lines whose body did not parse, binary CRC errors")
+UNKNOWN_LINES = REGISTRY.counter("uart_unknown_lines_total", "Framed lines without an M0..M4 prefix")
+RESYNCS = REGISTRY.counter("uart_framer_resyncs_total", "Framer/decoder resynchronisations")
+FEED_SECONDS = REGISTRY.histogram("uart_feed_seconds", "Time in TelemetryEngine.feed() per chunk")
+
+
+# ============================================================================
+# State
+# ============================================================================
+STATE_FIELDS = ("current_mode", "accel_x", "accel_y", "accel_z",
+                "temperature", "switch_value", "pc_led_value")
+
+
+class BoardState:
+    """
+    Latest decoded values of one board.
+
+    apply() records the names of fields whose value actually changed in
+    `dirty`; renderers call take_dirty() once per frame.
+    """
+
+    def __init__(self):
+        self.accel_x = 0
+        self.accel_y = 0
+        self.accel_z = 0
+        self.temperature = 0.0
+        self.switch_value = 0
+        self.pc_led_value = 0
+        self.current_mode = 0
+
+        self.rx_count = 0
+        self.tx_count = 0
+
+        # Everything is "changed" until first drawn
+        self.dirty = set(STATE_FIELDS)
+
+    def apply(self, mode, fields):
+        dirty = self.dirty
+        if mode != self.current_mode:
+            self.current_mode = mode
+            dirty.add("current_mode")
+        for name, value in fields.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                dirty.add(name)
+
+    def take_dirty(self):
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
+
+    def snapshot(self):
+        return {
+            "mode": self.current_mode,
+            "accel_x": self.accel_x,
+            "accel_y": self.accel_y,
+            "accel_z": self.accel_z,
+            "temperature": self.temperature,
+            "switch_value": self.switch_value,
+            "pc_led_value": self.pc_led_value,
+        }
+
+
+# ============================================================================
+# Reader -> consumer handoff
+# ============================================================================
+class EventQueue:
+    """
+    Single-producer / single-consumer queue from the reader thread.
+
+    deque.append() and popleft() are atomic under the GIL, so neither side
+    takes a lock. When the queue is full the oldest event is dropped and
+    counted; the consumer drains it in bounded batches on its own schedule
+    (e.g. once per UI tick) instead of getting one callback per read.
+    """
+
+    def __init__(self, maxlen=RX_QUEUE_SIZE):
+        self.maxlen = maxlen
+        self.items = deque(maxlen=maxlen)
+
+        # Metrics (producer writes pushed/dropped/high_water, consumer drained)
+        self.pushed = 0
+        self.dropped = 0
+        self.drained = 0
+        self.high_water = 0
+
+    def put(self, kind, payload):
+        items = self.items
+        depth = len(items)
+        if depth >= self.maxlen:
+            # deque(maxlen) evicts the oldest entry on append
+            self.dropped += 1
+        else:
+            depth += 1
+            if depth > self.high_water:
+                self.high_water = depth
+        items.append((kind, payload))
+        self.pushed += 1
+
+    def drain(self, limit):
+        """Pop up to `limit` (kind, payload) events, oldest first."""
+        items = self.items
+        count = min(limit, len(items))
+        popleft = items.popleft
+        events = [popleft() for _ in range(count)]
+        self.drained += count
+        return events
+
+    @property
+    def depth(self):
+        return len(self.items)
+
+    def stats(self):
+        return {
+            "depth": len(self.items),
+            "high_water": self.high_water,
+            "pushed": self.pushed,
+            "dropped": self.dropped,
+            "drained": self.drained,
+        }
+
+
+# ============================================================================
+# Engine
+# ============================================================================
+class TelemetryEngine:
+    """
+    Owns one serial port and a reader thread.
+
+    The reader blocks in ser.read() until bytes arrive (pyserial waits on the
+    fd with select() on POSIX and overlapped I/O on Windows), so there is no
+    poll loop. With binary=True the port carries TX_BINARY frames
+    (binframe.py) instead of ASCII lines. `ser` may be any object with the
+    same read/in_waiting/write API, e.g. capture.ReplaySerial; setting
+    `capture` to a capture.CaptureWriter records every chunk with its
+    receive time. Bytes, wakeups, frames per mode, parse errors, resyncs
+    and feed() time go to the module-level metrics.
+
+    When a read fails and `on_lost` is set (hotplug.Supervisor), the reader
+    closes the port and calls on_lost(exc), which blocks until it returns a
+    reopened port (or None to give up); state, subscribers and capture
+    carry on with the new port. Without it the reader retries the old one
+    every READ_TIMEOUT. Waits of the reader thread end early when `wakeup`
+    is set, which close() does, so shutdown never waits out a sleep.
+    Subscribers are called on the reader thread:
+        raw(data, t_rx)    every chunk read from the port, with its receive time
+        line(line)         every framed text line (str, ASCII only)
+        frame(frame)       every decoded M0..M4 Frame, after state is updated
+        error(exc)         read errors
+        lost(exc)          the port failed and on_lost is reopening it
+        restored(port)     reading again, from `port`
+    """
+
+    def __init__(self, port=None, baudrate=BAUDRATE, ser=None, state=None, binary=False):
+        self.port = port
+        self.baudrate = baudrate
+        self.ser = ser
+        self.state = state if state is not None else BoardState()
+        self.framer = RingFramer()
+        self.decoder = None
+        if binary:
+            # binframe pulls in numpy; ASCII-only tools start faster without it
+            from binframe import BinaryDecoder
+            self.decoder = BinaryDecoder()
+        self.capture = None
+        self.resyncs_seen = 0
+        self.crc_errors_seen = 0
+        self.frame_counters = {}    # mode -> FRAMES child
+        self.on_lost = None
+        self.running = False
+        self.rx_thread = None
+        self.wakeup = threading.Event()
+        self.listeners = {name: [] for name in EVENTS}
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+    def subscribe(self, event, callback):
+        self.listeners[event].append(callback)
+        return callback
+
+    def unsubscribe(self, event, callback):
+        try:
+            self.listeners[event].remove(callback)
+        except ValueError:
+            pass
+
+    def emit(self, event, *args):
+        for callback in self.listeners[event]:
+            callback(*args)
+
+    # ------------------------------------------------------------------
+    # Connection
+    # ------------------------------------------------------------------
+    @property
+    def connected(self):
+        return self.ser is not None
+
+    def open(self):
+        if self.ser is None:
+            self.ser = serial.Serial(self.port, self.baudrate, timeout=READ_TIMEOUT)
+        self.state.rx_count = 0
+        self.state.tx_count = 0
+        self.framer.reset()
+        if self.decoder is not None:
+            self.decoder.reset()
+        self.running = True
+        self.wakeup.clear()
+        self.rx_thread = threading.Thread(target=self.rx_loop, daemon=True)
+        self.rx_thread.start()
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
+        ser = self.ser
+        if ser is not None and hasattr(ser, "cancel_read"):
+            try:
+                ser.cancel_read()
+            except Exception:
+                pass
+        if self.rx_thread is not None and self.rx_thread is not threading.current_thread():
+            self.rx_thread.join(READ_TIMEOUT * 2)
+        self.rx_thread = None
+
+        # The reader may have swapped in a reopened port meanwhile; closing
+        # a port twice is harmless
+        for port in (ser, self.ser):
+            if port is not None:
+                try:
+                    port.close()
+                except Exception:
+                    pass
+        self.ser = None
+
+    # ------------------------------------------------------------------
+    # TX
+    # ------------------------------------------------------------------
+    def write(self, data):
+        self.ser.write(data)
+        self.state.tx_count += len(data)
+
+    # ------------------------------------------------------------------
+    # RX
+    # ------------------------------------------------------------------
+    def rx_loop(self):
+        while self.running:
+            try:
+                # Block until at least one byte, then drain what is queued
+                data = self.ser.read(1)
+                RX_WAKEUPS.value += 1
+                if not data:
+                    continue
+                waiting = self.ser.in_waiting
+                if waiting:
+                    data += self.ser.read(waiting)
+            except Exception as e:
+                if not self.running:
+                    break
+                self.emit("error", e)
+                if self.on_lost is not None:
+                    if not self.recover(e):
+                        break
+                    continue
+                # Avoid spinning on a port that keeps failing
+                self.wakeup.wait(READ_TIMEOUT)
+                continue
+
+            self.feed(data, time.monotonic())
+
+    def recover(self, exc):
+        """Reader thread: swap in a reopened port; False when closing instead."""
+        self.emit("lost", exc)
+        try:
+            self.ser.close()
+        except Exception:
+            pass
+        ser = self.on_lost(exc)
+        if ser is None:
+            return False
+        if not self.running:
+            ser.close()
+            return False
+        self.ser = ser
+        # The byte stream restarts; a partial line or frame would be garbage
+        self.framer.reset()
+        if self.decoder is not None:
+            self.decoder.reset()
+        self.emit("restored", getattr(ser, "port", None))
+        return True
+
+    def feed(self, data, t_rx=None):
+        """Push raw bytes through framer and parser (also used for replay)."""
+        t_start = time.perf_counter()
+        if t_rx is None:
+            t_rx = time.monotonic()
+        self.state.rx_count += len(data)
+        RX_BYTES.value += len(data)
+        capture = self.capture
+        if capture is not None:
+            capture.write(data, t_rx)
+        self.emit("raw", data, t_rx)
+
+        decoder = self.decoder
+        if decoder is not None:
+            frames = decoder.feed(data, t_rx)
+            if decoder.crc_errors != self.crc_errors_seen:
+                PARSE_ERRORS.value += max(0, decoder.crc_errors - self.crc_errors_seen)
+                self.crc_errors_seen = decoder.crc_errors
+            resyncs = decoder.resyncs
+        else:
+            lines = self.framer.split(data)
+            resyncs = self.framer.resyncs
+            if lines:
+                if self.listeners["line"]:
+                    for raw in lines:
+                        self.emit("line", raw.decode('ascii', errors='replace'))
+                frames = parse_batch(lines, t_rx)
+                if len(frames) != len(lines):
+                    UNKNOWN_LINES.value += len(lines) - len(frames)
+            else:
+                frames = ()
+        if resyncs != self.resyncs_seen:
+            RESYNCS.value += max(0, resyncs - self.resyncs_seen)
+            self.resyncs_seen = resyncs
+
+        counters = self.frame_counters
+        for frame in frames:
+            counter = counters.get(frame.mode)
+            if counter is None:
+                counter = counters[frame.mode] = FRAMES.labels(frame.mode)
+            counter.value += 1
+            if not frame.ok:
+                PARSE_ERRORS.value += 1
+            self.state.apply(frame.mode, frame.fields)
+            self.emit("frame", frame)
+        FEED_SECONDS.observe(time.perf_counter() - t_start)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BinaryDecoder tests: FrameSimulator streams with corrupted and dropped
+frames, CRC rejection, resync after garbage and stray 0xA5 bytes,
+sequence gap counting, frames split across feed() calls.
+
+    python -m pytest uart_controller/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from binframe import (FRAME_SIZE, FRAME_STRUCT, SYNC, TEMP_LSB,  # noqa: E402
+                      BinaryDecoder, FrameSimulator, encode_frame)
+
+
+def simulate(count, seed=0, corrupt=0.0, drop=0.0):
+    """(stream, frames that went out undamaged, simulator)."""
+    sim = FrameSimulator(seed=seed, corrupt=corrupt, drop=drop)
+    stream = bytearray()
+    good = []
+    for _ in range(count):
+        corrupted = sim.corrupted
+        frame = sim.stream(1)
+        stream += frame
+        if frame and sim.corrupted == corrupted:
+            good.append(frame)
+    return bytes(stream), good, sim
+
+
+def expected(frames):
+    """(mode, fields) that feed() must return for undamaged `frames`."""
+    out = []
+    for frame in frames:
+        _, mode, _, x, y, z, temp, sw, led, _, _ = FRAME_STRUCT.unpack(frame)
+        out.append((mode, {"accel_x": x, "accel_y": y, "accel_z": z,
+                           "temperature": temp * TEMP_LSB,
+                           "switch_value": sw, "pc_led_value": led}))
+    return out
+
+
+def run(decoder, data, chunk):
+    frames = []
+    for i in range(0, len(data), chunk):
+        frames += decoder.feed(data[i:i + chunk])
+    return [(f.mode, f.fields) for f in frames]
+
+
+# ============================================================================
+# Clean streams, split across feed() calls
+# ============================================================================
+@pytest.mark.parametrize("chunk", [1, 5, 16, 17, 100, 4096])
+def test_clean_stream_any_chunking(chunk):
+    data, good, _ = simulate(2000, seed=chunk)
+    decoder = BinaryDecoder()
+    assert run(decoder, data, chunk) == expected(good)
+    assert decoder.frames == len(good)
+    assert decoder.crc_errors == decoder.resyncs == decoder.dropped_bytes == decoder.lost == 0
+    assert not decoder.buf
+
+
+def test_partial_frame_carried_over():
+    a, b = encode_frame(1, 0, accel_x=-5), encode_frame(1, 1, temp_raw=101)
+    decoder = BinaryDecoder()
+    for cut in range(1, FRAME_SIZE):
+        assert decoder.feed(a + b[:cut]) and len(decoder.buf) == cut
+        frames = decoder.feed(b[cut:])
+        assert [(f.mode, f.fields) for f in frames] == expected([b])
+        assert not decoder.buf
+        decoder.reset()
+    assert decoder.crc_errors == decoder.dropped_bytes == 0
+
+
+def test_feed_array_matches_feed():
+    data, good, _ = simulate(500, seed=3, corrupt=0.05, drop=0.05)
+    arr = BinaryDecoder().feed_array(data)
+    assert arr.tobytes() == b"".join(good)
+    assert list(arr["temp_raw"] * TEMP_LSB) == [f[1]["temperature"] for f in expected(good)]
+
+
+# ============================================================================
+# CRC rejection
+# ============================================================================
+@pytest.mark.parametrize("offset", range(1, FRAME_SIZE))
+def test_single_bit_error_rejected(offset):
+    frames = [encode_frame(4, seq, accel_x=seq * 3, switch_value=0x1234) for seq in range(3)]
+    bad = bytearray(frames[1])
+    bad[offset] ^= 0x10
+    decoder = BinaryDecoder()
+    assert run(decoder, frames[0] + bytes(bad) + frames[2], 4096) == expected([frames[0], frames[2]])
+    assert decoder.crc_errors >= 1
+    assert decoder.lost == 1
+
+
+def test_bad_crc_in_long_aligned_run():
+    # Long enough for the vectorized check; the bad frame is in the middle
+    frames = [encode_frame(0, seq, accel_z=seq) for seq in range(64)]
+    bad = bytearray(frames[40])
+    bad[-1] ^= 0xFF
+    data = b"".join(frames[:40]) + bytes(bad) + b"".join(frames[41:])
+    decoder = BinaryDecoder()
+    assert run(decoder, data, len(data)) == expected(frames[:40] + frames[41:])
+    assert decoder.crc_errors >= 1 and decoder.lost == 1
+
+
+# ============================================================================
+# Resync
+# ============================================================================
+@pytest.mark.parametrize("chunk", [1, 3, 4096])
+def test_resync_after_garbage(chunk):
+    garbage = bytes(b for b in range(256) if b != SYNC) * 3
+    frames = [encode_frame(2, seq, switch_value=seq) for seq in range(10)]
+    decoder = BinaryDecoder()
+    assert run(decoder, garbage + b"".join(frames), chunk) == expected(frames)
+    assert decoder.dropped_bytes == len(garbage)
+    assert decoder.crc_errors == decoder.resyncs == 0
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 4096])
+def test_resync_after_stray_sync(chunk):
+    frames = [encode_frame(3, seq, pc_led_value=0xBEEF) for seq in range(10)]
+    # A 0xA5 right before a frame: that candidate spans the real frame
+    data = b"".join(frames[:5]) + bytes([SYNC]) + b"".join(frames[5:])
+    decoder = BinaryDecoder()
+    assert run(decoder, data, chunk) == expected(frames)
+    assert decoder.crc_errors == decoder.resyncs == 1
+    assert decoder.dropped_bytes == 1
+    assert decoder.lost == 0
+
+
+def test_resync_after_truncated_frame():
+    frames = [encode_frame(1, seq, temp_raw=seq) for seq in range(6)]
+    data = b"".join(frames[:3]) + frames[3][:9] + b"".join(frames[4:])
+    decoder = BinaryDecoder()
+    assert run(decoder, data, 4096) == expected(frames[:3] + frames[4:])
+    assert decoder.lost == 1
+    assert decoder.dropped_bytes >= 9
+
+
+# ============================================================================
+# Sequence gaps
+# ============================================================================
+@pytest.mark.parametrize("seqs,lost", [
+    ([0, 1, 2, 5, 6], 2),
+    ([254, 255, 0, 1], 0),                  # wrap is not a gap
+    ([250, 3], 8),                          # gap across the wrap
+    (list(range(20)) + list(range(30, 40)), 10),
+    ([7, 7], 255),                          # a repeat reads as a full lap
+])
+@pytest.mark.parametrize("chunk", [FRAME_SIZE, 4096])
+def test_seq_gaps(seqs, lost, chunk):
+    # chunk=FRAME_SIZE goes through the scalar path, 4096 through NumPy
+    decoder = BinaryDecoder()
+    run(decoder, b"".join(encode_frame(0, s) for s in seqs), chunk)
+    assert decoder.frames == len(seqs)
+    assert decoder.lost == lost
+
+
+def test_seq_tracked_across_feeds_until_reset():
+    decoder = BinaryDecoder()
+    decoder.feed(b"".join(encode_frame(0, s) for s in range(10)))
+    decoder.feed(encode_frame(0, 12))
+    assert decoder.lost == 2
+    decoder.reset()
+    decoder.feed(encode_frame(0, 100))
+    assert decoder.lost == 2
+
+
+# ============================================================================
+# Simulator with damage
+# ============================================================================
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("chunk", [1, 64, 4096])
+def test_simulator_corrupt_and_drop(seed, chunk):
+    data, good, sim = simulate(3000, seed=seed, corrupt=0.02, drop=0.02)
+    assert sim.corrupted and sim.dropped
+    decoder = BinaryDecoder()
+    assert run(decoder, data, chunk) == expected(good)
+    assert decoder.frames == sim.sent - sim.corrupted
+    assert decoder.lost == sim.dropped + sim.corrupted
+    assert decoder.crc_errors >= sim.corrupted
+    assert decoder.resyncs == decoder.crc_errors
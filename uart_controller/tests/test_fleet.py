@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet tests against VirtualBoard ptys: add_matching() opens matching
+ports once, and reopens a board that failed when it is plugged back in.
+
+    python -m pytest uart_controller/tests
+"""
+
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fleet  # noqa: E402
+from fleet import Fleet  # noqa: E402
+from virtualboard import VirtualBoard  # noqa: E402
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def fake_ports(monkeypatch, devices):
+    """match_ports() reports `devices` (a list the test may change)."""
+    monkeypatch.setattr(fleet, "match_ports", lambda *a, **kw: [
+        SimpleNamespace(device=d, serial_number="SN%d" % i) for i, d in enumerate(devices)])
+
+
+# ============================================================================
+# add_matching
+# ============================================================================
+def test_add_matching_opens_once(monkeypatch):
+    with VirtualBoard(period=0.01) as vb:
+        fake_ports(monkeypatch, [vb.port])
+        f = Fleet().start()
+        try:
+            added, failed = f.add_matching()
+            assert [b.port for b in added] == [vb.port] and failed == []
+            assert wait_for(lambda: added[0].frames > 0)
+            # Already connected: nothing new
+            assert f.add_matching() == ([], [])
+            assert f.boards[vb.port] is added[0]
+        finally:
+            f.stop()
+
+
+def test_add_matching_reports_ports_that_do_not_open(monkeypatch, tmp_path):
+    fake_ports(monkeypatch, [str(tmp_path / "missing")])
+    f = Fleet()
+    try:
+        added, failed = f.add_matching()
+        assert added == [] and [d for d, _ in failed] == [str(tmp_path / "missing")]
+        assert f.boards == {}
+    finally:
+        f.stop()
+
+
+def test_add_matching_reopens_replugged_board(monkeypatch, tmp_path):
+    # The symlink plays the device node: same path before and after re-plug
+    device = str(tmp_path / "ttyUSB0")
+    fake_ports(monkeypatch, [device])
+    boards = [VirtualBoard(period=0.01).start()]
+    first = boards[0]
+    os.symlink(first.port, device)
+    f = Fleet().start()
+    try:
+        (old,), _ = f.add_matching()
+        assert wait_for(lambda: old.frames > 0)
+
+        # Unplug: the read fails and the board stays listed, disconnected
+        boards.pop().close()
+        assert wait_for(lambda: not old.connected)
+        assert old.errors == 1 and old.last_error is not None
+        assert f.boards[device] is old
+
+        # Plug back in
+        second = VirtualBoard(period=0.01).start()
+        boards.append(second)
+        os.remove(device)
+        os.symlink(second.port, device)
+        (new,), failed = f.add_matching()
+        assert failed == [] and new is not old
+        assert f.boards[device] is new
+        assert wait_for(lambda: new.frames > 0)
+        assert new.connected and new.errors == 0
+        assert f.stats()["connected"] == 1
+    finally:
+        f.stop()
+        for vb in boards:
+            vb.close()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RingFramer tests: multi-MB bursts through feed() and split() at several
+read sizes, lines cut at the ring's wrap point, max_line overflow and
+resync, CR/LF and whitespace trimming.
+
+    python -m pytest uart_controller/tests
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from framer import WHITESPACE, RingFramer  # noqa: E402
+
+
+SAMPLE_LINES = [
+    b"M0:X=+123 Y=-004 Z=+255\r\n",
+    b"M1:T=25.75C\r\n",
+    b"M2:SW=A5F0\r\n",
+    b"M3:RX=12 L=3412\r\n",
+    b"M4:X=-010 T=26C S=00FF\r\n",
+]
+
+
+def make_burst(size, seed=0):
+    """Firmware lines mixed with bare LF, blank and padded lines, about `size` bytes."""
+    rng = random.Random(seed)
+    out = bytearray()
+    while len(out) < size:
+        line = rng.choice(SAMPLE_LINES)
+        roll = rng.random()
+        if roll < 0.05:
+            line = line.rstrip(b"\r\n") + b"\n"
+        elif roll < 0.07:
+            line = b"\r\n"
+        elif roll < 0.09:
+            line = b" \x00" + line
+        out += line
+    return bytes(out)
+
+
+def reference(data, max_line):
+    """Lines the framer must hand out for `data` (no garbage runs in it)."""
+    lines = [line.strip(WHITESPACE) for line in data.split(b"\n")[:-1]]
+    return [line for line in lines if line and len(line) <= max_line]
+
+
+def run(framer, data, chunk, mode):
+    lines = []
+    for i in range(0, len(data), chunk):
+        part = data[i:i + chunk]
+        if mode == "feed":
+            # Views are only valid until the generator moves on
+            lines += [bytes(v) for v in framer.feed(part)]
+        else:
+            lines += framer.split(part)
+    return lines
+
+
+# ============================================================================
+# Bursts
+# ============================================================================
+@pytest.mark.parametrize("chunk", [1, 97, 4096])
+def test_burst_feed_and_split_agree(chunk):
+    # Byte-at-a-time goes through Python per byte; keep that burst smaller
+    data = make_burst((1 if chunk == 1 else 4) * 1024 * 1024, seed=chunk)
+    expected = reference(data, RingFramer().max_line)
+    results = {}
+    for mode in ("feed", "split"):
+        framer = RingFramer()
+        results[mode] = run(framer, data, chunk, mode)
+        assert framer.lines == len(expected)
+        assert framer.resyncs == 0 and framer.dropped_bytes == 0
+        assert framer.pending == 0
+        # The ring never grows
+        assert len(framer.buf) == framer.capacity
+    assert results["feed"] == results["split"] == expected
+
+
+def test_burst_in_one_read():
+    data = make_burst(8 * 1024 * 1024, seed=1)
+    expected = reference(data, RingFramer().max_line)
+    assert RingFramer().split(data) == expected
+    assert [bytes(v) for v in RingFramer().feed(data)] == expected
+
+
+def test_partial_line_carried_over():
+    data = make_burst(64 * 1024, seed=2) + b"M2:SW=00"
+    for mode in ("feed", "split"):
+        framer = RingFramer()
+        lines = run(framer, data, 4096, mode)
+        assert lines == reference(data, framer.max_line)
+        assert framer.pending == len(b"M2:SW=00")
+        lines = run(framer, b"FF\r\n", 4096, mode)
+        assert lines == [b"M2:SW=00FF"]
+        assert framer.pending == 0
+
+
+# ============================================================================
+# Ring wrap
+# ============================================================================
+@pytest.mark.parametrize("mode", ["feed", "split"])
+def test_line_cut_at_wrap_point(mode):
+    capacity = 64
+    line = b"M4:X=-010 T=26C S=00FF\r\n"
+    for cut in range(1, len(line)):
+        # Short filler lines so the line starts `cut` bytes before the end of the ring
+        filler = b""
+        while len(filler) < capacity - cut:
+            filler += b"F" * min(18, capacity - cut - len(filler) - 1) + b"\n"
+        data = filler + line + SAMPLE_LINES[1]
+        framer = RingFramer(capacity=capacity, max_line=40)
+        lines = run(framer, data, capacity, mode)
+        assert lines == reference(data, 40), cut
+        assert lines[-2:] == [line.strip(), SAMPLE_LINES[1].strip()], cut
+        assert framer.pending == 0
+
+
+@pytest.mark.parametrize("mode", ["feed", "split"])
+@pytest.mark.parametrize("chunk", [1, 7, 50])
+def test_many_wraps_small_ring(mode, chunk):
+    data = make_burst(256 * 1024, seed=chunk)
+    framer = RingFramer(capacity=64, max_line=40)
+    assert run(framer, data, chunk, mode) == reference(data, 40)
+    assert framer.resyncs == 0
+
+
+# ============================================================================
+# max_line overflow and resync
+# ============================================================================
+@pytest.mark.parametrize("mode", ["feed", "split"])
+@pytest.mark.parametrize("chunk", [1, 97, 4096])
+def test_overflow_resync(mode, chunk):
+    max_line = 64
+    noise = bytes(random.Random(1).randrange(33, 256) for _ in range(5000))
+    longest = b"L" * max_line
+    data = (SAMPLE_LINES[0] + noise + b"\n" + SAMPLE_LINES[1] + longest + b"\r\n"
+            + b"L" * (max_line + 1) + b"\n" + SAMPLE_LINES[2])
+    framer = RingFramer(capacity=1024, max_line=max_line)
+    lines = run(framer, data, chunk, mode)
+    assert lines == [SAMPLE_LINES[0].strip(), SAMPLE_LINES[1].strip(), longest, SAMPLE_LINES[2].strip()]
+    # The noise run (no newline for > capacity bytes) and the one-too-long line
+    assert framer.resyncs == 2
+    assert framer.dropped_bytes == len(noise) + 1 + max_line + 2
+    assert framer.pending == 0
+
+
+@pytest.mark.parametrize("mode", ["feed", "split"])
+def test_garbage_without_newline_stays_bounded(mode):
+    framer = RingFramer(capacity=1024, max_line=64)
+    noise = b"\xAA" * (3 * 1024 * 1024)
+    assert run(framer, noise, 4096, mode) == []
+    assert framer.pending <= framer.max_line
+    assert len(framer.buf) == framer.capacity
+    # Resyncs on the next newline; the line after it is clean
+    assert run(framer, b"tail\n" + SAMPLE_LINES[3], 4096, mode) == [SAMPLE_LINES[3].strip()]
+    assert framer.resyncs == 1
+    assert framer.dropped_bytes == len(noise) + len(b"tail\n")
+
+
+# ============================================================================
+# CR / LF
+# ============================================================================
+@pytest.mark.parametrize("mode", ["feed", "split"])
+@pytest.mark.parametrize("chunk", [1, 3, 4096])
+def test_cr_lf_and_whitespace(mode, chunk):
+    data = (b"M1:T=25.75C\r\n"      # CRLF
+            b"M2:SW=A5F0\n"         # bare LF
+            b"M3:RX=12 L=3412\r\r\n"
+            b"\r\n\n \t\r\n"        # blank lines
+            b"\x00 M0:X=+1 Y=+2 Z=+3 \r\n"
+            b"M4:X=-010\rT=26C\r\n"  # CR inside a line is kept
+            b"\r")                  # lone CR: no line yet
+    framer = RingFramer()
+    lines = run(framer, data, chunk, mode)
+    assert lines == [b"M1:T=25.75C", b"M2:SW=A5F0", b"M3:RX=12 L=3412",
+                     b"M0:X=+1 Y=+2 Z=+3", b"M4:X=-010\rT=26C"]
+    assert framer.pending == 1
+    assert run(framer, b"\n", chunk, mode) == []
+    assert framer.pending == 0
@@ -0,0 +1,731 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Triggers - FPGA Nexys A7-100T UART
+Level / edge / window conditions on decoded frames, pre-trigger rings,
+event captures.
+
+    python uartserial.py trigger --port /dev/ttyUSB1 --when "shock=accel_mag > 1500"
+    python uartserial.py trigger --port COM5 --when "mode == 2 and switch_value & 0x8000 == 0x8000"
+    python uartserial.py trigger --replay soak.cap --when "temperature outside 20..45" -o events
+
+Condition syntax (--when [NAME=]EXPR):
+    CHANNEL OP NUMBER                    OP is > >= < <= == !=
+    CHANNEL & MASK OP NUMBER             switch bits, e.g. switch_value & 0x00F0 == 0x0010
+    CHANNEL outside|inside LOW..HIGH     window
+    CHANNEL rises|falls|crosses NUMBER [hyst NUMBER]
+    CHANNEL changes [& MASK]
+combined with and / or / not and parentheses. Channels are mode, the
+BoardState fields and accel_mag (|a| in counts, from M0 and binary frames).
+
+A trigger fires on the frame where its condition becomes true. The event
+is written as <name>-<n>.cap, the raw chunks from `pre` seconds before to
+`post` seconds after (replayable: record --replay, analyze), and
+<name>-<n>.samples, the decoded samples of the same span as SAMPLE_DTYPE
+records (samplestore.open_spill()).
+"""
+
+import math
+import operator
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+
+from capture import CaptureWriter
+from hotplug import supervise
+from metrics import REGISTRY
+from telemetry import BAUDRATE, STATE_FIELDS, TelemetryEngine
+
+
+DEFAULT_PRE = 2.0
+DEFAULT_POST = 2.0
+# Bytes per second at BAUDRATE (8N1), and the fastest frame rate (TX_BINARY
+# ODR); the rings are sized from these and the longest pre/post
+RAW_RATE = BAUDRATE / 10
+MAX_FRAME_RATE = 100.0
+RING_MARGIN = 2.0
+# How often the live command ends events on a quiet port (seconds)
+POLL_INTERVAL = 0.25
+
+CHANNEL_NAMES = ("mode",) + STATE_FIELDS[1:] + ("accel_mag",)
+OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+       "==": operator.eq, "!=": operator.ne}
+
+EVENTS = REGISTRY.counter("uart_trigger_events_total", "Trigger events started", ("trigger",))
+
+
+# ============================================================================
+# Channel access
+# ============================================================================
+def _get_mode(frame):
+    return frame.mode
+
+
+def _get_accel_mag(frame):
+    fields = frame.fields
+    if "accel_z" not in fields:         # M4 carries X only
+        return None
+    x, y, z = fields["accel_x"], fields["accel_y"], fields["accel_z"]
+    return math.sqrt(x * x + y * y + z * z)
+
+
+def _getter(channel):
+    """frame -> value of `channel`, or None when the frame does not carry it."""
+    if channel not in CHANNEL_NAMES:
+        raise ValueError(f"unknown channel {channel!r} (one of {', '.join(CHANNEL_NAMES)})")
+    if channel == "mode":
+        return _get_mode
+    if channel == "accel_mag":
+        return _get_accel_mag
+    return lambda frame: frame.fields.get(channel)
+
+
+# ============================================================================
+# Conditions
+# ============================================================================
+class Condition:
+    """
+    Stateful predicate over the frame stream.
+
+    update(frame) evaluates one frame and returns the new `value`. A frame
+    that does not carry the channel (M1 has no accel_x, ...) leaves level
+    and window conditions as they were and never fires an edge. Nothing is
+    allocated per frame beyond what the arithmetic itself needs, so one
+    condition tree per board is cheap to run on every frame. Combine with
+    & | ~ or All / Any / Not.
+    """
+
+    __slots__ = ("value",)
+
+    def __and__(self, other):
+        return All(self, other)
+
+    def __or__(self, other):
+        return Any(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def reset(self):
+        self.value = False
+
+    def channels(self):
+        return {self.channel}
+
+
+class Level(Condition):
+    """value OP threshold, optionally on (value & mask)."""
+
+    __slots__ = ("channel", "get", "op", "threshold", "mask")
+
+    def __init__(self, channel, op, threshold, mask=None):
+        self.channel = channel
+        self.get = _getter(channel)
+        self.op = OPS[op]
+        self.threshold = threshold
+        self.mask = mask
+        self.value = False
+
+    def update(self, frame):
+        v = self.get(frame)
+        if v is not None:
+            if self.mask is not None:
+                v = int(v) & self.mask
+            self.value = self.op(v, self.threshold)
+        return self.value
+
+
+class Window(Condition):
+    """True while low <= value <= high (inside) or outside that range."""
+
+    __slots__ = ("channel", "get", "low", "high", "inside")
+
+    def __init__(self, channel, low, high, inside=False):
+        if low > high:
+            raise ValueError("window low must not exceed high")
+        self.channel = channel
+        self.get = _getter(channel)
+        self.low = low
+        self.high = high
+        self.inside = inside
+        self.value = False
+
+    def update(self, frame):
+        v = self.get(frame)
+        if v is not None:
+            self.value = (self.low <= v <= self.high) == self.inside
+        return self.value
+
+
+class Edge(Condition):
+    """
+    True on the frame where the value crosses `threshold`.
+
+    The value is "above" once it reaches threshold and "below" once it
+    drops under threshold - hysteresis; rising fires on below -> above,
+    falling on above -> below. The first value only sets the side.
+    """
+
+    __slots__ = ("channel", "get", "threshold", "hysteresis", "rising", "falling", "above")
+
+    def __init__(self, channel, threshold, direction="rising", hysteresis=0):
+        if direction not in ("rising", "falling", "both"):
+            raise ValueError("direction must be rising, falling or both")
+        self.channel = channel
+        self.get = _getter(channel)
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.rising = direction != "falling"
+        self.falling = direction != "rising"
+        self.above = None
+        self.value = False
+
+    def reset(self):
+        self.above = None
+        self.value = False
+
+    def update(self, frame):
+        self.value = False
+        v = self.get(frame)
+        if v is None:
+            return False
+        if self.above is None:
+            self.above = v >= self.threshold
+        elif self.above:
+            if v < self.threshold - self.hysteresis:
+                self.above = False
+                self.value = self.falling
+        elif v >= self.threshold:
+            self.above = True
+            self.value = self.rising
+        return self.value
+
+
+class Changed(Condition):
+    """True on the frame where value (& mask) differs from the previous one."""
+
+    __slots__ = ("channel", "get", "mask", "last")
+
+    def __init__(self, channel, mask=None):
+        self.channel = channel
+        self.get = _getter(channel)
+        self.mask = mask
+        self.last = None
+        self.value = False
+
+    def reset(self):
+        self.last = None
+        self.value = False
+
+    def update(self, frame):
+        self.value = False
+        v = self.get(frame)
+        if v is None:
+            return False
+        if self.mask is not None:
+            v = int(v) & self.mask
+        if self.last is not None and v != self.last:
+            self.value = True
+        self.last = v
+        return self.value
+
+
+class All(Condition):
+    """Every child updates on every frame (edges must see all values)."""
+
+    __slots__ = ("children",)
+
+    def __init__(self, *children):
+        self.children = children
+        self.value = False
+
+    def reset(self):
+        for child in self.children:
+            child.reset()
+        self.value = False
+
+    def channels(self):
+        return set().union(*(child.channels() for child in self.children))
+
+    def update(self, frame):
+        value = True
+        for child in self.children:
+            if not child.update(frame):
+                value = False
+        self.value = value
+        return value
+
+
+class Any(All):
+    __slots__ = ()
+
+    def update(self, frame):
+        value = False
+        for child in self.children:
+            if child.update(frame):
+                value = True
+        self.value = value
+        return value
+
+
+class Not(All):
+    __slots__ = ()
+
+    def __init__(self, child):
+        super().__init__(child)
+
+    def update(self, frame):
+        self.value = not self.children[0].update(frame)
+        return self.value
+
+
+# ============================================================================
+# Condition text (--when)
+# ============================================================================
+TOKEN_RE = re.compile(r"\s*(\(|\)|\.\.|[<>=!]=|[<>&]|[A-Za-z_]\w*|[-+]?(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?))")
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = TOKEN_RE.match(text, pos)
+        if m is None:
+            raise ValueError(f"bad condition at {text[pos:]!r}")
+        tokens.append(m.group(1))
+        pos = m.end()
+    return tokens
+
+
+def _number(token):
+    try:
+        if token.lower().lstrip("+-").startswith("0x"):
+            return int(token, 16)
+        value = float(token)
+    except (TypeError, ValueError):
+        raise ValueError(f"expected a number, got {token!r}") from None
+    return int(value) if value.is_integer() and "." not in token else value
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(f"expected {expected or 'more'}, got {token or 'end of condition'}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        cond = self.expr()
+        if self.peek() is not None:
+            raise ValueError(f"unexpected {self.peek()!r}")
+        return cond
+
+    def expr(self):
+        terms = [self.term()]
+        while self.peek() == "or":
+            self.take()
+            terms.append(self.term())
+        return terms[0] if len(terms) == 1 else Any(*terms)
+
+    def term(self):
+        factors = [self.factor()]
+        while self.peek() == "and":
+            self.take()
+            factors.append(self.factor())
+        return factors[0] if len(factors) == 1 else All(*factors)
+
+    def factor(self):
+        token = self.peek()
+        if token == "not":
+            self.take()
+            return Not(self.factor())
+        if token == "(":
+            self.take()
+            cond = self.expr()
+            self.take(")")
+            return cond
+        return self.leaf()
+
+    def leaf(self):
+        channel = self.take()
+        mask = None
+        if self.peek() == "&":
+            self.take()
+            mask = _number(self.take())
+        word = self.take()
+        if word in OPS:
+            return Level(channel, word, _number(self.take()), mask)
+        if word == "changes":
+            if mask is None and self.peek() == "&":
+                self.take()
+                mask = _number(self.take())
+            return Changed(channel, mask)
+        if mask is not None:
+            raise ValueError(f"a mask only works with comparisons and changes, not {word!r}")
+        if word in ("inside", "outside"):
+            low = _number(self.take())
+            self.take("..")
+            return Window(channel, low, _number(self.take()), inside=word == "inside")
+        if word in ("rises", "falls", "crosses"):
+            threshold = _number(self.take())
+            hysteresis = 0
+            if self.peek() == "hyst":
+                self.take()
+                hysteresis = _number(self.take())
+            direction = {"rises": "rising", "falls": "falling", "crosses": "both"}[word]
+            return Edge(channel, threshold, direction, hysteresis)
+        raise ValueError(f"unknown condition {word!r}")
+
+
+def parse_condition(text):
+    """Build a fresh Condition tree from --when syntax (see module docstring)."""
+    return _Parser(text).parse()
+
+
+# ============================================================================
+# Pre-trigger rings
+# ============================================================================
+class RawRing:
+    """
+    The last `size` bytes of raw chunks with their receive times.
+
+    Bytes live in one preallocated bytearray and chunk boundaries in fixed
+    arrays of `slots` entries, so append() copies the chunk and stores
+    three numbers. chunks(t0) returns the chunks received at or after t0
+    that are still whole in the ring.
+    """
+
+    def __init__(self, size, slots):
+        self.size = size
+        self.slots = slots
+        self.buf = bytearray(size)
+        self.times = array("d", bytes(8 * slots))
+        self.starts = array("q", bytes(8 * slots))
+        self.ends = array("q", bytes(8 * slots))
+        self.count = 0      # chunks
+        self.total = 0      # bytes
+
+    def append(self, data, t):
+        n = len(data)
+        start = self.total
+        if n > self.size:
+            # Never whole in the ring; keep the tail so later chunks line up
+            data = memoryview(data)[n - self.size:]
+            self.total += n - self.size
+            n = self.size
+        pos = self.total % self.size
+        first = min(n, self.size - pos)
+        buf = self.buf
+        buf[pos:pos + first] = data[:first]
+        if first < n:
+            buf[:n - first] = data[first:]
+        self.total += n
+
+        i = self.count % self.slots
+        self.times[i] = t
+        self.starts[i] = start
+        self.ends[i] = self.total
+        self.count += 1
+
+    def chunks(self, t0):
+        oldest = self.total - self.size
+        out = []
+        for k in range(max(0, self.count - self.slots), self.count):
+            i = k % self.slots
+            t = self.times[i]
+            if t < t0 or self.starts[i] < oldest:
+                continue
+            out.append((t, self._read(self.starts[i], self.ends[i])))
+        return out
+
+    def _read(self, start, end):
+        a = start % self.size
+        b = a + end - start
+        if b <= self.size:
+            return bytes(self.buf[a:b])
+        return bytes(self.buf[a:]) + bytes(self.buf[:b - self.size])
+
+
+# ============================================================================
+# Triggers and events
+# ============================================================================
+class Trigger:
+    """
+    A named condition with its capture window.
+
+    check(frame) is True on the frame where the condition goes from false
+    to true, unless the previous event of this trigger started less than
+    `holdoff` seconds earlier (default: post, so events do not overlap).
+    """
+
+    def __init__(self, name, condition, pre=DEFAULT_PRE, post=DEFAULT_POST, holdoff=None):
+        if pre < 0 or post < 0:
+            raise ValueError("pre and post must be >= 0")
+        self.name = name
+        self.condition = condition
+        self.pre = pre
+        self.post = post
+        self.holdoff = post if holdoff is None else holdoff
+        self.last = False
+        self.ready = -math.inf
+        self.fired = 0
+        self.counter = EVENTS.labels(name)
+
+    def reset(self):
+        self.condition.reset()
+        self.last = False
+        self.ready = -math.inf
+
+    def check(self, frame):
+        value = self.condition.update(frame)
+        fire = value and not self.last and frame.t_rx >= self.ready
+        self.last = value
+        return fire
+
+
+class TriggerEvent:
+    """One firing: where it was written and how much went into it."""
+
+    def __init__(self, trigger, frame, path):
+        self.trigger = trigger.name
+        self.index = trigger.fired
+        self.frame = frame
+        self.t = frame.t_rx
+        self.t_start = frame.t_rx - trigger.pre
+        self.t_end = frame.t_rx + trigger.post
+        self.path = path
+        self.samples_path = os.path.splitext(path)[0] + ".samples"
+        self.writer = None
+        self.samples = 0
+        self.done = False
+
+    @property
+    def chunks(self):
+        return self.writer.records
+
+    @property
+    def bytes(self):
+        return self.writer.bytes
+
+
+class TriggerMonitor:
+    """
+    Evaluates triggers on one engine's frames and writes event files.
+
+    attach(engine) subscribes to raw and frame; both run on the reader
+    thread. Every raw chunk goes into a RawRing and every frame into a
+    SampleStore, sized for the longest pre (raw) and pre + post (decoded)
+    at full link rate. When a trigger fires, the ring's last `pre` seconds
+    are written to a new capture and later chunks are appended until
+    `post` seconds after the trigger; the decoded samples of the span are
+    written when the event ends. If the stream goes quiet, poll(now) ends
+    events whose post time has passed; close() ends all of them. Both may
+    be called from another thread: the lock is only taken while an event
+    is open.
+    on_event(event) is called when an event starts (done False) and when
+    it ends (done True). `offset` converts frame times to wall-clock time
+    for the capture headers (default: live, monotonic clock).
+    """
+
+    def __init__(self, triggers, directory=".", binary=False, on_event=None, offset=None):
+        self.triggers = list(triggers)
+        names = [t.name for t in self.triggers]
+        if len(set(names)) != len(names):
+            raise ValueError("trigger names must be unique")
+        self.directory = directory
+        self.binary = binary
+        self.on_event = on_event
+        self.offset = time.time() - time.monotonic() if offset is None else offset
+
+        pre = max((t.pre for t in self.triggers), default=0.0)
+        span = max((t.pre + t.post for t in self.triggers), default=0.0)
+        # Imported here: samplestore needs numpy, the argument parser does not
+        from samplestore import SampleStore
+
+        size = int(RAW_RATE * pre * RING_MARGIN) + 4096
+        self.ring = RawRing(size, max(1024, size // 8))
+        self.store = SampleStore(int(MAX_FRAME_RATE * span * RING_MARGIN) + 64)
+        self.active = []
+        self.lock = threading.Lock()
+
+        # Stats
+        self.frames = 0
+        self.events = []
+
+    def attach(self, engine):
+        self.binary = engine.decoder is not None
+        engine.subscribe("raw", self.on_raw)
+        engine.subscribe("frame", self.on_frame)
+        return self
+
+    def detach(self, engine):
+        engine.unsubscribe("raw", self.on_raw)
+        engine.unsubscribe("frame", self.on_frame)
+
+    # ------------------------------------------------------------------
+    # Engine subscribers
+    # ------------------------------------------------------------------
+    def on_raw(self, data, t_rx):
+        self.ring.append(data, t_rx)
+        if self.active:
+            with self.lock:
+                for event in self.active[:]:
+                    if t_rx > event.t_end:
+                        self._finish(event)
+                    else:
+                        event.writer.write(data, t_rx)
+
+    def on_frame(self, frame):
+        self.frames += 1
+        self.store.append_frame(frame)
+        for trigger in self.triggers:
+            if trigger.check(frame):
+                self._fire(trigger, frame)
+
+    def poll(self, now):
+        if self.active:
+            with self.lock:
+                for event in self.active[:]:
+                    if now > event.t_end:
+                        self._finish(event)
+
+    def close(self):
+        with self.lock:
+            for event in self.active[:]:
+                self._finish(event)
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+    def _fire(self, trigger, frame):
+        trigger.ready = frame.t_rx + trigger.holdoff
+        trigger.counter.value += 1
+        path = os.path.join(self.directory, f"{trigger.name}-{trigger.fired:04d}.cap")
+        event = TriggerEvent(trigger, frame, path)
+        trigger.fired += 1
+
+        # The chunk that completed this frame was emitted (raw) before it
+        chunks = self.ring.chunks(event.t_start)
+        t_first = chunks[0][0] if chunks else event.t
+        os.makedirs(self.directory, exist_ok=True)
+        event.writer = CaptureWriter(path, binary=self.binary, wall_start=t_first + self.offset)
+        for t, data in chunks:
+            event.writer.write(data, t)
+        with self.lock:
+            self.active.append(event)
+        self.events.append(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _finish(self, event):
+        """End an open event (lock held)."""
+        self.active.remove(event)
+        event.writer.close()
+        from samplestore import to_records
+
+        records = to_records(self.store.between(event.t_start, math.nextafter(event.t_end, math.inf)))
+        records.tofile(event.samples_path)
+        event.samples = len(records)
+        event.done = True
+        if self.on_event is not None:
+            self.on_event(event)
+
+
+def make_triggers(specs, pre=DEFAULT_PRE, post=DEFAULT_POST, holdoff=None):
+    """Triggers from "[NAME=]EXPR" strings; unnamed ones are trigger0, trigger1, ..."""
+    triggers = []
+    for i, spec in enumerate(specs):
+        m = re.match(r"\s*(\w+)\s*=(?!=)(.*)", spec)
+        name, text = (m.group(1), m.group(2)) if m and m.group(1) not in CHANNEL_NAMES else (f"trigger{i}", spec)
+        try:
+            condition = parse_condition(text)
+        except ValueError as e:
+            raise ValueError(f"{spec!r}: {e}") from None
+        triggers.append(Trigger(name, condition, pre, post, holdoff))
+    return triggers
+
+
+# ============================================================================
+# Command line (uartserial.py trigger)
+# ============================================================================
+def add_arguments(ap):
+    ap.add_argument("--port", help="serial port, e.g. /dev/ttyUSB1 or COM5")
+    ap.add_argument("--replay", metavar="CAP", help="evaluate a capture file instead of a port")
+    ap.add_argument("--binary", action="store_true", help="firmware sends binary frames (TX_BINARY = 1)")
+    ap.add_argument("--when", action="append", required=True, metavar="[NAME=]EXPR",
+                    help="trigger condition, repeatable (syntax: see triggers.py)")
+    ap.add_argument("--pre", type=float, default=DEFAULT_PRE, help="seconds kept before a trigger")
+    ap.add_argument("--post", type=float, default=DEFAULT_POST, help="seconds recorded after a trigger")
+    ap.add_argument("--holdoff", type=float, help="minimum seconds between events of one trigger "
+                    "(default: --post)")
+    ap.add_argument("-o", "--output", default=".", metavar="DIR", help="directory for event files")
+    ap.add_argument("--duration", type=float, help="stop after this many seconds")
+    ap.add_argument("--count", type=int, help="stop after this many events")
+
+
+def run(args):
+    if bool(args.port) == bool(args.replay):
+        sys.exit("trigger: give exactly one of --port or --replay")
+    try:
+        triggers = make_triggers(args.when, args.pre, args.post, args.holdoff)
+    except (KeyError, ValueError) as e:
+        sys.exit(f"trigger: {e}")
+
+    done = threading.Event()
+
+    def report(event):
+        if not event.done:
+            print(f"trigger: {event.trigger} #{event.index} at t={event.t:.3f} "
+                  f"mode {event.frame.mode} {event.frame.fields}", file=sys.stderr)
+            return
+        print(f"trigger: {event.trigger} #{event.index} -> {event.path} "
+              f"({event.chunks} chunks, {event.bytes} bytes, {event.samples} samples)", file=sys.stderr)
+        if args.count is not None and sum(e.done for e in monitor.events) >= args.count:
+            done.set()
+
+    monitor = TriggerMonitor(triggers, args.output, on_event=report)
+    if args.replay:
+        from capture import CaptureReader
+
+        reader = CaptureReader(args.replay)
+        engine = TelemetryEngine(binary=reader.binary or args.binary)
+        monitor.offset = reader.wall_start - reader.t_first
+        monitor.attach(engine)
+        try:
+            for t, data in reader.records():
+                if done.is_set() or (args.duration is not None and t - reader.t_first > args.duration):
+                    break
+                engine.feed(data, t)
+        finally:
+            reader.close()
+            monitor.close()
+    else:
+        engine = TelemetryEngine(args.port, BAUDRATE, binary=args.binary)
+        supervise(engine, "trigger")
+        monitor.attach(engine)
+        engine.subscribe("error", lambda e: print(f"trigger: read error: {e}", file=sys.stderr))
+        engine.open()
+        end = None if args.duration is None else time.monotonic() + args.duration
+        try:
+            while not done.is_set() and (end is None or time.monotonic() < end):
+                done.wait(POLL_INTERVAL)
+                monitor.poll(time.monotonic())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            engine.close()
+            monitor.close()
+    print(f"trigger: {monitor.frames} frames, {len(monitor.events)} events", file=sys.stderr)
+    return 0
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TX queue - FPGA Nexys A7-100T UART
+Writer thread with LED coalescing, raw batching and line-rate pacing.
+"""
+
+import threading
+import time
+from collections import deque
+
+from telemetry import BAUDRATE
+
+
+# Raw payload bytes allowed to wait in the queue; more are dropped
+TX_QUEUE_BYTES = 64 * 1024
+# Largest single write handed to the port
+MAX_BATCH = 4096
+BITS_PER_BYTE = 10      # 8N1
+
+
+class TxQueue:
+    """
+    Non-blocking front end for a blocking write function.
+
+    Callers (e.g. the Tk thread) only append to a queue; a writer thread
+    does the actual port writes. Output is paced to the line rate, so the
+    OS buffer stays nearly empty and pending work stays here where it can
+    be merged:
+        set_leds()   while an LED update is still queued, a newer value
+                     replaces it in place (last writer wins, `coalesced`)
+        send()       raw payloads queued together go out as one write;
+                     beyond TX_QUEUE_BYTES new payloads are refused
+                     (`dropped`)
+    on_error(exc) is called on the writer thread when a write fails.
+    """
+
+    def __init__(self, write, baudrate=BAUDRATE, max_bytes=TX_QUEUE_BYTES, pace=True, on_error=None):
+        self.write = write
+        self.byte_time = BITS_PER_BYTE / baudrate
+        self.max_bytes = max_bytes
+        self.pace = pace
+        self.on_error = on_error
+
+        self.cond = threading.Condition()
+        self.items = deque()        # [payload] lists, LED entries are mutable
+        self.led_item = None        # queued LED entry, if any
+        self.queued_bytes = 0
+        self.running = False
+        self.thread = None
+
+        # Counters
+        self.queued = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.writes = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.last_error = None
+
+    # ------------------------------------------------------------------
+    # Producer side (any thread)
+    # ------------------------------------------------------------------
+    def set_leds(self, value):
+        """Queue a 16-bit LED value (2-byte protocol: low, high)."""
+        value &= 0xFFFF
+        payload = bytes((value & 0xFF, value >> 8))
+        with self.cond:
+            self.queued += 1
+            if self.led_item is not None:
+                self.led_item[0] = payload
+                self.coalesced += 1
+                return
+            self.led_item = [payload]
+            self.items.append(self.led_item)
+            self.queued_bytes += 2
+            self.cond.notify()
+
+    def write_leds(self, data):
+        """
+        set_leds() for pre-encoded frames (low, high byte pairs), usable as
+        LedStreamer's write: only the last frame of `data` is queued.
+        """
+        self.set_leds(data[-2] | data[-1] << 8)
+
+    def send(self, data):
+        """Queue raw bytes; False if the queue is full and they were dropped."""
+        if not data:
+            return True
+        with self.cond:
+            if self.queued_bytes + len(data) > self.max_bytes:
+                self.dropped += 1
+                return False
+            self.queued += 1
+            self.items.append([bytes(data)])
+            self.queued_bytes += len(data)
+            self.cond.notify()
+        return True
+
+    @property
+    def pending(self):
+        return self.queued_bytes
+
+    def stats(self):
+        return {
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "writes": self.writes,
+            "bytes": self.bytes_sent,
+            "pending": self.queued_bytes,
+            "errors": self.errors,
+        }
+
+    # ------------------------------------------------------------------
+    # Thread
+    # ------------------------------------------------------------------
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, flush=True, timeout=1.0):
+        """Stop the writer; with flush, queued data is sent first (up to timeout)."""
+        with self.cond:
+            self.running = False
+            if not flush:
+                self._clear()
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def run(self):
+        next_free = 0.0
+        cond = self.cond
+        while True:
+            with cond:
+                while self.running and not self.items:
+                    cond.wait()
+                if not self.items:
+                    break
+                # Let the line finish what it already has; updates that
+                # arrive meanwhile are coalesced into this batch
+                while self.pace and self.running:
+                    delay = next_free - time.monotonic()
+                    if delay <= 0:
+                        break
+                    cond.wait(delay)
+                if not self.items:
+                    continue
+                data = self._take_batch()
+
+            try:
+                self.write(data)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                if self.on_error is not None:
+                    self.on_error(e)
+                continue
+            self.writes += 1
+            self.bytes_sent += len(data)
+            now = time.monotonic()
+            next_free = max(now, next_free) + len(data) * self.byte_time
+
+    # ------------------------------------------------------------------
+    # Internals (called with cond held)
+    # ------------------------------------------------------------------
+    def _take_batch(self):
+        items = self.items
+        out = bytearray()
+        while items and (not out or len(out) + len(items[0][0]) <= MAX_BATCH):
+            item = items.popleft()
+            if item is self.led_item:
+                self.led_item = None
+            out += item[0]
+        self.queued_bytes -= len(out)
+        return bytes(out)
+
+    def _clear(self):
+        self.items.clear()
+        self.led_item = None
+        self.queued_bytes = 0
@@ -1,6 +1,13 @@
 `timescale 1ns / 1ps
 
-module integrated_system (
+module integrated_system #(
+    // UART TX format: 0 = ASCII lines "Mn:...\r\n", 1 = 16-byte binary frames
+    // (sync 0xA5, mode, seq, X/Y/Z int16 LE, temp, SW, PC LED, last RX, CRC-8)
+    parameter         TX_BINARY     = 0,
+    // Accelerometer read + periodic TX period in clocks (default 0.5 s).
+    // Binary builds can use 1_000_000 (10 ms = ADXL362 ODR 100 Hz).
+    parameter [26:0]  SAMPLE_PERIOD = 27'd50_000_000
+) (
     // Clock & Reset
     input         clk,              // 100 MHz
     input         rst_n,            // Active LOW reset (CPU_RESETN - C12)
@@ -235,7 +242,7 @@ module integrated_system (
 
                 SPI_IDLE: begin
                     r_spi_timer <= r_spi_timer + 1;
-                    if (r_spi_timer == 27'd50_000_000) begin
+                    if (r_spi_timer == SAMPLE_PERIOD) begin
                         r_spi_timer <= 0;
                         r_spi_state <= SPI_READ_XL;
                         r_spi_cmd   <= 8'h0B;
@@ -436,6 +443,8 @@ module integrated_system (
     reg [26:0] r_tx_timer;
     reg r_sw_changed;
     reg [15:0] r_sw_prev;
+    reg [7:0] r_tx_seq;             // Binary frame sequence counter
+    reg [7:0] r_tx_crc;             // Running CRC-8 of the frame being sent
 
     localparam TX_IDLE = 3'd0;
     localparam TX_LOAD = 3'd1;
@@ -463,6 +472,20 @@ module integrated_system (
         dig2ascii = 8'd48 + dig;
     endfunction
 
+    // CRC-8, poly 0x07, init 0x00 - one byte per call (8 XOR levels)
+    function [7:0] crc8_update;
+        input [7:0] crc;
+        input [7:0] data;
+        integer k;
+        reg [7:0] c;
+        begin
+            c = crc ^ data;
+            for (k = 0; k < 8; k = k + 1)
+                c = c[7] ? ((c << 1) ^ 8'h07) : (c << 1);
+            crc8_update = c;
+        end
+    endfunction
+
     always @(posedge clk) begin
         if (w_rst) begin
             r_tx_state <= TX_IDLE;
@@ -471,6 +494,8 @@ module integrated_system (
             r_tx_len   <= 0;
             r_tx_timer <= 0;
             r_tx_data  <= 0;
+            r_tx_seq   <= 0;
+            r_tx_crc   <= 0;
         end else begin
             r_tx_start <= 1'b0;
 
@@ -478,7 +503,7 @@ module integrated_system (
                 TX_IDLE: begin
                     r_tx_timer <= r_tx_timer + 1;
                     
-                    if ((r_tx_timer == 27'd50_000_000) ||
+                    if ((r_tx_timer == SAMPLE_PERIOD) ||
                         (r_sw_changed && r_mode == 3'd2) ||
                         (w_uart_rx_valid && (r_mode == 3'd3 || r_mode == 3'd4))) begin
                         r_tx_timer <= 0;
@@ -488,7 +513,29 @@ module integrated_system (
 
                 TX_LOAD: begin
                     r_tx_idx <= 0;
+                    r_tx_crc <= 8'h00;
                     
+                    if (TX_BINARY) begin
+                        // Byte 15 (CRC) is produced in TX_SEND
+                        r_tx_buffer[0]  <= 8'hA5;
+                        r_tx_buffer[1]  <= {5'd0, r_mode};
+                        r_tx_buffer[2]  <= r_tx_seq;
+                        r_tx_buffer[3]  <= r_accel_x[7:0];
+                        r_tx_buffer[4]  <= r_accel_x[15:8];
+                        r_tx_buffer[5]  <= r_accel_y[7:0];
+                        r_tx_buffer[6]  <= r_accel_y[15:8];
+                        r_tx_buffer[7]  <= r_accel_z[7:0];
+                        r_tx_buffer[8]  <= r_accel_z[15:8];
+                        r_tx_buffer[9]  <= w_temp_data;
+                        r_tx_buffer[10] <= w_sw[7:0];
+                        r_tx_buffer[11] <= w_sw[15:8];
+                        r_tx_buffer[12] <= r_pc_led_data[7:0];
+                        r_tx_buffer[13] <= r_pc_led_data[15:8];
+                        r_tx_buffer[14] <= r_pc_last_rx;
+                        r_tx_buffer[15] <= 8'h00;
+                        r_tx_len <= 6'd16;
+                        r_tx_seq <= r_tx_seq + 1;
+                    end else
                     case (r_mode)
                         3'd0: begin
                             r_tx_buffer[0]  <= "M";
@@ -609,7 +656,13 @@ module integrated_system (
 
                 TX_SEND:  begin
                     if (! w_tx_busy && r_tx_len > 0) begin
-                        r_tx_data  <= r_tx_buffer[r_tx_idx];
+                        if (TX_BINARY && r_tx_idx == r_tx_len - 1)
+                            r_tx_data <= r_tx_crc;
+                        else
+                            r_tx_data <= r_tx_buffer[r_tx_idx];
+                        // CRC covers bytes 1..14 (not sync, not itself)
+                        if (r_tx_idx != 0)
+                            r_tx_crc <= crc8_update(r_tx_crc, r_tx_buffer[r_tx_idx]);
                         r_tx_start <= 1'b1;
                         r_tx_state <= TX_WAIT;
                     end else if (r_tx_len == 0) begin
@@ -0,0 +1,1186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FPGA Integrated System GUI
+FPGA Nexys A7-100T - UART 115200 baud
+
+Launched by `python uartserial.py` (or `uartserial.py gui`); headless
+commands live there and never import this module.
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import os
+import time
+
+from capture import CaptureWriter, ReplaySerial
+from dashboard import DASHBOARD_HOST, Dashboard, EngineBoard
+from fleetview import FleetWindow
+from hotplug import PortMonitor, Supervisor
+from latency import LatencyProbe
+from ledstream import MAX_RATE, PATTERNS, LedStreamer
+from metrics import METRICS_HOST, METRICS_PORT, REGISTRY, CallbackLag
+from render import AdaptiveInterval, WidgetCache
+from shmstate import ShmPublisher, shm_name
+from telemetry import BAUDRATE, FRAMES, RX_BYTES, BoardState, EventQueue, TelemetryEngine
+from txqueue import TxQueue
+from uartlog import LOG_CAPACITY, LogRing, spill_name
+
+try:
+    from samplestore import DEFAULT_CAPACITY as SAMPLE_CAPACITY, SampleStore
+except ImportError:  # numpy missing: no sample history
+    SampleStore = None
+try:
+    from plotview import PLOT_REFRESH_MS, HistoryPanel
+except ImportError:  # numpy missing: no history plots
+    HistoryPanel = None
+try:
+    from dsp import COUNTS_PER_G, RATE_ASCII, RATE_BINARY, AccelPipeline
+except ImportError:  # numpy missing: no derived accel channels
+    AccelPipeline = None
+
+
+REFRESH_RATE_MS = 100
+# Refresh backs off to this period while no field changes
+REFRESH_IDLE_MS = 800
+# RX handoff: drain at most DRAIN_BATCH events per tick, ~30 ticks/s
+DRAIN_INTERVAL_MS = 33
+DRAIN_BATCH = 500
+# Log: Text widget keeps only the newest LOG_VIEW_LINES lines, older records
+# stay in the LogRing (and in a spill file if LOG_SPILL_DIR is set)
+LOG_VIEW_LINES = 2000
+LOG_SPILL_DIR = None
+# Sample history: set to a file name to keep every sample on disk
+# (read back with samplestore.open_spill)
+SAMPLE_SPILL_PATH = None
+# Replay speed choices (multiplier, "max" = as fast as the parser runs)
+REPLAY_SPEEDS = ("1x", "10x", "100x", "max")
+# Stats tab redraw period (only while the tab is shown)
+STATS_REFRESH_MS = 1000
+# Publish the connected port in shared memory (shmstate.py) so other local
+# tools can read it while the GUI holds the port
+SHM_PUBLISH = True
+# Serve the connected board to browsers (dashboard.py) on this TCP port;
+# None to disable. LED commands from the page go through send_led_16bit
+DASHBOARD_SERVE_PORT = None
+
+# Tk-side metrics (the engine's own are in telemetry.py)
+DRAIN_SECONDS = REGISTRY.histogram("gui_drain_seconds", "Time in drain_rx() per tick")
+LOG_FLUSH_SECONDS = REGISTRY.histogram("gui_log_flush_seconds", "Time in flush_log() per tick")
+REFRESH_SECONDS = REGISTRY.histogram("gui_refresh_seconds", "Time in refresh_ui() per tick")
+PLOT_SECONDS = REGISTRY.histogram("gui_plot_seconds", "Time in refresh_plots() per redraw")
+LOG_RECORDS = REGISTRY.counter("gui_log_records_total", "Records added by log_msg()")
+DRAIN_LAG = REGISTRY.histogram("gui_drain_lag_seconds", "drain_rx() start minus its scheduled time")
+REFRESH_LAG = REGISTRY.histogram("gui_refresh_lag_seconds", "refresh_ui() start minus its scheduled time")
+
+
+class FPGAIntegratedGUI:
+    def __init__(self, root):
+        self.root = root
+        self.root. title("FPGA Nexys A7 - Integrated System")
+        self.root.geometry("850x960")
+        
+        # Serial - reader/parser run headless in TelemetryEngine, writes go
+        # through a TxQueue writer thread so a slow port never blocks Tk
+        self.engine = None
+        self.tx = None
+        self.streamer = None
+        self.pattern_tx = None      # (TxQueue, coalesced) when the pattern started
+        self.probe = None
+        self.publisher = None
+        self.dashboard = None
+        self.supervisor = None      # reopens the board if the port drops
+        
+        # Data - owned by the Tk thread, fed from rx_queue
+        self.state = BoardState()
+        self.rx_queue = EventQueue()
+        self.show_raw = False
+        self.samples = None
+        self.history = None         # plotview.HistoryPanel over self.samples
+        self.dsp = None             # AccelPipeline, made per connection
+        if SampleStore is not None:
+            self.samples = SampleStore(SAMPLE_CAPACITY, spill_path=SAMPLE_SPILL_PATH)
+        
+        # Render - only touch widgets whose displayed value changed
+        self.render = WidgetCache()
+        self.refresh_interval = AdaptiveInterval(REFRESH_RATE_MS, REFRESH_IDLE_MS)
+        self.shown_mode = None
+        self.shown_switch = None
+        
+        # Flag
+        self.updating_checkboxes = False
+        self.log_text = None  # Khởi tạo trước
+        
+        # Log records - widget is filled from here once per tick
+        spill = spill_name(LOG_SPILL_DIR) if LOG_SPILL_DIR else None
+        self.log = LogRing(LOG_CAPACITY, spill_path=spill)
+        self.log_live = True        # False while paging through older records
+        self.log_view_first = 0     # seq of the first record in log_text
+        self.log_view_lines = 0
+        self.ts_cache = (None, "")
+        
+        # Metrics - timers are observed in the callbacks, gauges read on export
+        self.drain_lag = CallbackLag(DRAIN_LAG)
+        self.refresh_lag = CallbackLag(REFRESH_LAG)
+        self.metrics_server = None
+        self.stats_last = None      # (t, rx bytes, frames) for the rates
+        REGISTRY.gauge_func("gui_rx_queue_depth", "Events waiting for drain_rx()",
+                            lambda: self.rx_queue.depth)
+        REGISTRY.gauge_func("gui_rx_queue_dropped", "Events dropped because the queue was full",
+                            lambda: self.rx_queue.dropped)
+        REGISTRY.gauge_func("gui_tx_queue_bytes", "Bytes waiting in the TX queue",
+                            lambda: self.tx.pending if self.tx else 0)
+        
+        # Port list is kept by a background thread (comports() can take
+        # tens of ms); changes arrive through rx_queue like RX events
+        self.port_monitor = PortMonitor()
+        self.port_monitor.subscribe("changed", lambda devices: self.rx_queue.put("ports", devices))
+        self.port_monitor.subscribe("added", lambda info: self.rx_queue.put("port_added", info.device))
+        self.port_monitor.subscribe("removed", lambda info: self.rx_queue.put("port_removed", info.device))
+        
+        # Build UI
+        self. build_ui()
+        self.port_monitor.start()
+        
+        # Start refresh
+        self.refresh_ui()
+        self.drain_rx()
+        self.update_stats()
+        if self.history is not None:
+            self.refresh_plots()
+
+    def build_ui(self):
+        main_frame = ttk.Frame(self. root, padding=5)
+        main_frame.pack(fill="both", expand=True)
+        
+        # Connection
+        self.build_connection_frame(main_frame)
+        
+        # Notebook
+        self.notebook = ttk. Notebook(main_frame)
+        self.notebook.pack(fill="both", expand=True, pady=5)
+        
+        # Tabs
+        self.tab_control = ttk.Frame(self. notebook)
+        self.notebook.add(self.tab_control, text="Control")
+        
+        self.tab_monitor = ttk.Frame(self.notebook)
+        self.notebook.add(self. tab_monitor, text="Monitor")
+        
+        self.tab_log = ttk.Frame(self.notebook)
+        self.notebook.add(self. tab_log, text="UART Log")
+        
+        self.tab_latency = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_latency, text="Latency")
+        
+        self.tab_stats = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_stats, text="Stats")
+        
+        # Build tabs - Log tab TRƯỚC để log_text tồn tại
+        self.build_log_tab()
+        self.build_control_tab()
+        self.build_monitor_tab()
+        self.build_latency_tab()
+        self.build_stats_tab()
+        
+        # Status bar
+        self. build_status_bar(main_frame)
+
+    def build_connection_frame(self, parent):
+        frame = ttk.LabelFrame(parent, text="UART Connection", padding=5)
+        frame.pack(fill="x", pady=(0, 5))
+        
+        ttk.Label(frame, text="Port:").pack(side="left", padx=(0, 5))
+        
+        self.port_var = tk.StringVar()
+        self.port_combo = ttk.Combobox(
+            frame,
+            textvariable=self.port_var,
+            width=15,
+            state="readonly"
+        )
+        self.port_combo.pack(side="left", padx=(0, 5))
+        
+        ttk. Button(frame, text="Refresh", command=self.refresh_ports_btn, width=8).pack(side="left", padx=(0, 10))
+        
+        self.btn_connect = ttk.Button(frame, text="Connect", command=self.toggle_connect, width=10)
+        self.btn_connect.pack(side="left", padx=(0, 10))
+        
+        ttk.Label(frame, text=f"Baud:  {BAUDRATE}").pack(side="left", padx=10)
+        
+        # Firmware built with TX_BINARY = 1 sends 16-byte frames
+        self.binary_var = tk.IntVar(value=0)
+        ttk.Checkbutton(frame, text="Binary frames", variable=self.binary_var).pack(side="left", padx=10)
+        
+        # Raw capture of the live port / replay of a capture file
+        self.btn_record = ttk.Button(frame, text="Record", command=self.toggle_record, width=8)
+        self.btn_record.pack(side="left", padx=(0, 5))
+        ttk.Button(frame, text="Replay...", command=self.replay_capture, width=9).pack(side="left", padx=(0, 5))
+        self.replay_speed_var = tk.StringVar(value=REPLAY_SPEEDS[0])
+        ttk.Combobox(frame, textvariable=self.replay_speed_var, values=REPLAY_SPEEDS,
+                     width=5, state="readonly").pack(side="left")
+        
+        # Many boards at once, in their own window
+        ttk.Button(frame, text="Fleet...", command=self.open_fleet, width=8).pack(side="left", padx=(10, 0))
+        
+        self.conn_label = ttk.Label(frame, text="●", foreground="gray", font=("Arial", 14))
+        self.conn_label.pack(side="right", padx=5)
+
+    def build_control_tab(self):
+        # Mode Display
+        frame_mode = ttk.LabelFrame(self.tab_control, text="Current Mode", padding=5)
+        frame_mode.pack(fill="x", padx=10, pady=5)
+        
+        mode_info = [
+            ("M0: Accel", "BTNU"),
+            ("M1: Temp", "BTNL"),
+            ("M2: SW->LED", "BTNR"),
+            ("M3: PC->LED", "BTND"),
+            ("M4: Combined", "BTNC")
+        ]
+        
+        self.mode_labels = []
+        mode_container = ttk.Frame(frame_mode)
+        mode_container.pack(fill="x", pady=5)
+        
+        for i, (name, btn) in enumerate(mode_info):
+            lbl = tk.Label(
+                mode_container,
+                text=f"{name}\n({btn})",
+                width=12,
+                height=3,
+                relief="groove",
+                bg="lightgray"
+            )
+            lbl.pack(side="left", padx=3, expand=True, fill="x")
+            self.mode_labels. append(lbl)
+
+        # LED Control
+        frame_led = ttk. LabelFrame(self.tab_control, text="LED Control (PC -> FPGA)", padding=5)
+        frame_led.pack(fill="x", padx=10, pady=5)
+        
+        # Hex input
+        row1 = ttk. Frame(frame_led)
+        row1.pack(fill="x", pady=5)
+        
+        ttk. Label(row1, text="Hex (0000-FFFF):").pack(side="left")
+        self.led_entry = ttk.Entry(row1, width=10, font=("Consolas", 12))
+        self.led_entry.insert(0, "0000")
+        self.led_entry. pack(side="left", padx=5)
+        self.led_entry. bind("<Return>", lambda e: self.send_led_hex())
+        
+        ttk.Button(row1, text="Send", command=self.send_led_hex, width=8).pack(side="left", padx=5)
+        
+        # Quick buttons
+        row2 = ttk.Frame(frame_led)
+        row2.pack(fill="x", pady=5)
+        
+        ttk.Label(row2, text="Quick:").pack(side="left")
+        quick_vals = [
+            ("OFF", 0x0000),
+            ("Low8", 0x00FF),
+            ("High8", 0xFF00),
+            ("Alt1", 0x5555),
+            ("Alt2", 0xAAAA),
+            ("ALL", 0xFFFF)
+        ]
+        for name, val in quick_vals:
+            btn = ttk.Button(row2, text=name, width=6)
+            btn.config(command=lambda v=val: self. send_led_16bit(v))
+            btn.pack(side="left", padx=2)
+
+        # LED Checkboxes
+        frame_cbs = ttk.LabelFrame(frame_led, text="Individual LEDs", padding=5)
+        frame_cbs.pack(fill="x", pady=5)
+        
+        self.led_vars = []
+        
+        # Row 1: LED 0-7
+        row_led1 = ttk. Frame(frame_cbs)
+        row_led1.pack(fill="x", pady=2)
+        ttk.Label(row_led1, text="LED 0-7:", width=10).pack(side="left")
+        for i in range(8):
+            var = tk.IntVar(value=0)
+            self.led_vars.append(var)
+            cb = ttk. Checkbutton(row_led1, text=str(i), variable=var, command=self.on_checkbox_click)
+            cb.pack(side="left", padx=5)
+        
+        # Row 2: LED 8-15
+        row_led2 = ttk.Frame(frame_cbs)
+        row_led2.pack(fill="x", pady=2)
+        ttk. Label(row_led2, text="LED 8-15:", width=10).pack(side="left")
+        for i in range(8, 16):
+            var = tk.IntVar(value=0)
+            self.led_vars.append(var)
+            cb = ttk. Checkbutton(row_led2, text=str(i), variable=var, command=self.on_checkbox_click)
+            cb.pack(side="left", padx=5)
+        
+        # Current value
+        self.led_value_label = ttk.Label(frame_led, text="Current: 0x0000", font=("Consolas", 12))
+        self.led_value_label.pack(pady=5)
+
+        # Raw Send
+        frame_raw = ttk.LabelFrame(self.tab_control, text="Raw UART Send", padding=5)
+        frame_raw.pack(fill="x", padx=10, pady=5)
+        
+        self.raw_entry = ttk.Entry(frame_raw, width=40, font=("Consolas", 10))
+        self.raw_entry.pack(side="left", padx=5, pady=5)
+        self.raw_entry.bind("<Return>", lambda e: self.send_raw_ascii())
+        
+        ttk.Button(frame_raw, text="Send ASCII", command=self. send_raw_ascii).pack(side="left", padx=3)
+        ttk.Button(frame_raw, text="Send HEX", command=self.send_raw_hex).pack(side="left", padx=3)
+
+        # LED Pattern
+        frame_pat = ttk.LabelFrame(self.tab_control, text="LED Pattern (mode 3)", padding=5)
+        frame_pat.pack(fill="x", padx=10, pady=5)
+        
+        self.pattern_var = tk.StringVar(value="bounce")
+        ttk.Combobox(frame_pat, textvariable=self.pattern_var, values=list(PATTERNS),
+                     width=10, state="readonly").pack(side="left", padx=5)
+        ttk.Label(frame_pat, text="Frames/s:").pack(side="left")
+        self.pattern_rate_var = tk.StringVar(value="50")
+        ttk.Entry(frame_pat, textvariable=self.pattern_rate_var, width=7).pack(side="left", padx=5)
+        self.btn_pattern = ttk.Button(frame_pat, text="Start", command=self.toggle_pattern, width=8)
+        self.btn_pattern.pack(side="left", padx=5)
+        self.pattern_result_var = tk.StringVar(value="")
+        ttk.Label(frame_pat, textvariable=self.pattern_result_var).pack(side="left", padx=5)
+
+    def build_monitor_tab(self):
+        # Accelerometer
+        frame_accel = ttk.LabelFrame(self.tab_monitor, text="Accelerometer ADXL362", padding=10)
+        frame_accel.pack(fill="x", padx=10, pady=5)
+        
+        accel_row = ttk.Frame(frame_accel)
+        accel_row.pack(pady=10)
+        
+        # X
+        x_frame = ttk.Frame(accel_row)
+        x_frame.pack(side="left", padx=30)
+        ttk.Label(x_frame, text="X", font=("Arial", 12, "bold")).pack()
+        self.accel_x_label = ttk.Label(x_frame, text="+000", font=("Consolas", 24, "bold"), foreground="red")
+        self.accel_x_label.pack()
+        
+        # Y
+        y_frame = ttk. Frame(accel_row)
+        y_frame.pack(side="left", padx=30)
+        ttk.Label(y_frame, text="Y", font=("Arial", 12, "bold")).pack()
+        self.accel_y_label = ttk.Label(y_frame, text="+000", font=("Consolas", 24, "bold"), foreground="green")
+        self.accel_y_label.pack()
+        
+        # Z
+        z_frame = ttk.Frame(accel_row)
+        z_frame.pack(side="left", padx=30)
+        ttk.Label(z_frame, text="Z", font=("Arial", 12, "bold")).pack()
+        self.accel_z_label = ttk. Label(z_frame, text="+000", font=("Consolas", 24, "bold"), foreground="blue")
+        self.accel_z_label. pack()
+        
+        # Derived channels (dsp.AccelPipeline)
+        self.accel_dsp_label = ttk.Label(frame_accel, text="", font=("Consolas", 11))
+        self.accel_dsp_label.pack()
+
+        # Temperature
+        frame_temp = ttk.LabelFrame(self. tab_monitor, text="Temperature ADT7420", padding=10)
+        frame_temp.pack(fill="x", padx=10, pady=5)
+        
+        self.temp_label = ttk.Label(frame_temp, text="--.-°C", font=("Consolas", 32, "bold"))
+        self.temp_label.pack(pady=10)
+
+        # Switch Status
+        frame_sw = ttk.LabelFrame(self. tab_monitor, text="Switch Status SW[15: 0]", padding=10)
+        frame_sw.pack(fill="x", padx=10, pady=5)
+        
+        self.sw_hex_label = ttk.Label(frame_sw, text="SW:  0x0000", font=("Consolas", 18, "bold"))
+        self.sw_hex_label.pack(pady=5)
+        
+        sw_row = ttk.Frame(frame_sw)
+        sw_row.pack(pady=5)
+        
+        self.sw_indicators = []
+        for i in range(15, -1, -1):
+            lbl = tk.Label(sw_row, text=str(i), width=3, height=2, relief="groove", bg="gray", font=("Arial", 8))
+            lbl.pack(side="left", padx=1)
+            self.sw_indicators.append(lbl)
+        
+        self.sw_binary_label = ttk.Label(frame_sw, text="0000_0000_0000_0000", font=("Consolas", 12))
+        self.sw_binary_label.pack(pady=5)
+
+        # PC LED Status
+        frame_pc = ttk.LabelFrame(self. tab_monitor, text="PC LED Status", padding=10)
+        frame_pc. pack(fill="x", padx=10, pady=5)
+        
+        self.pc_led_label = ttk. Label(frame_pc, text="PC LED: 0x0000", font=("Consolas", 18, "bold"))
+        self.pc_led_label. pack(pady=10)
+
+        # History plots (decimated per pixel column, see plotview.py)
+        if HistoryPanel is not None and self.samples is not None:
+            self.history = HistoryPanel(self.tab_monitor, self.samples)
+            self.history.pack(fill="x", padx=10, pady=5)
+
+    def build_latency_tab(self):
+        ctrl_frame = ttk.Frame(self.tab_latency)
+        ctrl_frame.pack(fill="x", padx=10, pady=5)
+        
+        ttk.Label(ctrl_frame, text="Mode 3 echo RTT.  Interval (ms):").pack(side="left")
+        self.probe_interval_var = tk.StringVar(value="10")
+        ttk.Entry(ctrl_frame, textvariable=self.probe_interval_var, width=6).pack(side="left", padx=5)
+        self.btn_probe = ttk.Button(ctrl_frame, text="Start", command=self.toggle_probe, width=8)
+        self.btn_probe.pack(side="left", padx=5)
+        
+        self.probe_text = tk.Text(self.tab_latency, height=20, font=("Consolas", 10), state="disabled")
+        self.probe_text.pack(fill="both", expand=True, padx=10, pady=5)
+
+    def build_stats_tab(self):
+        ctrl_frame = ttk.Frame(self.tab_stats)
+        ctrl_frame.pack(fill="x", padx=10, pady=5)
+        
+        ttk.Button(ctrl_frame, text="Dump...", command=self.dump_metrics).pack(side="left", padx=5)
+        self.serve_metrics_var = tk.IntVar(value=0)
+        ttk.Checkbutton(ctrl_frame, text=f"Serve http://{METRICS_HOST}:{METRICS_PORT}/metrics",
+                        variable=self.serve_metrics_var, command=self.toggle_metrics_server).pack(side="left", padx=10)
+        
+        self.stats_text = tk.Text(self.tab_stats, height=20, font=("Consolas", 10), state="disabled")
+        self.stats_text.pack(fill="both", expand=True, padx=10, pady=5)
+
+    def build_log_tab(self):
+        # Controls
+        ctrl_frame = ttk.Frame(self. tab_log)
+        ctrl_frame. pack(fill="x", padx=10, pady=5)
+        
+        ttk.Button(ctrl_frame, text="Clear", command=self.clear_log).pack(side="left", padx=5)
+        ttk.Button(ctrl_frame, text="Older", command=self.log_page_older).pack(side="left", padx=5)
+        ttk.Button(ctrl_frame, text="Newer", command=self.log_page_newer).pack(side="left", padx=5)
+        ttk.Button(ctrl_frame, text="Live", command=self.log_go_live).pack(side="left", padx=5)
+        
+        self.autoscroll_var = tk.IntVar(value=1)
+        ttk.Checkbutton(ctrl_frame, text="Auto-scroll", variable=self. autoscroll_var).pack(side="left", padx=10)
+        
+        self.show_raw_var = tk.IntVar(value=0)
+        ttk.Checkbutton(ctrl_frame, text="Show Raw", variable=self.show_raw_var,
+                        command=self.on_show_raw).pack(side="left", padx=10)
+        
+        # Log text
+        log_frame = ttk.Frame(self.tab_log)
+        log_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        self.log_text = tk.Text(log_frame, height=15, font=("Consolas", 10), state="disabled")
+        self.log_text.pack(side="left", fill="both", expand=True)
+        
+        scrollbar = ttk. Scrollbar(log_frame, command=self.log_text.yview)
+        scrollbar. pack(side="right", fill="y")
+        self.log_text.config(yscrollcommand=scrollbar.set)
+        
+        # Tags
+        self.log_text.tag_configure("tx", foreground="blue")
+        self.log_text.tag_configure("rx", foreground="green")
+        self.log_text.tag_configure("error", foreground="red")
+        self.log_text.tag_configure("info", foreground="gray")
+
+    def build_status_bar(self, parent):
+        status_frame = ttk.Frame(parent)
+        status_frame.pack(fill="x", pady=(5, 0))
+        
+        self. status_var = tk.StringVar(value="Disconnected")
+        ttk.Label(status_frame, textvariable=self. status_var, relief="sunken").pack(side="left", fill="x", expand=True)
+        
+        self. rx_count_var = tk.StringVar(value="RX: 0")
+        ttk. Label(status_frame, textvariable=self.rx_count_var, relief="sunken", width=12).pack(side="right")
+        
+        self.tx_count_var = tk. StringVar(value="TX: 0")
+        ttk. Label(status_frame, textvariable=self.tx_count_var, relief="sunken", width=12).pack(side="right")
+        
+        self.queue_var = tk.StringVar(value="Q: 0")
+        ttk.Label(status_frame, textvariable=self.queue_var, relief="sunken", width=32).pack(side="right")
+
+    # ========================================================================
+    # Port Management
+    # ========================================================================
+    def open_fleet(self):
+        FleetWindow(self.root, binary=bool(self.binary_var.get()))
+
+    def refresh_ports_btn(self):
+        # The monitor rescans on its thread; the list arrives as a "ports" event
+        self.port_monitor.refresh()
+        self.log_msg("Rescanning ports", "info")
+
+    def update_ports(self, devices):
+        self.port_combo["values"] = devices
+        if self.port_var.get() not in devices and not self.engine:
+            self.port_var.set(devices[0] if devices else "")
+
+    # ========================================================================
+    # Connection
+    # ========================================================================
+    def toggle_connect(self):
+        if self.engine: 
+            self.disconnect()
+        else:
+            self.connect()
+
+    def connect(self):
+        port = self.port_var.get()
+        if not port: 
+            messagebox.showerror("Error", "Select a COM port")
+            return
+        engine = TelemetryEngine(port, BAUDRATE, binary=bool(self.binary_var.get()))
+        self.supervisor = Supervisor(engine, self.port_monitor)
+        self.open_engine(engine, port)
+        if not self.engine:
+            self.supervisor.detach()
+            self.supervisor = None
+
+    def open_engine(self, engine, name):
+        try: 
+            engine.subscribe("raw", self.on_rx_raw)
+            engine.subscribe("line", self.on_rx_line)
+            engine.subscribe("frame", self.on_rx_frame)
+            engine.subscribe("error", self.on_rx_error)
+            engine.subscribe("lost", self.on_rx_lost)
+            engine.subscribe("restored", self.on_rx_restored)
+            engine.open()
+            self.engine = engine
+            self.tx = TxQueue(engine.write, on_error=self.on_tx_error).start()
+            if SHM_PUBLISH and engine.port:
+                self.start_publisher(engine)
+            if DASHBOARD_SERVE_PORT is not None and SampleStore is not None:
+                self.start_dashboard(engine, name)
+            if AccelPipeline is not None:
+                binary = engine.decoder is not None
+                self.dsp = AccelPipeline(rate=RATE_BINARY if binary else RATE_ASCII,
+                                         fft_size=256 if binary else 32)
+            
+            self.btn_connect.config(text="Disconnect")
+            self.conn_label.config(foreground="green")
+            self.status_var.set(f"Connected:  {name}")
+            self.log_msg(f"Connected to {name}", "info")
+            
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            self.log_msg(f"Error:  {e}", "error")
+
+    def disconnect(self):
+        if self.engine:
+            if self.probe:
+                self.toggle_probe()
+            if self.streamer:
+                self.streamer.stop(timeout=0.5)
+            if self.tx:
+                self.tx.stop(flush=True, timeout=0.5)
+                self.tx = None
+            self.engine.close()
+            self.stop_record()
+            if self.supervisor:
+                self.supervisor.detach()
+                self.supervisor = None
+            if self.publisher:
+                self.publisher.close()
+                self.publisher = None
+            if self.dashboard:
+                self.dashboard.stop()
+                for board in self.dashboard.boards.values():
+                    board.detach()
+                self.dashboard = None
+            self.engine = None
+        
+        self.btn_connect.config(text="Connect")
+        self.conn_label.config(foreground="gray")
+        self.status_var.set("Disconnected")
+        self.log_msg("Disconnected", "info")
+
+    def start_publisher(self, engine):
+        # Runs on the reader thread once attached; a failure only costs sharing
+        name = shm_name(engine.port)
+        try:
+            self.publisher = ShmPublisher(name).attach(engine)
+        except (OSError, ValueError) as e:
+            self.log_msg(f"Shared memory {name} not published: {e}", "error")
+            return
+        self.log_msg(f"Publishing state as {name}", "info")
+
+    def start_dashboard(self, engine, name):
+        # Browser LED commands arrive on the server thread; queue them for
+        # the Tk thread so they take the same path as the LED buttons
+        board = EngineBoard(os.path.basename(name) or "board", engine,
+                            lambda value: self.rx_queue.put("led", value))
+        try:
+            self.dashboard = Dashboard([board], port=DASHBOARD_SERVE_PORT).start()
+        except OSError as e:
+            board.detach()
+            self.log_msg(f"Dashboard not started: {e}", "error")
+            return
+        self.log_msg(f"Dashboard on http://{DASHBOARD_HOST}:{self.dashboard.port}/", "info")
+
+    # ========================================================================
+    # Capture / Replay
+    # ========================================================================
+    def toggle_record(self):
+        if self.engine and self.engine.capture:
+            self.stop_record()
+            return
+        if not self.engine:
+            messagebox.showwarning("Warning", "Not connected")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".cap",
+            initialfile=time.strftime("uart_%Y%m%d_%H%M%S.cap"),
+            filetypes=[("UART capture", "*.cap"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.engine.capture = CaptureWriter(path, binary=self.engine.decoder is not None)
+        except OSError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.btn_record.config(text="Stop rec")
+        self.log_msg(f"Recording to {path}", "info")
+
+    def stop_record(self):
+        engine = self.engine
+        if not engine or not engine.capture:
+            return
+        capture = engine.capture
+        engine.capture = None
+        capture.close()
+        self.btn_record.config(text="Record")
+        self.log_msg(f"Recorded {capture.records} chunks, {capture.bytes} bytes", "info")
+
+    def replay_capture(self):
+        if self.engine:
+            self.disconnect()
+        path = filedialog.askopenfilename(
+            filetypes=[("UART capture", "*.cap"), ("All files", "*.*")])
+        if not path:
+            return
+        speed = self.replay_speed_var.get()
+        try:
+            ser = ReplaySerial(path, speed=None if speed == "max" else float(speed.rstrip("x")))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.open_engine(TelemetryEngine(ser=ser, binary=ser.binary), f"replay {path} ({speed})")
+
+    # ========================================================================
+    # TX Functions
+    # ========================================================================
+    def send_led_16bit(self, value):
+        if not self.engine:
+            messagebox.showwarning("Warning", "Not connected")
+            return
+            
+        value = value & 0xFFFF
+        low_byte = value & 0xFF
+        high_byte = (value >> 8) & 0xFF
+        
+        # Queued; a newer value replaces one that has not been sent yet
+        self.tx.set_leds(value)
+        
+        self.state.pc_led_value = value
+        self. update_led_display()
+        self.log_msg(f"TX -> 0x{value: 04X} [0x{low_byte:02X}, 0x{high_byte:02X}]", "tx")
+
+    def send_led_hex(self):
+        try:
+            text = self.led_entry. get().strip().upper().replace("0X", "")
+            value = int(text, 16)
+            if value < 0 or value > 0xFFFF: 
+                raise ValueError("Out of range")
+            self.send_led_16bit(value)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid HEX\n{e}")
+
+    def on_checkbox_click(self):
+        if self. updating_checkboxes:
+            return
+            
+        value = 0
+        for i, var in enumerate(self. led_vars):
+            if var.get():
+                value |= (1 << i)
+        
+        self.led_entry.delete(0, tk.END)
+        self.led_entry.insert(0, f"{value:04X}")
+        self.send_led_16bit(value)
+
+    def update_led_display(self):
+        value = self.state.pc_led_value
+        self.led_value_label.config(text=f"Current: 0x{value:04X}")
+        self.pc_led_label.config(text=f"PC LED: 0x{value:04X}")
+        
+        self.updating_checkboxes = True
+        for i, var in enumerate(self.led_vars):
+            var.set(1 if (value & (1 << i)) else 0)
+        self.updating_checkboxes = False
+
+    def toggle_probe(self):
+        if self.probe:
+            self.probe.stop()
+            self.show_probe_report(self.probe)
+            self.probe = None
+            self.btn_probe.config(text="Start")
+            return
+        if not self.engine:
+            messagebox.showwarning("Warning", "Not connected")
+            return
+        try:
+            interval = float(self.probe_interval_var.get()) / 1000.0
+        except ValueError:
+            messagebox.showerror("Error", "Invalid interval")
+            return
+        if self.state.current_mode != 3:
+            self.log_msg("Latency probe: board is not in mode 3 (press BTND)", "error")
+        # Pings queue behind other TX like real commands do
+        self.probe = LatencyProbe(self.engine, write=self.tx.send, interval=interval).start()
+        self.btn_probe.config(text="Stop")
+        self.update_probe_report()
+
+    def update_probe_report(self):
+        # Once a second while the probe runs
+        if self.probe is None:
+            return
+        self.show_probe_report(self.probe)
+        self.root.after(1000, self.update_probe_report)
+
+    def show_probe_report(self, probe):
+        self.probe_text.config(state="normal")
+        self.probe_text.delete("1.0", tk.END)
+        self.probe_text.insert("1.0", probe.report())
+        self.probe_text.config(state="disabled")
+
+    def toggle_pattern(self):
+        if self.streamer:
+            self.streamer.stop(timeout=0.5)
+            return
+        if not self.engine:
+            messagebox.showwarning("Warning", "Not connected")
+            return
+        try:
+            rate = float(self.pattern_rate_var.get())
+            # Through the TX queue like the LED entry: one writer per port
+            streamer = LedStreamer(self.tx.write_leds, rate)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid rate\n{e}")
+            return
+        if rate > MAX_RATE:
+            self.log_msg(f"Pattern rate {rate:g}/s is above the {MAX_RATE:.0f} frames/s the line "
+                         "carries, extra frames will be coalesced", "error")
+        frames = PATTERNS[self.pattern_var.get()](int(rate * 10))
+        self.streamer = streamer
+        # write_leds() only queues; frames replaced before the writer got to
+        # them show up as TX coalesced, not as frames on the wire
+        self.pattern_tx = (self.tx, self.tx.coalesced)
+        self.btn_pattern.config(text="Stop")
+        self.log_msg(f"Pattern {self.pattern_var.get()} at {rate:g} frames/s", "info")
+        # Report comes back on the streamer thread, hand it over like RX events
+        streamer.start(frames, repeat=1_000_000, on_done=lambda r: self.rx_queue.put("pattern", r))
+
+    def on_pattern_done(self, result):
+        self.streamer = None
+        self.btn_pattern.config(text="Start")
+        tx, coalesced = self.pattern_tx
+        coalesced = tx.coalesced - coalesced
+        sent = max(result["frames"] - coalesced, 0)
+        rate = sent / result["seconds"] if result["seconds"] > 0 else 0.0
+        text = f"{sent} frames, {rate:.1f}/s"
+        if coalesced:
+            text += f" ({coalesced} of {result['frames']} coalesced)"
+        if "late_p99_ms" in result:
+            text += f", late p50 {result['late_p50_ms']:.2f} ms p99 {result['late_p99_ms']:.2f} ms"
+        self.pattern_result_var.set(text)
+        self.log_msg(f"Pattern done: {text}", "info")
+
+    def send_raw_ascii(self):
+        if not self.engine:
+            return
+        text = self.raw_entry.get()
+        if not text:
+            return
+        try:
+            data = text.encode('ascii')
+            if not self.tx.send(data):
+                raise OverflowError("TX queue full")
+            self.log_msg(f"TX -> '{text}'", "tx")
+        except Exception as e:
+            self. log_msg(f"Error: {e}", "error")
+
+    def send_raw_hex(self):
+        if not self.engine:
+            return
+        hex_str = self.raw_entry.get().replace(" ", "").replace("0x", "").replace("0X", "")
+        if not hex_str:
+            return
+        try: 
+            data = bytes.fromhex(hex_str)
+            if not self.tx.send(data):
+                raise OverflowError("TX queue full")
+            self.log_msg(f"TX HEX -> {data.hex().upper()}", "tx")
+        except Exception as e:
+            self.log_msg(f"Error:  {e}", "error")
+
+    # ========================================================================
+    # RX Callbacks (engine reader thread - only touch rx_queue here)
+    # ========================================================================
+    def on_rx_raw(self, data, t_rx):
+        if self.show_raw:
+            self.rx_queue.put("raw", data)
+
+    def on_rx_line(self, line):
+        self.rx_queue.put("line", line)
+
+    def on_rx_frame(self, frame):
+        self.rx_queue.put("frame", frame)
+
+    def on_tx_error(self, exc):
+        # TxQueue writer thread, same handoff as the reader
+        self.rx_queue.put("tx_error", str(exc))
+
+    def on_rx_error(self, exc):
+        self.rx_queue.put("error", str(exc))
+
+    def on_rx_lost(self, exc):
+        self.rx_queue.put("lost", str(exc))
+
+    def on_rx_restored(self, port):
+        self.rx_queue.put("restored", port)
+
+    def on_show_raw(self):
+        self.show_raw = bool(self.show_raw_var.get())
+
+    # ========================================================================
+    # RX Drain (Tk thread)
+    # ========================================================================
+    def drain_rx(self):
+        self.drain_lag.tick()
+        t_start = time.perf_counter()
+        accel = []
+        for kind, payload in self.rx_queue.drain(DRAIN_BATCH):
+            if kind == "frame":
+                fields = payload.fields
+                self.state.apply(payload.mode, fields)
+                if self.samples is not None:
+                    self.samples.append_frame(payload)
+                if "accel_z" in fields:
+                    accel.append((fields["accel_x"], fields["accel_y"], fields["accel_z"]))
+                if self.probe is not None:
+                    self.probe.mark_ui(payload)
+            elif kind == "line":
+                self.log_msg(f"RX <- {payload}", "rx")
+            elif kind == "raw":
+                self.log_msg(f"RX RAW <- [{payload.hex().upper()}]", "rx")
+            elif kind == "error":
+                self.log_msg(f"RX Error: {payload}", "error")
+            elif kind == "tx_error":
+                self.log_msg(f"TX Error: {payload}", "error")
+            elif kind == "pattern":
+                self.on_pattern_done(payload)
+            elif kind == "led":
+                if self.engine:
+                    self.send_led_16bit(payload)
+            elif kind == "lost":
+                self.conn_label.config(foreground="orange")
+                self.status_var.set(f"Reconnecting:  {self.engine.port if self.engine else ''}")
+                self.log_msg(f"Connection lost ({payload}), waiting for the board", "error")
+            elif kind == "restored":
+                self.conn_label.config(foreground="green")
+                self.status_var.set(f"Connected:  {payload}")
+                gap = self.supervisor.last_gap if self.supervisor else None
+                self.log_msg(f"Reconnected to {payload}" + (f" after {gap:.2f} s" if gap else ""), "info")
+            elif kind == "ports":
+                self.update_ports(payload)
+            elif kind == "port_added":
+                self.log_msg(f"Port added: {payload}", "info")
+            elif kind == "port_removed":
+                self.log_msg(f"Port removed: {payload}", "info")
+        
+        # One DSP block per tick instead of per-sample math
+        if accel and self.dsp is not None:
+            self.dsp.process(accel)
+        
+        self.update_rx_count()
+        t_flush = time.perf_counter()
+        self.flush_log()
+        t_end = time.perf_counter()
+        LOG_FLUSH_SECONDS.observe(t_end - t_flush)
+        DRAIN_SECONDS.observe(t_end - t_start)
+        self.drain_lag.expect(DRAIN_INTERVAL_MS)
+        self.root.after(DRAIN_INTERVAL_MS, self.drain_rx)
+
+    def update_rx_count(self):
+        if self.engine:
+            self.render.set_var(self.rx_count_var, f"RX:  {self.engine.state.rx_count}")
+            self.render.set_var(self.tx_count_var, f"TX: {self.engine.state.tx_count}")
+        
+        q = self.rx_queue
+        text = f"Q: {q.depth} drop {q.dropped}"
+        if self.tx:
+            text += f" | TX merged {self.tx.coalesced}"
+        self.render.set_var(self.queue_var, text)
+
+    # ========================================================================
+    # UI Refresh
+    # ========================================================================
+    def refresh_ui(self):
+        self.refresh_lag.tick()
+        t_start = time.perf_counter()
+        dirty = self.state.take_dirty()
+        
+        if "current_mode" in dirty:
+            self.update_mode_display()
+        if dirty & {"accel_x", "accel_y", "accel_z"}:
+            self.update_accel_display()
+        if "temperature" in dirty:
+            self.update_temp_display()
+        if "switch_value" in dirty:
+            self.update_switch_display()
+        
+        REFRESH_SECONDS.observe(time.perf_counter() - t_start)
+        delay = self.refresh_interval.next(bool(dirty))
+        self.refresh_lag.expect(delay)
+        self.root.after(delay, self.refresh_ui)
+
+    def update_mode_display(self):
+        colors = ["#FFCCCC", "#CCFFCC", "#CCCCFF", "#FFFFCC", "#CCFFFF"]
+        mode = self.state.current_mode
+        
+        # Only the previously lit and the newly lit label change
+        if self.shown_mode is None:
+            changed = range(len(self.mode_labels))
+        else:
+            changed = (self.shown_mode, mode)
+        for i in changed:
+            if not 0 <= i < len(self.mode_labels):
+                continue
+            if i == mode:
+                self.render.config(self.mode_labels[i], relief="raised", bg=colors[i])
+            else: 
+                self.render.config(self.mode_labels[i], relief="groove", bg="lightgray")
+        self.shown_mode = mode
+
+    def update_accel_display(self):
+        self.render.config(self.accel_x_label, text=f"{self.state.accel_x:+4d}")
+        self.render.config(self.accel_y_label, text=f"{self.state.accel_y:+4d}")
+        self.render.config(self.accel_z_label, text=f"{self.state.accel_z:+4d}")
+        
+        if self.dsp is not None and self.dsp.last is not None:
+            last = self.dsp.last
+            text = (f"|a| {last['mag_avg'][-1] / COUNTS_PER_G:.3f} g   pitch {last['pitch'][-1]:+5.1f}°   "
+                    f"roll {last['roll'][-1]:+5.1f}°   σ|a| {self.dsp.stats.std[3]:6.1f}")
+            peak = self.dsp.spectrum.peak()
+            if peak is not None:
+                text += f"   peak {peak[0]:.2f} Hz"
+            self.render.config(self.accel_dsp_label, text=text)
+
+    def update_temp_display(self):
+        self.render.config(self.temp_label, text=f"{self.state.temperature:.2f}°C")
+
+    def update_switch_display(self):
+        switch_value = self.state.switch_value
+        self.render.config(self.sw_hex_label, text=f"SW: 0x{switch_value:04X}")
+        
+        binary = f"{switch_value:016b}"
+        binary_fmt = f"{binary[0:4]}_{binary[4:8]}_{binary[8:12]}_{binary[12:16]}"
+        self.render.config(self.sw_binary_label, text=binary_fmt)
+        
+        # Bit-diff against what is on screen, repaint only flipped bits
+        if self.shown_switch is None:
+            flipped = 0xFFFF
+        else:
+            flipped = (switch_value ^ self.shown_switch) & 0xFFFF
+        while flipped:
+            bit_pos = flipped.bit_length() - 1
+            flipped &= ~(1 << bit_pos)
+            lbl = self.sw_indicators[15 - bit_pos]
+            lbl.config(bg="lime" if switch_value & (1 << bit_pos) else "gray")
+        self.shown_switch = switch_value
+
+    def refresh_plots(self):
+        # Fixed ~60 fps tick; redraws only when samples arrived (or on resize)
+        self.root.after(PLOT_REFRESH_MS, self.refresh_plots)
+        if self.notebook.select() != str(self.tab_monitor):
+            return
+        t_start = time.perf_counter()
+        if self.history.refresh():
+            PLOT_SECONDS.observe(time.perf_counter() - t_start)
+
+    # ========================================================================
+    # Stats
+    # ========================================================================
+    def update_stats(self):
+        self.root.after(STATS_REFRESH_MS, self.update_stats)
+        now = time.monotonic()
+        rx_bytes = RX_BYTES.value
+        frames = sum(c.value for c in FRAMES.children.values())
+        last = self.stats_last
+        self.stats_last = (now, rx_bytes, frames)
+        if last is None or self.notebook.select() != str(self.tab_stats):
+            return
+        dt = now - last[0]
+        lines = [f"rx bytes/s {(rx_bytes - last[1]) / dt:10.1f}    frames/s {(frames - last[2]) / dt:8.1f}", ""]
+        for name, value in REGISTRY.snapshot().items():
+            if isinstance(value, dict):
+                if not value["count"]:
+                    continue
+                lines.append(f"{name:36s} n={value['count']:<8d} mean {value['mean'] * 1e3:8.3f} ms  "
+                             f"p50 <= {value['p50'] * 1e3:g} ms  p99 <= {value['p99'] * 1e3:g} ms  "
+                             f"max {value['max'] * 1e3:.3f} ms")
+            else:
+                lines.append(f"{name:36s} {value:g}" if isinstance(value, float) else f"{name:36s} {value}")
+        self.stats_text.config(state="normal")
+        self.stats_text.delete("1.0", tk.END)
+        self.stats_text.insert("1.0", "\n".join(lines))
+        self.stats_text.config(state="disabled")
+
+    def dump_metrics(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".prom",
+            initialfile="uart_metrics.prom",
+            filetypes=[("Prometheus text", "*.prom"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            REGISTRY.dump(path)
+        except OSError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.log_msg(f"Metrics written to {path}", "info")
+
+    def toggle_metrics_server(self):
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+            self.metrics_server = None
+            self.log_msg("Metrics endpoint stopped", "info")
+        if not self.serve_metrics_var.get():
+            return
+        try:
+            self.metrics_server = REGISTRY.serve(METRICS_PORT)
+        except OSError as e:
+            self.serve_metrics_var.set(0)
+            messagebox.showerror("Error", f"Cannot listen on {METRICS_HOST}:{METRICS_PORT}\n{e}")
+            return
+        self.log_msg(f"Serving metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics", "info")
+
+    # ========================================================================
+    # Log
+    # ========================================================================
+    def log_msg(self, msg, tag="info"):
+        # Cheap: record only, the widget is updated in flush_log()
+        self.log.append(tag, msg)
+        LOG_RECORDS.value += 1
+
+    def format_ts(self, ts):
+        sec = int(ts)
+        if self.ts_cache[0] != sec:
+            self.ts_cache = (sec, time.strftime("[%H:%M:%S] ", time.localtime(sec)))
+        return self.ts_cache[1]
+
+    def render_records(self, records):
+        # One Text.insert() call with alternating (chars, tags) pairs
+        args = []
+        for ts, tag, msg in records:
+            args.append(self.format_ts(ts))
+            args.append("info")
+            args.append(msg + "\n")
+            args.append(tag)
+        return args
+
+    def flush_log(self):
+        pending = self.log.take_pending()
+        self.log.flush()
+        if self.log_text is None or not pending or not self.log_live:
+            return
+        
+        # A burst larger than the window only needs its tail
+        if len(pending) > LOG_VIEW_LINES:
+            self.show_log_range(self.log.seq - LOG_VIEW_LINES, self.log.seq)
+            return
+            
+        self.log_text.config(state="normal")
+        self.log_text.insert("end", *self.render_records(pending))
+        self.log_view_lines += len(pending)
+        
+        # Trim in bulk from the top
+        excess = self.log_view_lines - LOG_VIEW_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_view_lines -= excess
+            self.log_view_first += excess
+        
+        if self.autoscroll_var.get():
+            self.log_text.see("end")
+            
+        self.log_text.config(state="disabled")
+
+    def show_log_range(self, start, stop):
+        start = max(start, self.log.first_seq)
+        records = self.log.page(start, stop)
+        
+        self.log_text.config(state="normal")
+        self.log_text.delete("1.0", "end")
+        if records:
+            self.log_text.insert("end", *self.render_records(records))
+        self.log_text.config(state="disabled")
+        
+        self.log_view_first = start
+        self.log_view_lines = len(records)
+        if self.log_live and self.autoscroll_var.get():
+            self.log_text.see("end")
+        else:
+            self.log_text.see("1.0")
+
+    def log_page_older(self):
+        if self.log_text is None or self.log_view_first <= self.log.first_seq:
+            return
+        self.log_live = False
+        stop = self.log_view_first
+        self.show_log_range(stop - LOG_VIEW_LINES, stop)
+
+    def log_page_newer(self):
+        if self.log_text is None or self.log_live:
+            return
+        start = self.log_view_first + self.log_view_lines
+        if start + LOG_VIEW_LINES >= self.log.seq:
+            self.log_go_live()
+        else:
+            self.show_log_range(start, start + LOG_VIEW_LINES)
+
+    def log_go_live(self):
+        if self.log_text is None:
+            return
+        self.log_live = True
+        self.log.take_pending()
+        self.show_log_range(self.log.seq - LOG_VIEW_LINES, self.log.seq)
+
+    def clear_log(self):
+        if self.log_text is None:
+            return
+        self.log_text. config(state="normal")
+        self.log_text.delete("1.0", "end")
+        self.log_text.config(state="disabled")
+        
+        # Records stay in the ring, "Older" can still page back to them
+        self.log.take_pending()
+        self.log_view_first = self.log.seq
+        self.log_view_lines = 0
+        self.log_live = True
+
+
+def main():
+    root = tk.Tk()
+    app = FPGAIntegratedGUI(root)
+    
+    def on_closing():
+        if app.engine:
+            app.disconnect()
+        app.port_monitor.stop()
+        if app.metrics_server is not None:
+            app.metrics_server.shutdown()
+        app.log.close()
+        if app.samples is not None:
+            app.samples.close()
+        root.destroy()
+    
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    root.mainloop()
+
+
+if __name__ == "__main__": 
+    main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UART log ring - FPGA Nexys A7-100T UART
+Fixed-capacity record ring with optional spill file, no Tk needed.
+"""
+
+import os
+import time
+from collections import deque
+from itertools import islice
+
+
+LOG_CAPACITY = 100_000
+# One sparse index entry per this many spilled records
+SPILL_INDEX_STEP = 1024
+
+
+class LogRing:
+    """
+    Bounded log of (timestamp, tag, message) records.
+
+    Every record gets an absolute sequence number. The newest `capacity`
+    records live in memory; older ones are either forgotten or, with a
+    spill_path, appended to a tab-separated text file that page() can read
+    back. The view pulls new records with take_pending() once per tick.
+    """
+
+    def __init__(self, capacity=LOG_CAPACITY, spill_path=None):
+        self.capacity = capacity
+        self.records = deque(maxlen=capacity)
+        self.seq = 0            # sequence number of the next record
+        self.pending_from = 0   # first record not yet taken by the view
+
+        self.spill_path = spill_path
+        self.spill = None
+        self.spilled = 0
+        self.spill_index = []   # byte offset of every SPILL_INDEX_STEP-th record
+        if spill_path:
+            self.spill = open(spill_path, "w", encoding="utf-8", newline="\n")
+
+    @property
+    def first_seq(self):
+        """Oldest sequence number still available (memory or spill file)."""
+        if self.spill is not None:
+            return 0
+        return self.seq - len(self.records)
+
+    def append(self, tag, msg, ts=None):
+        records = self.records
+        if len(records) == self.capacity and self.spill is not None:
+            self._spill(records[0])
+        records.append((time.time() if ts is None else ts, tag, msg))
+        self.seq += 1
+
+    def take_pending(self):
+        """Records appended since the last call (at most `capacity`)."""
+        start = max(self.pending_from, self.seq - len(self.records))
+        self.pending_from = self.seq
+        return self.page(start, self.seq)
+
+    def page(self, start, stop):
+        """Records with sequence numbers in [start, stop)."""
+        start = max(start, self.first_seq)
+        stop = min(stop, self.seq)
+        if start >= stop:
+            return []
+
+        mem_first = self.seq - len(self.records)
+        out = []
+        if start < mem_first:
+            out = self._read_spill(start, min(stop, mem_first))
+            start = mem_first
+        if start < stop:
+            out.extend(islice(self.records, start - mem_first, stop - mem_first))
+        return out
+
+    def flush(self):
+        if self.spill is not None:
+            self.spill.flush()
+
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+    # ------------------------------------------------------------------
+    # Spill file
+    # ------------------------------------------------------------------
+    def _spill(self, record):
+        ts, tag, msg = record
+        if self.spilled % SPILL_INDEX_STEP == 0:
+            self.spill_index.append(self.spill.tell())
+        msg = msg.replace("\n", " ").replace("\t", " ")
+        self.spill.write(f"{ts:.3f}\t{tag}\t{msg}\n")
+        self.spilled += 1
+
+    def _read_spill(self, start, stop):
+        self.spill.flush()
+        block = start // SPILL_INDEX_STEP
+        skip = start - block * SPILL_INDEX_STEP
+        out = []
+        with open(self.spill_path, "r", encoding="utf-8", newline="\n") as f:
+            f.seek(self.spill_index[block])
+            for line in islice(f, skip, skip + stop - start):
+                ts, tag, msg = line.rstrip("\n").split("\t", 2)
+                out.append((float(ts), tag, msg))
+        return out
+
+
+def spill_name(directory="."):
+    """Default spill file name for a GUI session."""
+    return os.path.join(directory, time.strftime("uart_log_%Y%m%d_%H%M%S.txt"))
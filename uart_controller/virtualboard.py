@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Virtual board - FPGA Nexys A7-100T UART
+Pseudo-terminal that speaks the TOP.v protocol, for testing without hardware.
+
+    python virtualboard.py [--mode 0] [--period 0.5] [--binary] [--noise 0.01]
+
+prints the slave device (e.g. /dev/pts/5); point the GUI or serial.Serial
+at it. POSIX only (pty module).
+"""
+
+import argparse
+import errno
+import math
+import os
+import pty
+import random
+import select
+import threading
+import time
+import tty
+
+from binframe import encode_frame
+
+
+BAUDRATE = 115200
+# TOP.v SAMPLE_PERIOD: 50_000_000 clocks at 100 MHz
+SAMPLE_PERIOD = 0.5
+# Mode buttons -> r_mode, as labelled in the GUI
+BUTTON_MODES = {"BTNU": 0, "BTNL": 1, "BTNR": 2, "BTND": 3, "BTNC": 4}
+# TOP.v prints the ADT7420 reading in its 0.25 degC steps
+TEMP_STEP = 0.25
+
+
+# ============================================================================
+# Line builders (TOP.v TX Message Builder)
+# ============================================================================
+def _accel(value):
+    # Firmware prints sign + three digits
+    return max(-999, min(999, value))
+
+
+def format_line(mode, x, y, z, temperature, sw, led, last_rx):
+    if mode == 0:
+        return f"M0:X={_accel(x):+04d} Y={_accel(y):+04d} Z={_accel(z):+04d}\r\n".encode()
+    if mode == 1:
+        return f"M1:T={temperature:05.2f}C\r\n".encode()
+    if mode == 2:
+        return f"M2:SW={sw:04X}\r\n".encode()
+    if mode == 3:
+        return f"M3:RX={last_rx:02X} L={led:04X}\r\n".encode()
+    return f"M4:X={_accel(x):+04d} T={int(temperature):02d}C S={sw:04X}\r\n".encode()
+
+
+# ============================================================================
+# Board
+# ============================================================================
+class VirtualBoard:
+    """
+    Protocol-level model of the TOP.v firmware behind a pty.
+
+    Like the firmware it sends one line every `period` seconds in the
+    current mode, immediately on a switch change in mode 2, and on received
+    bytes in modes 3 and 4. Received bytes update the PC LED register with
+    the 2-byte low/high protocol; bytes that arrive together (one
+    send_led_16bit() write) are applied before the echo, so the echo carries
+    the complete L=xxxx value. As on the board, a trigger while a line is
+    still on the wire is ignored.
+
+    period=0 sends back to back. With baudrate set, every line occupies the
+    line for len * 10 / baudrate seconds, so the highest rate is what a real
+    115200 baud link can carry; baudrate=None removes that limit. Output that
+    does not fit into the pty buffer is dropped and counted in `overruns`,
+    like a UART without flow control.
+
+    noise is the fraction of lines that get damaged (flipped bit, cut line or
+    inserted junk). script is a list of (seconds_from_start, action, value)
+    with action "button" (a BUTTON_MODES name), "switches", "noise" or
+    "period".
+    """
+
+    def __init__(self, mode=0, period=SAMPLE_PERIOD, baudrate=BAUDRATE, binary=False,
+                 noise=0.0, seed=0, script=()):
+        self.mode = mode
+        self.period = period
+        self.baudrate = baudrate
+        self.binary = binary
+        self.noise = noise
+        self.script = sorted(script)
+        self.rng = random.Random(seed)
+
+        # Board registers
+        self.switch_value = 0
+        self.pc_led_value = 0
+        self.pc_byte_sel = 0
+        self.pc_last_rx = 0
+        self.tx_seq = 0
+        self.tick = 0
+
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+
+        self.lock = threading.Lock()
+        self.trigger = False
+        self.running = False
+        self.thread = None
+        self.wake_r, self.wake_w = os.pipe()
+
+        # Stats
+        self.lines = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.damaged = 0
+        self.overruns = 0
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def close(self):
+        self.stop()
+        for fd in (self.master, self.slave, self.wake_r, self.wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def press_button(self, button):
+        with self.lock:
+            self.mode = BUTTON_MODES[button]
+
+    def set_switches(self, value):
+        with self.lock:
+            changed = value != self.switch_value
+            self.switch_value = value & 0xFFFF
+            if changed and self.mode == 2:
+                self.trigger = True
+        self._wake()
+
+    def set_noise(self, fraction):
+        self.noise = fraction
+
+    def set_period(self, period):
+        self.period = period
+        self._wake()
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+    def run(self):
+        start = time.monotonic()
+        next_sample = start
+        line_free = start       # when the current line has left the wire
+        script = list(self.script)
+
+        while self.running:
+            now = time.monotonic()
+            while script and start + script[0][0] <= now:
+                _, action, value = script.pop(0)
+                self._script_action(action, value)
+
+            sample_due = now >= next_sample
+            if (sample_due or self.trigger) and now >= line_free:
+                self.trigger = False
+                sent = self._send()
+                line_free = now + (sent * 10 / self.baudrate if self.baudrate else 0.0)
+                if sample_due:
+                    # Deadlines advance from the schedule, not from now
+                    next_sample = max(next_sample + self.period, line_free)
+            elif self.trigger and now < line_free:
+                # Firmware ignores triggers while TX is busy
+                self.trigger = False
+
+            deadline = max(line_free, next_sample)
+            if script:
+                deadline = min(deadline, start + script[0][0])
+            timeout = max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self.master, self.wake_r], [], [], timeout)
+            if self.wake_r in readable:
+                os.read(self.wake_r, 4096)
+            if self.master in readable:
+                self._receive()
+
+    def _script_action(self, action, value):
+        if action == "button":
+            self.press_button(value)
+        elif action == "switches":
+            self.set_switches(value)
+        elif action == "noise":
+            self.set_noise(value)
+        elif action == "period":
+            self.set_period(value)
+        else:
+            raise ValueError(f"unknown script action {action!r}")
+
+    def _wake(self):
+        try:
+            os.write(self.wake_w, b"\0")
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # RX (host -> board)
+    # ------------------------------------------------------------------
+    def _receive(self):
+        try:
+            data = os.read(self.master, 4096)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EIO):
+                return
+            raise
+        self.bytes_received += len(data)
+        with self.lock:
+            for byte in data:
+                self.pc_last_rx = byte
+                if self.pc_byte_sel == 0:
+                    self.pc_led_value = (self.pc_led_value & 0xFF00) | byte
+                else:
+                    self.pc_led_value = (self.pc_led_value & 0x00FF) | (byte << 8)
+                self.pc_byte_sel ^= 1
+            if self.mode in (3, 4):
+                self.trigger = True
+
+    # ------------------------------------------------------------------
+    # TX (board -> host)
+    # ------------------------------------------------------------------
+    def _sample(self):
+        t = self.tick * 0.05
+        self.tick += 1
+        x = int(300 * math.sin(t))
+        y = int(300 * math.cos(t))
+        z = 250 + int(10 * math.sin(7 * t))
+        temperature = 25.0 + round(2 * math.sin(0.01 * t) / TEMP_STEP) * TEMP_STEP
+        return x, y, z, temperature
+
+    def _send(self):
+        x, y, z, temperature = self._sample()
+        with self.lock:
+            mode = self.mode
+            sw = self.switch_value
+            led = self.pc_led_value
+            last_rx = self.pc_last_rx
+        if self.binary:
+            data = encode_frame(mode, self.tx_seq, x, y, z, int(temperature / TEMP_STEP) & 0xFF,
+                                sw, led, last_rx)
+            self.tx_seq = (self.tx_seq + 1) & 0xFF
+        else:
+            data = format_line(mode, x, y, z, temperature, sw, led, last_rx)
+        if self.noise and self.rng.random() < self.noise:
+            data = self._damage(data)
+        self.lines += 1
+
+        try:
+            sent = os.write(self.master, data)
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
+            if e.errno != errno.EIO:    # nobody has the slave open
+                raise
+            sent = 0
+        if sent < len(data):
+            self.overruns += 1
+        self.bytes_sent += sent
+        return len(data)
+
+    def _damage(self, data):
+        rng = self.rng
+        data = bytearray(data)
+        kind = rng.randrange(3)
+        if kind == 0:
+            data[rng.randrange(len(data))] ^= 1 << rng.randrange(8)
+        elif kind == 1:
+            del data[rng.randrange(1, len(data)):]
+        else:
+            data[rng.randrange(len(data)):0] = bytes(rng.randrange(256) for _ in range(rng.randint(1, 8)))
+        self.damaged += 1
+        return bytes(data)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Virtual Nexys A7 board on a pseudo-terminal")
+    ap.add_argument("--mode", type=int, default=0, choices=range(5))
+    ap.add_argument("--period", type=float, default=SAMPLE_PERIOD, help="seconds between samples, 0 = back to back")
+    ap.add_argument("--baud", type=int, default=BAUDRATE, help="line rate to model, 0 = unlimited")
+    ap.add_argument("--binary", action="store_true", help="send TX_BINARY frames")
+    ap.add_argument("--noise", type=float, default=0.0, help="fraction of damaged lines")
+    ap.add_argument("--cycle", type=float, default=0.0, help="press the next mode button every N seconds")
+    args = ap.parse_args()
+
+    script = []
+    if args.cycle:
+        buttons = list(BUTTON_MODES)
+        script = [(args.cycle * i, "button", buttons[i % len(buttons)]) for i in range(1, 10000)]
+    board = VirtualBoard(args.mode, args.period, args.baud or None, args.binary, args.noise, script=script)
+    board.start()
+    print(board.port, flush=True)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        board.close()
+        print(f"lines={board.lines} sent={board.bytes_sent} received={board.bytes_received} "
+              f"damaged={board.damaged} overruns={board.overruns}")
+
+
+if __name__ == "__main__":
+    main()